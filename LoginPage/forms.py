@@ -2,6 +2,7 @@ from django import forms
 from django.contrib.auth.models import User
 from adoption.models import PendingPetForAdoption, Admin, PetAdoptionTable, TrackUpdateTable
 from django.contrib.auth.forms import UserCreationForm
+from adoption.utils.uploads import size_limit_message, upload_size_limit
 
 ADOPTER_TYPE_CHOICES = [
     ('Individual', 'Individual'),
@@ -95,9 +96,10 @@ class PetAdoptionFormRequest(forms.ModelForm):
         cleaned_data = super().clean()
         id_upload = cleaned_data.get('id_upload')
 
-        # Validate file size (e.g., 5MB max)
-        if id_upload and id_upload.size > 5 * 1024 * 1024:  # 5MB limit
-            self.add_error('id_upload', "File size must be less than 5MB.")
+        # Validate file size (the upload handler stops storing it past the limit, but reports the full size)
+        size_limit = upload_size_limit('id_upload')
+        if id_upload and id_upload.size > size_limit:
+            self.add_error('id_upload', size_limit_message(size_limit))
 
         # Ensure all fields are filled
         for field in self.fields:
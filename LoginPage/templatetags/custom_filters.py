@@ -1,6 +1,9 @@
 from django import template
+from django.utils.html import format_html, format_html_join
 import calendar
 
+from adoption.utils import image_derivatives
+
 register = template.Library()
 
 @register.filter
@@ -28,4 +31,32 @@ def month_name(month_number):
             return calendar.month_name[month_number]  # Returns full month name
     except (ValueError, TypeError):
         pass  # Handle cases where conversion to int fails
-    return ""  # Return an empty string for invalid month numbers
\ No newline at end of file
+    return ""  # Return an empty string for invalid month numbers
+
+@register.filter
+def derivative_url(image, size):
+    """URL of a resized copy of an image field ('thumb', 'card' or 'full'), or the original until it exists."""
+    return image_derivatives.derivative_url(image, size)
+
+@register.simple_tag
+def responsive_img(image, size='card', sizes='100vw', **attrs):
+    """
+    <picture> with WebP and JPEG srcsets over every resized copy, falling back to a
+    plain <img> of the original while the copies are still being generated.
+    Extra keyword arguments become attributes of the <img>, e.g. alt="..." class="...".
+    """
+    if not image:
+        return ''
+    attributes = format_html_join('', ' {}="{}"', ((name.rstrip('_').replace('_', '-'), value) for name, value in attrs.items()))
+    if not image_derivatives.derivatives_ready(image):
+        return format_html('<img src="{}"{} loading="lazy">', image.url, attributes)
+    # display: contents keeps the page's img selectors and layout exactly as before
+    return format_html(
+        '<picture style="display: contents">'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}"{} loading="lazy">'
+        '</picture>',
+        image_derivatives.srcset(image, 'webp'), sizes,
+        image_derivatives.derivative_url(image, size), image_derivatives.srcset(image, 'jpg'), sizes,
+        attributes,
+    )
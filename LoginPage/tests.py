@@ -1,3 +1,381 @@
 from django.test import TestCase
 
 # Create your tests here.
+import asyncio
+import json
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.urls import reverse
+
+from LoginPage.views import ADMIN_REQUEST_PAGE_SIZE, PendingPetList, ReactAdoptedPetsView, ReactTrackUpdateList, RequestAdoptionRequestList, paginate_adoption_requests
+
+from adoption.models import Admin, AdminUser, Notification, NotificationCounter, PendingPetForAdoption, PetAdoptionTable, TrackUpdateTable
+from adoption.tests import TemporaryMediaMixin, image_bytes, make_pet, make_request
+from adoption.utils import notification_stream
+from adoption.serializers import PendingPetReadSerializer, PetAdoptionReadSerializer, TrackUpdateReadSerializer
+from adoption.utils.image_derivatives import generate_derivatives
+from adoption.utils.notification_stream import STREAM_RETRY_MS, InMemoryBroker, set_broker, user_channel
+from adoption.utils.notifications import NOTIFICATION_DROPDOWN_LIMIT, write_notifications
+from adoption.utils.statuses import PetStatus, RequestStatus
+
+
+class NotificationDropdownTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('adopter', password='pw')
+        self.other = User.objects.create_user('other', password='pw')
+        with self.captureOnCommitCallbacks(execute=True):
+            write_notifications([(self.user.pk, f"Update {i}") for i in range(NOTIFICATION_DROPDOWN_LIMIT + 5)])
+            write_notifications([(self.other.pk, "Someone else's")])
+        self.client.force_login(self.user)
+
+    def test_marks_only_the_notifications_shown(self):
+        shown = self.client.get(reverse('notification_list')).json()['notifications']
+        self.assertEqual(len(shown), NOTIFICATION_DROPDOWN_LIMIT)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('mark_notifications_read'), {'ids': [n['id'] for n in shown]})
+        self.assertEqual(response.json()['marked'], NOTIFICATION_DROPDOWN_LIMIT)
+        self.assertEqual(response.json()['notifications_count'], 5)
+        self.assertEqual(Notification.objects.filter(user=self.user, is_read=False).count(), 5)
+        self.assertEqual(NotificationCounter.objects.get(user=self.user).unread_count, 5)
+
+        # The five older ones come up next time the bell is opened
+        remaining = self.client.get(reverse('notification_list')).json()
+        self.assertEqual(len(remaining['notifications']), 5)
+        self.assertEqual(remaining['notifications_count'], 5)
+
+    def test_ignores_other_users_and_already_read_ids(self):
+        foreign = Notification.objects.get(user=self.other)
+        own = Notification.objects.filter(user=self.user).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.client.post(reverse('mark_notifications_read'), {'ids': [own.pk, foreign.pk]})
+            again = self.client.post(reverse('mark_notifications_read'), {'ids': [own.pk]})
+        self.assertEqual(first.json()['marked'], 1)
+        self.assertEqual(again.json()['marked'], 0)
+        self.assertFalse(Notification.objects.get(pk=foreign.pk).is_read)
+        self.assertEqual(NotificationCounter.objects.get(user=self.user).unread_count, NOTIFICATION_DROPDOWN_LIMIT + 4)
+        self.assertEqual(NotificationCounter.objects.get(user=self.other).unread_count, 1)
+
+
+class AddPetNotificationTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.poster = User.objects.create_user('poster', password='pw')
+        self.admins = [User.objects.create_user(f'admin{i}', password='pw') for i in range(2)]
+        for admin in self.admins:
+            AdminUser.objects.create(user=admin)
+
+    def test_new_post_notifies_every_admin(self):
+        self.client.force_login(self.poster)
+        form = {
+            'name': 'Bantay', 'animal_type': 'Dog', 'location': 'Cebu', 'breed': 'Aspin', 'color': 'Brown',
+            'gender': 'Male', 'age': '3', 'additional_details': 'Calm',
+            'img': SimpleUploadedFile('dog.png', image_bytes('brown'), content_type='image/png'),
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('add_pet'), form)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(PendingPetForAdoption.objects.filter(name='Bantay', user=self.poster).exists())
+        message = "A new pet post for adoption has been submitted by poster."
+        self.assertEqual(
+            sorted(Notification.objects.values_list('user_id', 'message')),
+            [(admin.pk, message) for admin in self.admins],
+        )
+        self.assertEqual(NotificationCounter.objects.get(user=self.admins[1]).unread_count, 1)
+
+
+class UpdateStatusTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('moderator', password='pw')
+        AdminUser.objects.create(user=self.admin)
+        self.adopter = User.objects.create_user('adopter', password='pw')
+        self.request = make_request(make_pet(self.adopter), self.adopter, RequestStatus.REVIEW.code)
+        self.url = reverse('update_status', args=[self.request.id, 'rejected'])
+
+    def status(self):
+        return PetAdoptionTable.objects.get(pk=self.request.pk).adoption_request_status
+
+    def test_only_admins_may_post(self):
+        self.assertEqual(self.client.post(self.url).status_code, 302)  # To the login page
+        self.client.force_login(self.adopter)
+        self.assertEqual(self.client.post(self.url).status_code, 403)
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+        self.assertEqual(self.status(), RequestStatus.REVIEW.code)
+
+    def test_reject_form_posts_once_per_key(self):
+        self.client.force_login(self.admin)
+        page = self.client.get(reverse('view_request', args=[self.request.id])).content.decode()
+        self.assertIn(f'<form action="{self.url}" method="post" id="reject-form">', page)
+        self.assertNotIn(f'href="{self.url}"', page)
+
+        key = page.split('name="idempotency_key" value="')[1].split('"')[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self.client.post(self.url, {'idempotency_key': key})
+            again = self.client.post(self.url, {'idempotency_key': key})
+        self.assertRedirects(first, reverse('admin_adoption_request'), fetch_redirect_response=False)
+        self.assertEqual(again.status_code, first.status_code)
+        self.assertEqual(self.status(), RequestStatus.REJECTED.code)
+
+
+class FastReadParityTests(TemporaryMediaMixin, TestCase):
+    """Each values() list renders what the view's read serializer renders for the same rows"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user('adopter', password='pw')
+        photo = lambda name, color: SimpleUploadedFile(name, image_bytes(color, size=(800, 600)), content_type='image/png')
+        self.adopted = make_pet(self.user, img=photo('adopted.png', 'orange'), adoption_status=PetStatus.ADOPTED.code)
+        self.listed = make_pet(self.user, name='Bantay', img=photo('listed.png', 'black'))
+        generate_derivatives(default_storage, self.adopted.img.name)
+
+        self.adoption = make_request(self.adopted, self.user, RequestStatus.APPROVED.code)
+        self.adoption.approval_date_time = timezone.now()
+        self.adoption.id_upload = photo('id.png', 'white')
+        self.adoption.save()
+        make_request(self.listed, self.user)
+
+        for day, color in ((1, 'green'), (2, None)):
+            TrackUpdateTable.objects.create(
+                pet_adoption_request=self.adoption, author=self.user,
+                followup_date=timezone.localdate() - timedelta(days=day), notes=f"Day {day}",
+                photos=photo(f"report_{day}.png", color) if color else None,
+            )
+
+    def expected(self, read_serializer, queryset, request):
+        rows = queryset.order_by('-created_at', '-id')
+        data = read_serializer(rows, many=True, context={'request': request}).data
+        return json.loads(JSONRenderer().render(data))
+
+    def assertParity(self, results, read_serializer, queryset, request):
+        expected = self.expected(read_serializer, queryset, request)
+        self.assertTrue(expected)
+        self.assertEqual(results, expected)
+        self.assertEqual(list(results[0]), list(read_serializer.Meta.fields))
+
+    def test_viewset_lists(self):
+        cases = [
+            ('petadoptiontable-list', PetAdoptionReadSerializer, PetAdoptionTable.objects.all()),
+            ('pendingpetforadoption-list', PendingPetReadSerializer, PendingPetForAdoption.objects.all()),
+        ]
+        for url_name, read_serializer, queryset in cases:
+            with self.subTest(url_name):
+                response = self.client.get(reverse(url_name))
+                self.assertParity(response.json()['results'], read_serializer, queryset, response.wsgi_request)
+
+    def test_generic_list_views(self):
+        factory = APIRequestFactory()
+        cases = [
+            (PendingPetList, {'userId': self.user.pk}, {}, PendingPetReadSerializer,
+             PendingPetForAdoption.objects.filter(user=self.user)),
+            (ReactAdoptedPetsView, {}, {'user_id': self.user.pk}, PendingPetReadSerializer,
+             PendingPetForAdoption.objects.filter(pk=self.adopted.pk)),
+            (ReactTrackUpdateList, {'pet_adoption_request_id': self.adoption.pk}, {}, TrackUpdateReadSerializer,
+             TrackUpdateTable.objects.filter(pet_adoption_request=self.adoption)),
+        ]
+        for view, params, kwargs, read_serializer, queryset in cases:
+            with self.subTest(view.__name__):
+                request = factory.get('/', params)
+                response = view.as_view()(request, **kwargs).render()
+                self.assertParity(json.loads(response.content)['results'], read_serializer, queryset, request)
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('poster', password='pw')
+        self.pets = [make_pet(self.user, name=f"Pet {i}") for i in range(5)]
+        # Posted in the same instant: id alone has to keep the order
+        PendingPetForAdoption.objects.update(created_at=timezone.now())
+        self.newest_first = sorted((pet.pk for pet in self.pets), reverse=True)
+        self.url = reverse('pendingpetforadoption-list')
+
+    def walk(self, url, link):
+        pages = []
+        while url:
+            body = self.client.get(url).json()
+            pages.append([row['id'] for row in body['results']])
+            url = body[link]
+        return pages
+
+    def test_next_and_previous_walk_the_same_pages(self):
+        forward = self.walk(f"{self.url}?page_size=2", 'next')
+        self.assertEqual(forward, [self.newest_first[:2], self.newest_first[2:4], self.newest_first[4:]])
+
+        last = self.client.get(f"{self.url}?page_size=2").json()
+        while last['next']:
+            last = self.client.get(last['next']).json()
+        self.assertIsNone(last['next'])
+        backward = self.walk(last['previous'], 'previous')
+        self.assertEqual(backward, forward[-2::-1])
+        self.assertEqual(self.client.get(f"{self.url}?cursor=bogus").status_code, 404)
+
+    def test_views_without_created_at_page_by_id(self):
+        admins = [Admin.objects.create(username=f"admin{i}", email=f"admin{i}@example.com") for i in range(3)]
+        pages = self.walk(f"{reverse('admin-list')}?page_size=2", 'next')
+        self.assertEqual(pages, [[admins[2].pk, admins[1].pk], [admins[0].pk]])
+
+    def test_rows_added_mid_scroll_do_not_shift_the_pages(self):
+        first = self.client.get(f"{self.url}?page_size=2").json()
+        self.assertIsNone(first['previous'])
+        make_pet(self.user, name='Newcomer')
+        rest = self.walk(first['next'], 'next')
+        self.assertEqual(sum(rest, []), self.newest_first[2:])
+
+    def test_count_only_when_asked_for(self):
+        self.assertNotIn('count', self.client.get(self.url).json())
+        self.assertNotIn('count', self.client.get(f"{self.url}?count=false").json())
+        self.assertEqual(self.client.get(f"{self.url}?count=true&page_size=2").json()['count'], 5)
+        self.assertEqual(self.client.get(f"{self.url}?count=true&adoption_status=adopted").json()['count'], 0)
+
+    def test_plain_api_views_page_the_same_way(self):
+        adopter = User.objects.create_user('adopter', password='pw')
+        requests = [make_request(pet, adopter) for pet in self.pets[:3]]
+        factory = APIRequestFactory()
+
+        response = RequestAdoptionRequestList(factory.get('/', {'userId': self.user.pk, 'page_size': 2})).render()
+        body = json.loads(response.content)
+        self.assertNotIn('count', body)
+        self.assertEqual([row['id'] for row in body['results']], [requests[2].pk, requests[1].pk])
+        self.assertIsNotNone(body['next'])
+
+        response = RequestAdoptionRequestList(factory.get('/', {'userId': self.user.pk, 'count': 'true'})).render()
+        self.assertEqual(json.loads(response.content)['count'], 3)
+
+
+class AdminRequestListTests(TestCase):
+    def setUp(self):
+        self.adopter = User.objects.create_user('adopter', password='pw')
+        pet = make_pet(self.adopter)
+        self.requests = [make_request(pet, self.adopter) for _ in range(5)]
+        self.rejected = [make_request(pet, self.adopter, RequestStatus.REJECTED.code) for _ in range(2)]
+        self.newest_first = sorted((r.pk for r in self.requests + self.rejected), reverse=True)
+
+    def page(self, status=None, **params):
+        rows, pagination = paginate_adoption_requests(RequestFactory().get('/requests/', params), status, page_size=3)
+        return [row['id'] for row in rows], pagination
+
+    def test_first_page(self):
+        ids, pagination = self.page()
+        self.assertEqual(ids, self.newest_first[:3])
+        self.assertIsNone(pagination['prev_cursor'])
+        self.assertEqual(pagination['next_cursor'], ids[-1])
+        self.assertEqual(pagination['base_url'], '/requests/')
+
+    def test_after_and_before_walk_the_same_pages(self):
+        ids, pagination = self.page()
+        older = [ids]
+        while pagination['next_cursor']:
+            ids, pagination = self.page(after=pagination['next_cursor'])
+            older.append(ids)
+        self.assertEqual(older, [self.newest_first[:3], self.newest_first[3:6], self.newest_first[6:]])
+        # The oldest page has nothing older, but links back
+        self.assertIsNotNone(pagination['prev_cursor'])
+
+        newer = [ids]
+        while pagination['prev_cursor']:
+            ids, pagination = self.page(before=pagination['prev_cursor'])
+            newer.append(ids)
+        self.assertEqual(newer, older[::-1])
+        # Back on the newest page: nothing newer, and a link to the older ones again
+        self.assertIsNone(pagination['prev_cursor'])
+        self.assertEqual(pagination['next_cursor'], self.newest_first[2])
+
+    def test_page_that_exactly_fills_has_no_next(self):
+        ids, pagination = self.page(status=RequestStatus.REJECTED.code)
+        self.assertEqual(ids, sorted((r.pk for r in self.rejected), reverse=True))
+        self.assertIsNone(pagination['next_cursor'])
+        ids, pagination = self.page(after=self.newest_first[3])
+        self.assertEqual(ids, self.newest_first[4:7])
+        self.assertIsNone(pagination['next_cursor'])
+
+    def test_unreadable_cursors_give_the_first_page(self):
+        self.assertEqual(self.page(after='abc'), self.page())
+
+    def test_list_links_to_older_and_newer_pages(self):
+        pet = make_pet(self.adopter)
+        for _ in range(ADMIN_REQUEST_PAGE_SIZE):
+            make_request(pet, self.adopter)
+        url = reverse('admin_view_pending_requests')
+        first = self.client.get(url)
+        oldest_shown = first.context['requests'][-1]['id']
+        self.assertContains(first, f'href="{url}?after={oldest_shown}"')
+        self.assertNotContains(first, '?before=')
+
+        second = self.client.get(url, {'after': oldest_shown})
+        self.assertEqual(len(second.context['requests']), 5)
+        self.assertContains(second, f'href="{url}?before={second.context["requests"][0]["id"]}"')
+        self.assertNotContains(second, '?after=')
+
+
+class NotificationStreamTests(TestCase):
+    def setUp(self):
+        # Unread counts are cached by user id, which the rolled-back tests before this one reused
+        cache.clear()
+        self.user = User.objects.create_user('adopter', password='pw')
+        self.other = User.objects.create_user('other', password='pw')
+        self.broker = InMemoryBroker()
+        self.addCleanup(set_broker, set_broker(self.broker))
+        self.async_client.force_login(self.user)
+
+    def notify(self, *pending):
+        with self.captureOnCommitCallbacks(execute=True):
+            write_notifications(pending)
+
+    async def next_frame(self, stream):
+        return (await asyncio.wait_for(stream.__anext__(), timeout=5)).decode()
+
+    @mock.patch.object(notification_stream, 'STREAM_MAX_SECONDS', 2)
+    async def test_stream_pushes_new_notifications_and_counts(self):
+        response = await self.async_client.get(reverse('notification_stream'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+        self.assertEqual(await self.next_frame(stream), f"retry: {STREAM_RETRY_MS}\n\n")
+        self.assertEqual(await self.next_frame(stream), 'event: unread_count\ndata: {"count": 0}\n\n')
+        self.assertTrue(self.broker.has_subscribers(user_channel(self.user.pk)))
+
+        await sync_to_async(self.notify)((self.other.pk, "Someone else's"), (self.user.pk, 'Your request was approved'))
+        self.assertEqual(await self.next_frame(stream), 'event: unread_count\ndata: {"count": 1}\n\n')
+        frame = await self.next_frame(stream)
+        self.assertTrue(frame.startswith('event: notification\n'))
+        self.assertEqual(json.loads(frame.split('data: ', 1)[1])['message'], 'Your request was approved')
+
+        # The stream ends at STREAM_MAX_SECONDS, for the browser to reconnect, and drops its subscription
+        self.assertEqual(await self.next_frame(stream), ': keep-alive\n\n')
+        with self.assertRaises(StopAsyncIteration):
+            await self.next_frame(stream)
+        self.assertFalse(self.broker.has_subscribers(user_channel(self.user.pk)))
+
+    async def test_anonymous_users_get_no_stream(self):
+        await sync_to_async(self.async_client.logout)()
+        response = await self.async_client.get(reverse('notification_stream'))
+        self.assertEqual(response.status_code, 204)
+
+    def test_wsgi_requests_get_no_stream(self):
+        # An open stream would pin a WSGI worker
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('notification_stream')).status_code, 204)
+
+    def test_pages_open_the_stream_only_for_signed_in_users(self):
+        for template in ('base.html', 'base4.html'):
+            with self.subTest(template):
+                request = RequestFactory().get('/')
+                request.user = AnonymousUser()
+                self.assertNotIn('new EventSource', render_to_string(template, request=request))
+                request.user = self.user
+                self.assertIn('new EventSource', render_to_string(template, request=request))
@@ -35,16 +35,17 @@ urlpatterns = [
     path('requests/', views.view_requests, name='view_requests'),
     path('requests/<int:request_id>/', views.view_request, name='view_request'),
     path('requests/<int:request_id>/update_status/<str:new_status>/', views.update_status, name='update_status'),
+    path('requests/bulk_update_status/', views.bulk_update_status, name='bulk_update_status'),
     path('adopted-history/', views.adopted_history, name='adopted_history'),
     path('edit-profile/', views.edit_profile, name='edit_profile'),
     path('admin_approved_pet_detail/<int:pet_id>/', views.admin_approved_pet_detail, name='admin_approved_pet_detail'),
     path('admin_adoption_request/', views.admin_adoption_request, name='admin_adoption_request'),
-    path('admin_view_all_requests/', views.admin_view_all_requests, name='admin_view_all_requests'),
+    path('admin_view_all_requests/', views.admin_request_list, {'template_name': 'admin_view_all_requests.html'}, name='admin_view_all_requests'),
     path('admin_view_adoption_request/<int:request_id>/', views.admin_view_adoption_request, name='admin_view_adoption_request'),
-    path('admin_view_pending_requests/', views.admin_view_pending_requests, name='admin_view_pending_requests'),
-    path('admin_view_review_list/', views.admin_view_review_list, name='admin_view_review_list'),
-    path('admin_view_approved_list/', views.admin_view_approved_list, name='admin_view_approved_list'),
-    path('admin_view_rejected_list/', views.admin_view_rejected_list, name='admin_view_rejected_list'),
+    path('admin_view_pending_requests/', views.admin_request_list, {'status': 'pending', 'template_name': 'admin_view_pending_list.html'}, name='admin_view_pending_requests'),
+    path('admin_view_review_list/', views.admin_request_list, {'status': 'review', 'template_name': 'admin_view_review_list.html'}, name='admin_view_review_list'),
+    path('admin_view_approved_list/', views.admin_request_list, {'status': 'approved', 'template_name': 'admin_view_approved_list.html'}, name='admin_view_approved_list'),
+    path('admin_view_rejected_list/', views.admin_request_list, {'status': 'rejected', 'template_name': 'admin_view_rejected_list.html'}, name='admin_view_rejected_list'),
     path('reportadopted_pets/', views.reportadopted_pets, name='reportadopted_pets'),
     path('OwnerReportadopted_pets/', views.OwnerReportadopted_pets, name='OwnerReportadopted_pets'),
     path('reportRequestpet_detail/<int:pet_id>/', views.reportRequestpet_detail, name='reportRequestpet_detail'),  # Detail view for a specific pet
@@ -58,6 +59,8 @@ urlpatterns = [
     path('post_adoption/<int:id>/delete/', views.post_adoption_delete, name='post_adoption_delete'),
     path('terms/', views.terms_conditions_view, name='terms_conditions'),
     path('mark-notifications-read/', views.mark_notifications_read, name='mark_notifications_read'),
+    path('notifications/unread/', views.notification_list, name='notification_list'),
+    path('notifications/stream/', views.notification_stream, name='notification_stream'),
     path('pet_adoption_terms_and_conditions/', views.pet_adoption_terms_and_conditions, name='pet_adoption_terms_and_conditions'),
     path('track-pwa-install/', views.track_pwa_install, name='track-pwa-install'),
     path('get-pwa-stats/', views.get_pwa_stats, name='get-pwa-stats'),
@@ -3,11 +3,24 @@ from django.contrib import messages, admin
 from django.contrib.auth.models import User, auth
 from django.contrib.auth import login
 from adoption.models import PendingPetForAdoption, Admin, PetAdoptionTable, TrackUpdateTable, Notification, AdminUser, PageView, PWAInstallation
+from adoption.utils.dashboard import get_dashboard_counts
+from adoption.utils.followup_calendar import get_month_calendar
+from adoption.utils.followup_schedule import schedule_span
+from adoption.utils.pet_detail import get_pet_detail
+from django.utils.cache import get_conditional_response, patch_cache_control
+from adoption.utils.idempotency import idempotent
+from adoption.utils.notifications import NotificationBatch, get_unread_count, mark_read, notify_admins, unread_notifications
+from adoption.utils.notification_stream import user_event_stream
+from adoption.utils.pagination import paginated_rows
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from adoption.utils.request_status import APPROVAL_MESSAGE, transition_requests
+from adoption.utils.statuses import OPEN_REQUEST_STATUSES, PetStatus, RequestStatus
 from django.core.paginator import Paginator
 from .forms import PetAdoptionForm, SignUpForm, LoginForm, PetAdoptionFormRequest, AdminProfileForm, TrackUpdateForm, PendingPetForAdoptionForm,AdminSignupForm
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
-from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.db.models import F, Q
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.hashers import make_password
 from django.urls import reverse_lazy, reverse
 from django.views.generic import View
@@ -32,6 +45,7 @@ import pytz
 import calendar
 
 import json
+import uuid
 from django.views.decorators.http import require_POST
 
 # Get the month names
@@ -49,20 +63,57 @@ def admin_required(view_func):
 print(months[1])  # Output: January
 # views.py
 from rest_framework import viewsets
+from rest_framework.response import Response
+from rest_framework.exceptions import NotFound
 from adoption.models import Admin, PetAdoptionRequestTable, PetAdoptionTable, PendingPetForAdoption
 from adoption.serializers import AdminSerializer, PetAdoptionRequestTableSerializer, PetAdoptionTableSerializer, PendingPetForAdoptionSerializer, TrackUpdateTableSerializer, UpdatePendingPetSerializer, NotificationSerializer, UserSerializer
+from adoption.serializers import (
+    PendingPetReadSerializer,
+    PendingPetValuesSerializer,
+    PetAdoptionReadSerializer,
+    PetAdoptionValuesSerializer,
+    TrackUpdateReadSerializer,
+    TrackUpdateValuesSerializer,
+)
+
+class FastReadMixin:
+    """
+    For generic views and viewsets: GET responses use read_serializer_class,
+    and list() renders rows from queryset.values() through
+    values_serializer_class instead of building model instances. Writes keep
+    the view's serializer_class.
+    """
+    read_serializer_class = None
+    values_serializer_class = None
+
+    def get_serializer_class(self):
+        if self.request is not None and self.request.method == 'GET' and self.read_serializer_class is not None:
+            return self.read_serializer_class
+        return super().get_serializer_class()
+
+    def list(self, request, *args, **kwargs):
+        rows = self.values_serializer_class(context=self.get_serializer_context())
+        queryset = rows.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.to_representation(page))
+        return Response(rows.to_representation(queryset))
 
 class AdminViewSet(viewsets.ModelViewSet):
     queryset = Admin.objects.all()
     serializer_class = AdminSerializer
+    cursor_ordering = ('-id',)  # No created_at on this model
 
 class PetAdoptionRequestTableViewSet(viewsets.ModelViewSet):
     queryset = PetAdoptionRequestTable.objects.all()
     serializer_class = PetAdoptionRequestTableSerializer
+    cursor_ordering = ('-id',)  # No created_at on this model
 
-class PetAdoptionTableViewSet(viewsets.ModelViewSet):
+class PetAdoptionTableViewSet(FastReadMixin, viewsets.ModelViewSet):
     queryset = PetAdoptionTable.objects.all()
     serializer_class = PetAdoptionTableSerializer
+    read_serializer_class = PetAdoptionReadSerializer
+    values_serializer_class = PetAdoptionValuesSerializer
 
 class PendingPetForAdoptionViewSet(viewsets.ModelViewSet):
     queryset = PendingPetForAdoption.objects.all()
@@ -79,15 +130,20 @@ from rest_framework import viewsets
 from rest_framework.authentication import TokenAuthentication
 from adoption.serializers import PendingPetForAdoptionSerializer
 
-class PendingPetForAdoptionViewSet(viewsets.ModelViewSet):
+class PendingPetForAdoptionViewSet(FastReadMixin, viewsets.ModelViewSet):
     queryset = PendingPetForAdoption.objects.all()  # Ensure this line is present
     serializer_class = PendingPetForAdoptionSerializer
+    read_serializer_class = PendingPetReadSerializer
+    values_serializer_class = PendingPetValuesSerializer
 
     def get_queryset(self):
         queryset = super().get_queryset()  # Call the superclass's get_queryset method
         adoption_status = self.request.query_params.get('adoption_status', None)
         if adoption_status is not None:
-            queryset = queryset.filter(adoption_status=adoption_status)
+            try:
+                queryset = queryset.filter(adoption_status=PetStatus.parse(adoption_status).code)
+            except ValueError:
+                queryset = queryset.none()  # Not a status, so nothing can match
         return queryset
     
 # views.py
@@ -153,18 +209,14 @@ def create_adoption_request(request):
             request_date=request_date_time  # Add this
         )
 
-        # Notification logic remains the same
-        pet = PendingPetForAdoption.objects.filter(id=pet_id).first()
+        # Notify the pet owner and the adopter in one write
+        pet = PendingPetForAdoption.objects.filter(id=pet_id).only('name', 'user_id').first()
         if pet:
-            Notification.objects.create(
-                user_id=pet.user_id,
-                message=f"An adoption request for your pet (Name: {pet.name}) has been submitted."
-            )
-
-        Notification.objects.create(
-            user_id=user_id,
-            message=f"Adoption request for pet {pet.name} has been submitted successfully."
-        )
+            NotificationBatch().add(
+                pet.user_id, f"An adoption request for your pet (Name: {pet.name}) has been submitted."
+            ).add(
+                user_id, f"Adoption request for pet {pet.name} has been submitted successfully."
+            ).send()
 
         return Response(
             {"message": "Adoption request created successfully", "id": adoption_request.id},
@@ -193,12 +245,12 @@ def RequestAdoptionRequestList(request):
     # Fetch adoption requests based on pet IDs and check for pending or review status
     adoption_requests = PetAdoptionTable.objects.filter(
         pet_id__in=pet_ids,
-        adoption_request_status__in=['pending', 'review']  # Check for both 'pending' and 'review' statuses
+        adoption_request_status__in=OPEN_REQUEST_STATUSES  # Check for both 'pending' and 'review' statuses
     )
 
-    # Serialize the data (assuming you have a serializer set up)
-    serializer = PetAdoptionTableSerializer(adoption_requests, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    # One cursor page, serialized straight from the rows
+    rows = PetAdoptionValuesSerializer(context={'request': request})
+    return paginated_rows(request, adoption_requests, rows)
 
 
 from rest_framework import generics
@@ -225,18 +277,19 @@ class PostPendingPetViewSet(viewsets.ViewSet):
 
         try:
             pets = PendingPetForAdoption.objects.filter(user_id=user_id)  # Adjust field name as necessary
-            serializer = PendingPetForAdoptionSerializer(pets, many=True)
-
-            return Response({
-                'count': len(pets),
-                'results': serializer.data
-            }, status=status.HTTP_200_OK)
+            rows = PendingPetValuesSerializer(context={'request': request})
+            # One cursor page; "count" only with ?count=true
+            return paginated_rows(request, pets, rows, view=self)
+        except NotFound:
+            raise  # A cursor that doesn't decode; DRF answers 404
         except Exception as e:
             print('Error fetching pending pets:', e)
             return Response({'error': 'Internal server error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
-class PendingPetList(generics.ListAPIView):
+class PendingPetList(FastReadMixin, generics.ListAPIView):
     serializer_class = PendingPetForAdoptionSerializer
+    read_serializer_class = PendingPetReadSerializer
+    values_serializer_class = PendingPetValuesSerializer
 
     def get_queryset(self):
         user_id = self.request.query_params.get('userId', None)
@@ -255,8 +308,10 @@ def pet_detail_view(request, pk):
 
 def approve_pet(request, pk):
     pet = get_object_or_404(PendingPetForAdoption, pk=pk)
-    pet.adoption_status = 'approved'
-    pet.save()
+    # Only a pending post can be listed; approving an adopted pet would put it back up
+    if PetStatus.parse(pet.adoption_status).can_become(PetStatus.APPROVED):
+        pet.adoption_status = PetStatus.APPROVED.code
+        pet.save()
     return redirect(reverse('pending_pets'))
 
 @login_required
@@ -292,21 +347,14 @@ def adopt_pet(request, pk):
                 adoption_request.save()  # Save the instance to the database
                 print("Adoption request saved successfully")  # Print if the adoption request is saved successfully
                                 
-                # Notify the pet owner
-                pet_owner = PendingPetForAdoption.objects.get(pk=pet.id).user  # Get the owner of the pet
+                # Notify the pet owner and the admins (written together after the save commits)
+                notifications = NotificationBatch()
+                pet_owner = pet.user  # Get the owner of the pet
                 if pet_owner:
-                    # Create a notification for the pet owner
-                    notification_message = f"There is a new adoption request for your pet: {pet.name}."
-                    Notification.objects.create(user=pet_owner, message=notification_message)
-                                        
+                    notifications.add(pet_owner, f"There is a new adoption request for your pet: {pet.name}.")
                     messages.success(request, f"Notification sent to {pet_owner.username} about the adoption request for {pet.name}.")
-                
-                # Notify the user with ID 10
-                user_id_10 = User.objects.get(pk=10)  # Get the user with ID 10
-                if user_id_10:
-                    notification_message_for_user_10 = f"A new adoption request has been submitted for the pet: {pet.name}."
-                    Notification.objects.create(user=user_id_10, message=notification_message_for_user_10)
-                    print(f"Notification sent to user ID 10: {user_id_10.username}")
+                notifications.add_admins(f"A new adoption request has been submitted for the pet: {pet.name}.")
+                print(f"Notifications queued: {notifications.send()}")
             
             except Exception as e:
                 print("Error saving adoption request:", e)  # Print any errors when saving the adoption request
@@ -363,9 +411,9 @@ def post_adoption_delete(request, id):
             # Attempt to find the related adoption record
             adoption_record = PetAdoptionTable.objects.get(pet_id=pet.id)
             # Update the adoption_request_status
-            adoption_record.adoption_request_status = 'Pet is deleted'
+            adoption_record.adoption_request_status = RequestStatus.PET_DELETED.code
             adoption_record.save()
-            print(f"Updated adoption record for pet {pet.name} to 'Pet is deleted'.")
+            print(f"Updated adoption record for pet {pet.name} to 'pet_deleted'.")
         except PetAdoptionTable.DoesNotExist:
             print(f"No adoption record found for pet {pet.name}.")
         
@@ -397,27 +445,68 @@ def logout_admin(request):
     # Redirect to a desired page after logout
     return redirect('admin_home')  # Change 'landing' to the name of the URL you want to redirect to
 
+ADMIN_REQUEST_PAGE_SIZE = 25
+
+def paginate_adoption_requests(request, status=None, page_size=ADMIN_REQUEST_PAGE_SIZE):
+    """
+    One page of adoption requests for the admin lists, newest first, in a single query.
+    Uses keyset cursors (?after=<id> / ?before=<id>) so deep pages cost the same as the first.
+    """
+    rows = PetAdoptionTable.objects.all()
+    if status:
+        rows = rows.filter(adoption_request_status=status)
+
+    def cursor(name):
+        try:
+            return int(request.GET[name])
+        except (KeyError, ValueError):
+            return None
+
+    after, before = cursor('after'), cursor('before')
+    if before is not None:
+        rows = rows.filter(id__gt=before).order_by('id')
+    elif after is not None:
+        rows = rows.filter(id__lt=after).order_by('-id')
+    else:
+        rows = rows.order_by('-id')
+
+    # Only the columns the list templates render; the pet name/type come from the same JOIN
+    rows = list(rows.values(
+        'id', 'adoption_request_status', 'request_date',
+        pet_name=F('pet__name'), pet_animal_type=F('pet__animal_type'),
+    )[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if before is not None:
+        rows.reverse()
+        has_newer, has_older = has_more, True
+    else:
+        has_newer, has_older = after is not None, has_more
+
+    pagination = {
+        'base_url': request.path,
+        'prev_cursor': rows[0]['id'] if rows and has_newer else None,
+        'next_cursor': rows[-1]['id'] if rows and has_older else None,
+    }
+    return rows, pagination
+
+def admin_request_list(request, status=None, template_name='admin_view_all_requests.html'):
+    # Shared by every adoption request list; urls.py passes the status filter and template
+    requests_page, pagination = paginate_adoption_requests(request, status)
+    return render(request, template_name, {'requests': requests_page, 'pagination': pagination})
+
 @login_required
 def view_requests(request):
     # Fetch all adoption requests
-    adoption_requests = PetAdoptionTable.objects.all()
-    
-    request_list = []
-    for req in adoption_requests:
-        pet = PendingPetForAdoption.objects.get(id=req.pet_id)
-        request_list.append({
-            'id': req.id,
-            'pet_name': pet.name,
-            'pet_animal_type': pet.animal_type,
-            'adoption_request_status': req.adoption_request_status,
-        })
-    
-    return render(request, 'requests.html', {'requests': request_list})
+    return admin_request_list(request, template_name='requests.html')
 
 from rest_framework.exceptions import NotFound
 
-class ReactAdoptedPetsView(generics.ListAPIView):
+class ReactAdoptedPetsView(FastReadMixin, generics.ListAPIView):
     serializer_class = PendingPetForAdoptionSerializer
+    read_serializer_class = PendingPetReadSerializer
+    values_serializer_class = PendingPetValuesSerializer
 
     def get_queryset(self):
         user_id = self.kwargs['user_id']  # Get user_id from the URL
@@ -425,7 +514,7 @@ class ReactAdoptedPetsView(generics.ListAPIView):
 
         queryset = PendingPetForAdoption.objects.filter(
             user_id=user_id,  # Filter by user_id
-            adoption_status__in=['Pet_is_already_adopt', 'Pet is already adopted']
+            adoption_status=PetStatus.ADOPTED.code
         )
 
         logger.debug(f"Queryset for user ID {user_id}: {queryset}")
@@ -439,80 +528,26 @@ class ReactAdoptPetDetailView(generics.RetrieveAPIView):
     def get(self, request, *args, **kwargs):
         pet_id = kwargs.get('pk')
         try:
-            # Retrieve the pet object using the primary key (pk)
-            pet = self.get_object()
-            
-            # Filter the PetAdoptionTable for the matching pet_id
-            adoption_details = PetAdoptionTable.objects.filter(pet_id=pet.id).first()
-
-            # Initialize response data
-            response_data = {
-                'pet': PendingPetForAdoptionSerializer(pet).data,
-                'adoption_details': None,
-                'user_details': None,
-                'follow_up_dates': None,  # Initialize follow_up_dates
-                'reports': []  # Initialize reports
-            }
-
-            # Check if adoption details exist
-            if adoption_details:
-                # Check the adoption_request_status
-                if adoption_details.adoption_request_status in ['approved', 'adopted']:
-                    # Retrieve user details using the user_id from adoption_details
-                    user = User.objects.filter(id=adoption_details.user_id).first()
-                    user_data = {
-                        'id': user.id,
-                        'first_name': user.first_name,
-                        'last_name': user.last_name,
-                        'email': user.email,
-                    } if user else None
-
-                    response_data['adoption_details'] = PetAdoptionTableSerializer(adoption_details).data
-                    response_data['user_details'] = user_data  # Include user details in the response
-
-                    # Fetch follow-up dates from TrackUpdateTable
-                    follow_up_records = TrackUpdateTable.objects.filter(
-                        pet_adoption_request_id=adoption_details.id
-                    ).order_by('followup_date')
-
-                    if follow_up_records.exists():
-                        # Get the first followup_date
-                        first_followup_date = follow_up_records.first().followup_date
-                        follow_up_dates = []
-
-                        # Generate follow-up dates for the next six months
-                        for i in range(6):
-                            follow_up_dates.append(first_followup_date + timedelta(days=i * 30))  # Approximate month as 30 days
-
-                        response_data['follow_up_dates'] = follow_up_dates
-                    else:
-                        response_data['follow_up_dates'] = 'No records yet'
-
-                    # Fetch reports related to the pet adoption
-                    # In your get() method, update the reports part to:
-                    reports = TrackUpdateTable.objects.filter(pet_adoption_request_id=adoption_details.id)
-                    response_data['reports'] = [
-                        {
-                            'id': report.id,
-                            'date': report.followup_date.strftime('%Y-%m-%d'),  # Ensure consistent date format
-                            'description': report.notes,
-                            'living_situation': report.living_situation,
-                            'housing_type': report.housing_type,
-                            'behavioral_changes': report.behavioral_changes,
-                            'health_issues': report.health_issues,
-                            'photos': report.photos.url if report.photos else None
-                        } for report in reports
-                    ]
-
-            logger.debug("Response Data: %s", response_data)  # Log the response data
-            return Response(response_data, status=status.HTTP_200_OK)
-
+            # Pet, approved adoption, adopter and reports in a constant number of queries,
+            # cached per pet until any of them changes
+            etag, response_data = get_pet_detail(pet_id)
         except PendingPetForAdoption.DoesNotExist:
             return Response({'error': 'Pet not found'}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logger.error("An error occurred: %s", str(e))
             return Response({'error': 'An unexpected error occurred'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        # Revisits send If-None-Match and get an empty 304 while nothing has changed
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is None:
+            response = Response(response_data, status=status.HTTP_200_OK)
+        else:
+            response = Response(status=not_modified.status_code)
+        response['ETag'] = etag
+        # Adopter contact details: clients may keep a copy but must revalidate it
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
 from rest_framework.permissions import AllowAny  # Import AllowAny
 class ReactCustomUserDetailView(generics.RetrieveUpdateAPIView):
     queryset = Admin.objects.all()
@@ -570,8 +605,10 @@ def react_add_report(request):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-class ReactTrackUpdateList(generics.ListAPIView):
+class ReactTrackUpdateList(FastReadMixin, generics.ListAPIView):
     serializer_class = TrackUpdateTableSerializer
+    read_serializer_class = TrackUpdateReadSerializer
+    values_serializer_class = TrackUpdateValuesSerializer
 
     def get_queryset(self):
         pet_adoption_request_id = self.request.query_params.get('pet_adoption_request_id', None)
@@ -618,58 +655,61 @@ def view_request(request, request_id):
         'request': req,
         'user_first_name': user_first_name,
         'user_last_name': user_last_name,
+        'idempotency_key': uuid.uuid4().hex,  # Lets a double-submitted status form apply once
     })
 
+# Statuses moderators may set (on one request or in bulk), and how many requests one bulk call may touch
+BULK_STATUSES = ('review', 'approved', 'rejected')
+BULK_STATUS_MAX_REQUESTS = 500
+
+@require_POST
+@login_required
+@admin_required
+@idempotent
 def update_status(request, request_id, new_status):
     # Get the request object or return a 404 if not found
     req = get_object_or_404(PetAdoptionTable, pk=request_id)
 
-    # Update the status of the request
-    req.adoption_request_status = new_status
-
-    # Set the approval date/time if the status is approved
-    if new_status == 'approved':
-        req.approval_date_time = timezone.now()  # Set current time as approval date
-        # Notify the user about the reporting requirement
-        message = "Your request for adoption has been approved. You need to report for 15 days starting from the approval date."
-        messages.info(request, message)  # Pass the message to the next view
-
-        # Create a notification for the user
-        Notification.objects.create(
-            user=req.user,  # Assuming you have a user field in your PetAdoptionTable
-            message=message,
-            created_at=timezone.now()
-        )
-
-        # Retrieve the pet_id from the request
-        pet_id = req.pet_id  # Assuming pet_id is a field in PetAdoptionTable
-
-        # Check if the pet exists in PendingPetForAdoption
-        pending_pet = PendingPetForAdoption.objects.filter(id=pet_id).first()
-        if pending_pet:
-            # Update the adoption status to indicate the pet is already adopted
-            pending_pet.adoption_status = 'Pet is already adopted'
-            pending_pet.save()  # Save the changes to the database
+    if new_status not in BULK_STATUSES:
+        messages.error(request, f"Unknown status '{new_status}'.")
+        return redirect('admin_adoption_request')
 
-        # Call the new function to update other requests
-        update_other_requests(pet_id)
+    # Same transition as the bulk endpoint: sets the approval date, marks the pet adopted,
+    # closes the other open requests for the pet and notifies the adopter
+    result = transition_requests([req.id], new_status)
 
-    elif new_status == 'rejected':
-        req.approval_date_time = None  # Clear approval date if rejected
-
-    # Save the changes to the PetAdoptionTable
-    req.save()
+    if req.id in result['skipped']:
+        messages.error(request, f"Request not updated: {result['skipped'][req.id]}.")
+    elif new_status == 'approved':
+        messages.info(request, APPROVAL_MESSAGE)  # Pass the message to the next view
 
     # Redirect to the view requests page or wherever you want to go after updating
     return redirect('admin_adoption_request')  # Make sure 'admin_adoption_request' is a valid URL name
 
-def update_other_requests(pet_id):
-    # Filter PetAdoptionTable for requests with the same pet_id and status 'pending' or 'deny'
-    other_requests = PetAdoptionTable.objects.filter(pet_id=pet_id, adoption_request_status__in=['pending', 'deny'])
-    for other_request in other_requests:
-        # Update the adoption status to indicate the pet is already adopted
-        other_request.adoption_request_status = 'Pet is already adopt'
-        other_request.save()  # Save the changes to the database
+@require_POST
+@login_required
+@admin_required
+@idempotent
+def bulk_update_status(request):
+    """
+    Apply one status to many adoption requests in a single transaction.
+    Body: {"request_ids": [1, 2, 3], "status": "approved"}; send an Idempotency-Key header to make retries safe
+    """
+    try:
+        data = json.loads(request.body)
+        request_ids = [int(request_id) for request_id in data['request_ids']]
+        new_status = data['status']
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+        return JsonResponse({'success': False, 'error': 'Expected {"request_ids": [...], "status": "..."}'}, status=400)
+
+    if new_status not in BULK_STATUSES:
+        return JsonResponse({'success': False, 'error': f"status must be one of {', '.join(BULK_STATUSES)}"}, status=400)
+    if not request_ids or len(request_ids) > BULK_STATUS_MAX_REQUESTS:
+        return JsonResponse({'success': False, 'error': f"Send between 1 and {BULK_STATUS_MAX_REQUESTS} request_ids"}, status=400)
+
+    result = transition_requests(request_ids, new_status)
+    logger.info(f"Bulk status '{new_status}' by {request.user}: {len(result['updated'])} updated")
+    return JsonResponse({'success': True, 'status': new_status, **result})
 
                                                    
 def admin_report_detail(request, report_id):
@@ -718,15 +758,14 @@ def admin_homepage(request):
     philippines_tz = pytz.timezone('Asia/Manila')
     philippines_time = timezone.now().astimezone(philippines_tz).strftime('%Y-%m-%d %H:%M:%S')
 
-    # Fetch unread notifications for the logged-in user
-    notifications = Notification.objects.filter(user=request.user, is_read=False)  # Get unread notifications
-    notifications_count = notifications.count()  # Count unread notifications
+    # Unread badge count from the per-user counter; the list itself loads when the bell is opened
+    notifications_count = get_unread_count(request.user)
 
     return render(request, 'admin_homepage.html', {
         'user': request.user,
         'philippines_time': philippines_time,
-        'notifications': notifications,  # Pass notifications to the template
         'notifications_count': notifications_count,  # Pass notifications count to the template
+        **get_dashboard_counts(),  # Pipeline counts by status (cached, see adoption/utils/dashboard.py)
     })
 
 def admin_signup(request):
@@ -769,12 +808,8 @@ def AdoptionDetailView(request, id):
             # Step 3: Get the track updates for the adoption using the adopter's id
             track_updates = TrackUpdateTable.objects.filter(pet_adoption_request_id=adopter.id)
 
-            # Step 4: Calculate the tracking period
-            tracking_period = []
-            for update in track_updates:
-                followup_date = update.followup_date
-                tracking_period.append(followup_date)
-                tracking_period.append(followup_date + datetime.timedelta(days=183))  # 6 months
+            # Step 4: The tracking period runs from the first to the last scheduled follow-up
+            tracking_period = schedule_span(adopter.id) or []
 
             # Render the template with the retrieved data
             return render(request, 'admin_adoption_detail_history.html', {
@@ -790,8 +825,8 @@ def AdoptionDetailView(request, id):
         return render(request, '404.html')  # Return a 404 page if no adoption is found
 
 def adopted_history(request):
-    # Query the PendingPetForAdoption model for pets with adoption_status 'Pet is already adopted'
-    adopted_pets_list = PendingPetForAdoption.objects.filter(adoption_status='Pet is already adopt')
+    # Query the PendingPetForAdoption model for pets with adoption_status 'adopted'
+    adopted_pets_list = PendingPetForAdoption.objects.filter(adoption_status=PetStatus.ADOPTED.code)
 
     # Get the IDs of the adopted pets
     adopted_pet_ids = adopted_pets_list.values_list('id', flat=True)  # This will give you a flat list of IDs
@@ -838,13 +873,11 @@ def user_login(request):
 @login_required
 def homepage(request):
     username = request.user.username if request.user.is_authenticated else None
-    notifications = Notification.objects.filter(user=request.user, is_read=False)
-    notifications_count = notifications.count()
+    notifications_count = get_unread_count(request.user)
     pets = get_approved_pets()
 
     return render(request, 'homepage.html', {
         'username': username,
-        'notifications': notifications,
         'notifications_count': notifications_count,
         'pets': pets,
     })
@@ -897,11 +930,8 @@ def add_pet(request):
             pending_pet.user = request.user  # Assign the user
             pending_pet.save()  # Save the instance to the database
 
-            # Create a notification for the admin (user with ID 10)
-            admin_user = User.objects.get(pk=10)  # Fetch the admin user
-            if admin_user:
-                notification_message = f"A new pet post for adoption has been submitted by {request.user.username}."
-                Notification.objects.create(user=admin_user, message=notification_message)
+            # Notify the admins about the new post
+            notify_admins(f"A new pet post for adoption has been submitted by {request.user.username}.")
 
             # Add a success message
             messages.success(request, 'Pet added successfully!')
@@ -931,16 +961,15 @@ def reportadopted_pets(request):
 def OwnerReportadopted_pets(request):
     # Retrieve adopted pets for the logged-in user
     adopted_pets = PendingPetForAdoption.objects.filter(
-        adoption_status__in=['Pet_is_already_adopt', 'Pet is already adopt'],
+        adoption_status=PetStatus.ADOPTED.code,
         user=request.user  # Check if the user ID matches
     )
 
     return render(request, 'owner_adopted_pets.html', {'adopted_pets': adopted_pets})
 
 
-@login_required
-def reportRequestpet_detail(request, pet_id):
-    # Get the pet object
+def render_report_calendar(request, pet_id, template_name):
+    """Follow-up report calendar for a pet's adoption; shared by the adopter and owner pages"""
     pet = get_object_or_404(PendingPetForAdoption, id=pet_id)
 
     # Filter the PetAdoptionTable for the given pet
@@ -950,74 +979,21 @@ def reportRequestpet_detail(request, pet_id):
         # Filter the TrackUpdateTable for the matching pet adoption request
         track_updates = TrackUpdateTable.objects.filter(pet_adoption_request=pet_adoption)
 
-        # Check if there are no track updates
-        if not track_updates.exists():
-            Notification.objects.create(user=request.user, message="No track updates found for this pet.")
-        
         # Determine the current month and year or use the provided month and year from the request
         current_month = int(request.GET.get('month', timezone.now().month))
         current_year = int(request.GET.get('year', timezone.now().year))
 
-        # Calculate the starting date for the tracking period
-        followup_dates = track_updates.values_list('followup_date', flat=True)
-        if followup_dates:
-            first_followup_date = min(followup_dates)
-            tracking_start_date = first_followup_date  # Just use the first follow-up date as the starting point
-        else:
-            tracking_start_date = timezone.now()  # Fallback if no follow-up dates
-
-        # Filter track updates for the selected month and year
-        filtered_updates = track_updates.filter(
-            followup_date__year=current_year,
-            followup_date__month=current_month
-        )
-
-        # Count the number of reports for the month
-        report_count = filtered_updates.count()
-
-        # Create a notification if reports are less than 2
-        if report_count < 2:
-            Notification.objects.create(user=request.user, message=f"Only {report_count} reports found for {pet.name} in {current_month}/{current_year}.")
-
-        # Create a structure to hold daily reports for the selected month
-        daily_reports = {}
-        for followup_date in filtered_updates.values_list('followup_date', flat=True).distinct():  # Use distinct to avoid duplicates
-            day = followup_date.day
-            if day not in daily_reports:
-                daily_reports[day] = []
-            
-            # Use filter instead of get to handle multiple reports
-            reports_for_date = filtered_updates.filter(followup_date=followup_date)
-            
-            # Add unique reports for the day
-            for report in reports_for_date:
-                if report not in daily_reports[day]:  # Check for uniqueness
-                    daily_reports[day].append(report)  # Add the report if it's not already in the list
-
-        # Calculate empty cells for the calendar
-        first_day_of_month = timezone.datetime(current_year, current_month, 1)
-        last_day_of_month = timezone.datetime(current_year, current_month, calendar.monthrange(current_year, current_month)[1])
-
-        # Calculate the number of empty cells before the first day of the month
-        empty_cells_before = (first_day_of_month.weekday() + 1) % 7  # Adjust for Sunday as the first day of the week
-        empty_cells_after = (6 - last_day_of_month.weekday())  # Calculate empty cells after the last day
-
-        # Prepare the monthly reports context
-        monthly_reports = {
-            'year': current_year,
-            'month': current_month,
-            'days_list': list(range(1, 32)),  # Days of the month
-            'daily_reports': daily_reports,
-            'empty_cells_before': [None] * empty_cells_before,  # Create a list of None for empty cells
-            'empty_cells_after': [None] * empty_cells_after,  # Create a list of None for empty cells
-            'tracking_start_date': tracking_start_date,  # Add tracking start date to context
-        }
+        # The month's reports grouped by day, cached until a report for this adoption changes.
+        # Adopters who fall behind are reminded by `manage.py check_followup_compliance`, not here
+        monthly_reports = dict(get_month_calendar(pet_adoption.id, current_year, current_month))
+        if monthly_reports['tracking_start_date'] is None:
+            monthly_reports['tracking_start_date'] = timezone.now()  # Fallback if no follow-up dates
 
     else:
         track_updates = []  # No adoption found
         monthly_reports = None
 
-    return render(request, 'reportRequest.html', {
+    return render(request, template_name, {
         'pet': pet,
         'pet_adoption': pet_adoption,
         'track_updates': track_updates,
@@ -1025,90 +1001,12 @@ def reportRequestpet_detail(request, pet_id):
     })
 
 @login_required
-def OwnerReportRequestpet_detail(request, pet_id):
-    # Get the pet object
-    pet = get_object_or_404(PendingPetForAdoption, id=pet_id)
-
-    # Filter the PetAdoptionTable for the given pet
-    pet_adoption = PetAdoptionTable.objects.filter(pet=pet).first()  # Get the first matching adoption
-
-    if pet_adoption:
-        # Filter the TrackUpdateTable for the matching pet adoption request
-        track_updates = TrackUpdateTable.objects.filter(pet_adoption_request=pet_adoption)
-
-        # Check if there are no track updates
-        if not track_updates.exists():
-            Notification.objects.create(user=request.user, message="No track updates found for this pet.")
-        
-        # Determine the current month and year or use the provided month and year from the request
-        current_month = int(request.GET.get('month', timezone.now().month))
-        current_year = int(request.GET.get('year', timezone.now().year))
-
-        # Calculate the starting date for the tracking period
-        followup_dates = track_updates.values_list('followup_date', flat=True)
-        if followup_dates:
-            first_followup_date = min(followup_dates)
-            tracking_start_date = first_followup_date  # Just use the first follow-up date as the starting point
-        else:
-            tracking_start_date = timezone.now()  # Fallback if no follow-up dates
-
-        # Filter track updates for the selected month and year
-        filtered_updates = track_updates.filter(
-            followup_date__year=current_year,
-            followup_date__month=current_month
-        )
-
-        # Count the number of reports for the month
-        report_count = filtered_updates.count()
-
-        # Create a notification if reports are less than 2
-        if report_count < 2:
-            Notification.objects.create(user=request.user, message=f"Only {report_count} reports found for {pet.name} in {current_month}/{current_year}.")
-
-        # Create a structure to hold daily reports for the selected month
-        daily_reports = {}
-        for followup_date in filtered_updates.values_list('followup_date', flat=True).distinct():  # Use distinct to avoid duplicates
-            day = followup_date.day
-            if day not in daily_reports:
-                daily_reports[day] = []
-            
-            # Use filter instead of get to handle multiple reports
-            reports_for_date = filtered_updates.filter(followup_date=followup_date)
-            
-            # Add unique reports for the day
-            for report in reports_for_date:
-                if report not in daily_reports[day]:  # Check for uniqueness
-                    daily_reports[day].append(report)  # Add the report if it's not already in the list
-
-        # Calculate empty cells for the calendar
-        first_day_of_month = timezone.datetime(current_year, current_month, 1)
-        last_day_of_month = timezone.datetime(current_year, current_month, calendar.monthrange(current_year, current_month)[1])
-
-        # Calculate the number of empty cells before the first day of the month
-        empty_cells_before = (first_day_of_month.weekday() + 1) % 7  # Adjust for Sunday as the first day of the week
-        empty_cells_after = (6 - last_day_of_month.weekday())  # Calculate empty cells after the last day
-
-        # Prepare the monthly reports context
-        monthly_reports = {
-            'year': current_year,
-            'month': current_month,
-            'days_list': list(range(1, 32)),  # Days of the month
-            'daily_reports': daily_reports,
-            'empty_cells_before': [None] * empty_cells_before,  # Create a list of None for empty cells
-            'empty_cells_after': [None] * empty_cells_after,  # Create a list of None for empty cells
-            'tracking_start_date': tracking_start_date,  # Add tracking start date to context
-        }
-
-    else:
-        track_updates = []  # No adoption found
-        monthly_reports = None
+def reportRequestpet_detail(request, pet_id):
+    return render_report_calendar(request, pet_id, 'reportRequest.html')
 
-    return render(request, 'OwnerReportRequest.html', {
-        'pet': pet,
-        'pet_adoption': pet_adoption,
-        'track_updates': track_updates,
-        'monthly_reports': monthly_reports,
-    })
+@login_required
+def OwnerReportRequestpet_detail(request, pet_id):
+    return render_report_calendar(request, pet_id, 'OwnerReportRequest.html')
 
 def report_detail(request, id):
     # Assuming you have an adoption_id field in your TrackUpdateTable model
@@ -1165,10 +1063,37 @@ from datetime import timedelta
 @login_required
 def mark_notifications_read(request):
     if request.method == 'POST':
-        Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
-        return JsonResponse({'status': 'success'})
+        # Only the notifications the dropdown displayed; older unread ones stay unread
+        notification_ids = [int(i) for i in request.POST.getlist('ids') if i.isdigit()]
+        marked, unread = mark_read(request.user, notification_ids)
+        return JsonResponse({'status': 'success', 'marked': marked, 'notifications_count': unread})
     return JsonResponse({'status': 'error'}, status=400)
 
+@login_required
+def notification_list(request):
+    # Unread notifications for the bell dropdown, fetched only when it is opened
+    return JsonResponse({
+        'notifications': unread_notifications(request.user),
+        'notifications_count': get_unread_count(request.user),
+    })
+
+async def notification_stream(request):
+    """Server-Sent Events feed of new notifications and unread count changes for the bell"""
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI an open stream would pin a worker; 204 tells EventSource not to reconnect
+        return HttpResponse(status=204)
+    user = await sync_to_async(lambda: request.user if request.user.is_authenticated else None)()
+    if user is None:
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(
+        user_event_stream(user.pk, lambda: get_unread_count(user)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Don't let a reverse proxy buffer the stream
+    return response
+
 
 def landing(request):
     # Get or create the page view counter
@@ -1247,23 +1172,6 @@ def send_notification(request):
 def admin_adoption_request(request):
     return render(request, 'admin_adoption_request.html')
 
-def admin_view_all_requests(request):
-    # Fetch all adoption requests
-    adoption_requests = PetAdoptionTable.objects.all()
-    
-    request_list = []
-    for req in adoption_requests:
-        pet = PendingPetForAdoption.objects.get(id=req.pet_id)
-        request_list.append({
-            'id': req.id,
-            'pet_name': pet.name,
-            'pet_animal_type': pet.animal_type,
-            'adoption_request_status': req.adoption_request_status,
-            'request_date':req.request_date,
-        })
-    
-    return render(request, 'admin_view_all_requests.html', {'requests': request_list})
-
 def admin_view_adoption_request(request, request_id):
     # Retrieve the adoption request using the provided request_id
     req = get_object_or_404(PetAdoptionTable, pk=request_id)
@@ -1277,75 +1185,9 @@ def admin_view_adoption_request(request, request_id):
         'request': req,
         'user_first_name': user_first_name,
         'user_last_name': user_last_name,
+        'idempotency_key': uuid.uuid4().hex,  # Lets a double-submitted status form apply once
     })
 
-def admin_view_pending_requests(request):
-    # Fetch only adoption requests with status 'pending'
-    adoption_requests = PetAdoptionTable.objects.filter(adoption_request_status='pending')
-    
-    request_list = []
-    for req in adoption_requests:
-        pet = get_object_or_404(PendingPetForAdoption, id=req.pet_id)  # Use get_object_or_404 for safety
-        request_list.append({
-            'id': req.id,
-            'pet_name': pet.name,
-            'pet_animal_type': pet.animal_type,
-            'adoption_request_status': req.adoption_request_status,
-            'request_date':req.request_date,
-        })
-    
-    return render(request, 'admin_view_pending_list.html', {'requests': request_list})
-
-def admin_view_review_list(request):
-    # Fetch only adoption requests with status 'pending'
-    adoption_requests = PetAdoptionTable.objects.filter(adoption_request_status='review')
-    
-    request_list = []
-    for req in adoption_requests:
-        pet = get_object_or_404(PendingPetForAdoption, id=req.pet_id)  # Use get_object_or_404 for safety
-        request_list.append({
-            'id': req.id,
-            'pet_name': pet.name,
-            'pet_animal_type': pet.animal_type,
-            'adoption_request_status': req.adoption_request_status,
-            'request_date':req.request_date,
-        })
-    
-    return render(request, 'admin_view_review_list.html', {'requests': request_list})
-def admin_view_approved_list(request):
-    # Fetch only adoption requests with status 'pending'
-    adoption_requests = PetAdoptionTable.objects.filter(adoption_request_status='approved')
-    
-    request_list = []
-    for req in adoption_requests:
-        pet = get_object_or_404(PendingPetForAdoption, id=req.pet_id)  # Use get_object_or_404 for safety
-        request_list.append({
-            'id': req.id,
-            'pet_name': pet.name,
-            'pet_animal_type': pet.animal_type,
-            'adoption_request_status': req.adoption_request_status,
-            'request_date':req.request_date,
-        })
-    
-    return render(request, 'admin_view_approved_list.html', {'requests': request_list})
-
-def admin_view_rejected_list(request):
-    # Fetch only adoption requests with status 'pending'
-    adoption_requests = PetAdoptionTable.objects.filter(adoption_request_status='rejected')
-    
-    request_list = []
-    for req in adoption_requests:
-        pet = get_object_or_404(PendingPetForAdoption, id=req.pet_id)  # Use get_object_or_404 for safety
-        request_list.append({
-            'id': req.id,
-            'pet_name': pet.name,
-            'pet_animal_type': pet.animal_type,
-            'adoption_request_status': req.adoption_request_status,
-            'request_date':req.request_date,
-        })
-    
-    return render(request, 'admin_view_rejected_list.html', {'requests': request_list})
-
 @require_POST
 @csrf_exempt
 def track_pwa_install(request):
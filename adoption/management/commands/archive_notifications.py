@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from adoption.utils.notification_retention import DEFAULT_BATCH_SIZE, archive_read_notifications, get_retention_days
+
+
+class Command(BaseCommand):
+    help = "Move read notifications older than the retention window into NotificationArchive, in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Retention window in days (default: NOTIFICATION_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='Notifications moved per transaction')
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='Stop after this many batches; run again later to continue')
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help='Seconds to sleep between batches')
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else get_retention_days()
+        archived = archive_read_notifications(
+            older_than_days=days,
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+            pause=options['pause'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} read notifications older than {days} days"
+        ))
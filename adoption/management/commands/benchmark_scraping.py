@@ -0,0 +1,129 @@
+import os
+import re
+import time
+
+from bs4 import BeautifulSoup
+from django.core.management.base import BaseCommand, CommandError
+
+from adoption.utils.web_scraping import (
+    ADOPT_A_PET_CARD_SELECTORS,
+    HTML_PARSER,
+    PETFINDER_CARD_SELECTORS,
+    PetCardExtractor,
+    card_extractor,
+    find_pet_cards,
+)
+
+# Saved search result pages, also used by the scraping tests
+FIXTURE_PAGES = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'fixtures', 'web_search')
+PAGE_SELECTORS = {
+    'petfinder_search.html': PETFINDER_CARD_SELECTORS,
+    'adoptapet_search.html': ADOPT_A_PET_CARD_SELECTORS,
+}
+
+
+def _best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def full_page_cards(markup, selectors, limit=5):
+    """How cards were found before: the whole page through html.parser, then find_all fallbacks"""
+    soup = BeautifulSoup(markup, 'html.parser')
+    for tag, attrs in selectors:
+        cards = soup.find_all(tag, attrs=attrs, limit=limit)
+        if cards:
+            return cards
+    return []
+
+
+def per_attribute_extract(text):
+    """How card attributes were extracted before: each one lowercases and rescans the text, patterns uncompiled"""
+    def first_keyword(choices):
+        lowered = text.lower()
+        for value, words in choices:
+            if any(word in lowered for word in words):
+                return value
+        return None
+
+    def numeric_age():
+        for pattern in (r'(\d+)\s*(?:year|yr)s?\s*old', r'(\d+)\s*(?:month|mo)s?\s*old', r'age\s*:?\s*(\d+)'):
+            match = re.search(pattern, text.lower())
+            if match:
+                return f"{match.group(1)} years old"
+        return 'Unknown'
+
+    def location():
+        match = re.search(r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*),\s*([A-Z]{2})', text)
+        if match:
+            return f"{match.group(1)}, {match.group(2)}"
+        match = re.search(r'\b([A-Z]{2})\b', text)
+        return match.group(1) if match else 'Unknown'
+
+    breed = first_keyword([(breed.title(), [breed]) for breed in PetCardExtractor.BREEDS])
+    return {
+        'animal_type': first_keyword(PetCardExtractor.ANIMAL_TYPES) or 'Unknown',
+        'breed': breed or ('Mixed Breed' if 'mix' in text.lower() else 'Unknown'),
+        'color': first_keyword([(color.title(), [color]) for color in PetCardExtractor.COLORS]) or 'Unknown',
+        'age': first_keyword(PetCardExtractor.AGE_TERMS) or numeric_age(),
+        'location': location(),
+        'description': re.sub(r'[^\w\s.,!?-]', '', re.sub(r'\s+', ' ', text).strip()),
+    }
+
+
+class Command(BaseCommand):
+    help = ("Time finding pet cards in the saved search result pages (whole-page html.parser against the card "
+            "strainer) and extracting their attributes (one pass against one scan per attribute)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Runs per variant (the fastest is reported)')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        if HTML_PARSER != 'lxml':
+            self.stdout.write("lxml is not installed; the strained parse falls back to html.parser")
+
+        before_total = after_total = 0
+        card_texts = []
+        for page, selectors in PAGE_SELECTORS.items():
+            path = os.path.join(FIXTURE_PAGES, page)
+            if not os.path.exists(path):
+                raise CommandError(f"Missing fixture page {path}")
+            with open(path, 'rb') as f:
+                markup = f.read()
+
+            before, old_cards = _best_of(repeat, lambda: full_page_cards(markup, selectors))
+            after, new_cards = _best_of(repeat, lambda: find_pet_cards(markup, selectors))
+            before_total += before
+            after_total += after
+            card_texts.extend(card.get_text() for card in find_pet_cards(markup, selectors, limit=None))
+            same = [card.get_text() for card in old_cards] == [card.get_text() for card in new_cards]
+            self.stdout.write(
+                f"  {page:<28} {len(markup) / 1024:6.0f} KB  {before * 1000:7.2f} ms -> {after * 1000:7.2f} ms"
+                f"  ({len(new_cards)} cards, {'same cards' if same else 'CARDS DIFFER'})"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Card strainer ({HTML_PARSER}): {before_total / after_total:.1f}x faster than parsing whole pages with html.parser"
+        ))
+
+        # Every card is run many times per timing so the per-card figure isn't timer noise
+        rounds = 200
+
+        def extract_all(extract):
+            return [extract(text) for text in card_texts * rounds]
+
+        before, _ = _best_of(repeat, lambda: extract_all(per_attribute_extract))
+        after, _ = _best_of(repeat, lambda: extract_all(card_extractor.extract))
+        per_card = 1e6 / (len(card_texts) * rounds)
+        self.stdout.write(
+            f"  Card attributes, {len(card_texts)} cards:  {before * per_card:5.1f} us -> {after * per_card:5.1f} us per card"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Single-pass extractor: {before / after:.1f}x faster than one scan per attribute"
+        ))
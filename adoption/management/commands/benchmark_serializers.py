@@ -0,0 +1,95 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from adoption.models import PendingPetForAdoption
+from adoption.serializers import PendingPetForAdoptionSerializer, PendingPetReadSerializer, PendingPetValuesSerializer
+from adoption.utils.renderers import ORJSONRenderer, orjson
+
+
+def _best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+class Command(BaseCommand):
+    help = "Time serializing and rendering a list of pets with the old and the fast serializers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pets', type=int, default=1000,
+                            help='Pets per list; missing ones are copied from existing pets and rolled back afterwards')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Runs per variant (the fastest is reported)')
+
+    def handle(self, *args, **options):
+        count = options['pets']
+        host = next((host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost')
+        request = Request(APIRequestFactory().get('/api/pending-pets/', HTTP_HOST=host))
+        context = {'request': request}
+
+        with transaction.atomic():
+            existing = list(PendingPetForAdoption.objects.order_by('id')[:count])
+            if not existing:
+                raise CommandError("Need at least one pet to copy")
+            # bulk_create sends no signals, and everything is rolled back below
+            copies = []
+            for i in range(count - len(existing)):
+                pet = existing[i % len(existing)]
+                copies.append(PendingPetForAdoption(**{
+                    field.attname: getattr(pet, field.attname)
+                    for field in PendingPetForAdoption._meta.concrete_fields if not field.primary_key
+                }))
+            PendingPetForAdoption.objects.bulk_create(copies, batch_size=500)
+            queryset = PendingPetForAdoption.objects.order_by('id')[:count]
+
+            def fast_rows():
+                rows = PendingPetValuesSerializer(context=context)
+                return rows.to_representation(rows.values(queryset))
+
+            variants = [
+                ("ModelSerializer '__all__' (before)", lambda: PendingPetForAdoptionSerializer(queryset, many=True, context=context).data),
+                ('Read-only serializer, explicit fields', lambda: PendingPetReadSerializer(queryset, many=True, context=context).data),
+                ('values() fast path', fast_rows),
+            ]
+            results = []
+            for label, serialize in variants:
+                seconds, data = _best_of(options['repeat'], serialize)
+                results.append((label, seconds, data))
+            transaction.set_rollback(True)
+
+        baseline = json.loads(JSONRenderer().render(results[0][2]))
+        scale = 1000 / count
+        self.stdout.write(f"Serializing {count} pets, fastest of {options['repeat']} runs, per 1,000 pets:")
+        for label, seconds, data in results:
+            same = 'same output' if json.loads(JSONRenderer().render(data)) == baseline else 'OUTPUT DIFFERS'
+            self.stdout.write(f"  {label:<40} {seconds * 1000 * scale:8.1f} ms  ({same})")
+
+        data = results[-1][2]
+        renderers = [('JSONRenderer (before)', JSONRenderer())]
+        if orjson is not None:
+            renderers.append(('ORJSONRenderer', ORJSONRenderer()))
+        else:
+            self.stdout.write("orjson is not installed; ORJSONRenderer falls back to JSONRenderer")
+        self.stdout.write("Rendering the list to JSON, per 1,000 pets:")
+        rendered = []
+        for label, renderer in renderers:
+            seconds, body = _best_of(options['repeat'], lambda: renderer.render(data, 'application/json', {}))
+            rendered.append(body)
+            self.stdout.write(f"  {label:<40} {seconds * 1000 * scale:8.1f} ms  ({len(body) / 1024:,.0f} KB)")
+        if len(rendered) > 1 and json.loads(rendered[0]) != json.loads(rendered[1]):
+            self.stdout.write(self.style.ERROR("ORJSONRenderer output differs from JSONRenderer's"))
+
+        before, after = results[0][1], results[-1][1]
+        self.stdout.write(self.style.SUCCESS(
+            f"values() fast path: {before / after:.1f}x faster than the '__all__' ModelSerializer"
+        ))
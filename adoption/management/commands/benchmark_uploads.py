@@ -0,0 +1,112 @@
+import os
+import time
+import tracemalloc
+from io import BytesIO
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.core.management.base import BaseCommand
+from django.http.multipartparser import MultiPartParser
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from PIL import Image
+
+from adoption.utils.image_derivatives import DERIVATIVE_SIZES
+from adoption.utils.uploads import StreamingUploadHandler, UploadImageFormField
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def _sample_paths(paths):
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for name in sorted(os.listdir(path)) if os.path.isdir(path) else []:
+            # Skip the resized copies written by build_image_derivatives
+            if name.lower().endswith(IMAGE_EXTENSIONS) and not any(f".{size}." in name for size in DERIVATIVE_SIZES):
+                yield os.path.join(path, name)
+
+
+def _phone_photo(index):
+    """A 12 MP camera-style JPEG with EXIF orientation and GPS-like metadata"""
+    rng = np.random.default_rng(index)
+    noise = Image.fromarray(rng.integers(0, 256, (378, 504, 3), dtype=np.uint8))
+    photo = noise.resize((4032, 3024), Image.BICUBIC)
+    exif = Image.Exif()
+    exif[0x010F] = 'PhoneMaker'
+    exif[0x0112] = 6
+    buffer = BytesIO()
+    photo.save(buffer, 'JPEG', quality=92, exif=exif)
+    return f"phone_{index}.jpg", buffer.getvalue()
+
+
+def _upload(name, data, handlers):
+    """Parse a one-file multipart body and validate it like a form's ImageField; (stored bytes, peak bytes, seconds)"""
+    body = encode_multipart(BOUNDARY, {'photos': SimpleUploadedFile(name, data, 'image/jpeg')})
+    meta = {'CONTENT_TYPE': MULTIPART_CONTENT, 'CONTENT_LENGTH': str(len(body))}
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    upload = MultiPartParser(meta, BytesIO(body), handlers).parse()[1]['photos']
+    try:
+        UploadImageFormField().clean(upload)
+    except ValidationError:
+        pass
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    stored = upload.size
+    upload.close()
+    return stored, peak, elapsed
+
+
+class Command(BaseCommand):
+    help = "Compare Django's default upload handlers with StreamingUploadHandler on sample images"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*',
+                            help='Image files or directories (default: the pet and report photo folders)')
+        parser.add_argument('--phone-photos', type=int, default=2,
+                            help='Also upload this many generated 12 MP camera photos')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or [
+            os.path.join(settings.MEDIA_ROOT, 'pics'),
+            os.path.join(settings.MEDIA_ROOT, 'track_updates_photos'),
+        ]
+        samples = []
+        for path in _sample_paths(paths):
+            with open(path, 'rb') as f:
+                samples.append((os.path.basename(path), f.read()))
+        samples.extend(_phone_photo(index) for index in range(options['phone_photos']))
+        if not samples:
+            self.stdout.write("No sample images found")
+            return
+
+        kb = lambda n: f"{n / 1024:,.0f}"
+        self.stdout.write(f"{'image':<40} {'sent KB':>9} {'stored KB':>19} {'peak KB':>19} {'ms':>13}")
+        totals = [0] * 5
+        worst = [0, 0]
+        tracemalloc.start()
+        try:
+            for name, data in samples:
+                default = _upload(name, data, [MemoryFileUploadHandler(), TemporaryFileUploadHandler()])
+                streamed = _upload(name, data, [StreamingUploadHandler()])
+                row = (len(data),) + tuple(value for pair in zip(default, streamed) for value in pair)
+                totals = [total + value for total, value in zip(totals, row[:5])]
+                worst = [max(worst[0], row[3]), max(worst[1], row[4])]
+                self.stdout.write(
+                    f"{name[:40]:<40} {kb(row[0]):>9} {kb(row[1]):>9} -> {kb(row[2]):>6} "
+                    f"{kb(row[3]):>9} -> {kb(row[4]):>6} {row[5] * 1000:>6.0f} -> {row[6] * 1000:>4.0f}"
+                )
+        finally:
+            tracemalloc.stop()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(samples)} uploads, {kb(totals[0])} KB sent: stored {kb(totals[1])} -> {kb(totals[2])} KB, "
+            f"peak per upload {kb(totals[3] / len(samples))} -> {kb(totals[4] / len(samples))} KB on average, "
+            f"{kb(worst[0])} -> {kb(worst[1])} KB at worst"
+        ))
+        self.stdout.write("Peak is what tracemalloc sees (request buffers and copies); Pillow's decoder memory isn't traced.")
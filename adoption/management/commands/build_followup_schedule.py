@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from adoption.utils.followup_schedule import backfill_followup_schedules
+
+
+class Command(BaseCommand):
+    help = "Create follow-up schedules for approved adoptions that don't have one (safe to re-run)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Adoptions scheduled per transaction')
+
+    def handle(self, *args, **options):
+        created = backfill_followup_schedules(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Scheduled follow-ups for {created} adoptions"))
@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+
+from adoption.models import PendingPetForAdoption, TrackUpdateTable
+from adoption.utils.image_derivatives import generate_derivatives
+
+
+class Command(BaseCommand):
+    help = "Write thumbnail, card and full-size WebP/JPEG copies of pet and report photos (safe to re-run)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Images resized in parallel')
+        parser.add_argument('--force', action='store_true',
+                            help='Rewrite derivatives that already exist')
+
+    def handle(self, *args, **options):
+        images = []
+        for model, field_name in ((PendingPetForAdoption, 'img'), (TrackUpdateTable, 'photos')):
+            storage = model._meta.get_field(field_name).storage
+            names = (
+                model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                .order_by().values_list(field_name, flat=True).distinct()
+            )
+            images.extend((storage, name) for name in names)
+
+        written = skipped = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {
+                executor.submit(generate_derivatives, storage, name, options['force']): name
+                for storage, name in images
+            }
+            for future in as_completed(futures):
+                try:
+                    if future.result():
+                        written += 1
+                    else:
+                        skipped += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"{futures[future]}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Resized {written} images ({skipped} already done, {failed} failed)"
+        ))
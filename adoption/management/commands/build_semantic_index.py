@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from adoption.models import PendingPetForAdoption
+from adoption.utils.semantic_search import INDEXED_FIELDS, get_index_dir, rebuild_semantic_index
+
+
+class Command(BaseCommand):
+    help = "Build the offline LSA semantic index over pet descriptions (additional_details)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--components', type=int, default=100,
+                            help='Number of latent dimensions kept by the truncated SVD')
+
+    def handle(self, *args, **options):
+        pets = PendingPetForAdoption.objects.only('id', *INDEXED_FIELDS)
+        index = rebuild_semantic_index(pets.iterator(), n_components=options['components'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {len(index.pet_ids)} pets into {get_index_dir()}"
+        ))
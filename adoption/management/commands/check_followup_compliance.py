@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from adoption.utils.followup_compliance import previous_month, send_compliance_reminders
+
+
+class Command(BaseCommand):
+    help = "Remind adopters who missed scheduled follow-up reports in a month (run daily or monthly from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', default=None,
+                            help='Month to check as YYYY-MM (default: last month)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='List the adoptions that are behind without notifying anyone')
+
+    def handle(self, *args, **options):
+        if options['month']:
+            try:
+                period = datetime.strptime(options['month'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError(f"--month must look like 2025-01, got {options['month']!r}")
+        else:
+            period = previous_month()
+
+        behind = send_compliance_reminders(period, dry_run=options['dry_run'])
+        for row in behind:
+            self.stdout.write(f"  adoption {row['id']} ({row['pet__name']}): {row['owed']} missed, {row['period_reports']} reports filed")
+        verb = 'Would remind' if options['dry_run'] else 'Reminded'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(behind)} adopters for {period:%Y-%m}"))
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from adoption.utils.media_blobs import (
+    COLLECT_BATCH_SIZE,
+    ORPHAN_GRACE_PERIOD,
+    collect_orphaned_blobs,
+    recount_blob_references,
+)
+
+
+class Command(BaseCommand):
+    help = "Delete uploaded files no pet, report or adoption request uses any more (run daily from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=ORPHAN_GRACE_PERIOD.total_seconds() / 3600,
+                            help='Keep unreferenced files at least this long')
+        parser.add_argument('--batch-size', type=int, default=COLLECT_BATCH_SIZE,
+                            help='Blobs checked per transaction')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report what would be deleted without deleting anything')
+
+    def handle(self, *args, **options):
+        if not options['dry_run']:
+            corrected = recount_blob_references()
+            if corrected:
+                self.stdout.write(f"Corrected {corrected} reference counts")
+        deleted, freed = collect_orphaned_blobs(
+            grace_period=timedelta(hours=options['grace_hours']),
+            dry_run=options['dry_run'],
+            batch_size=options['batch_size'],
+        )
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {deleted} unreferenced files ({freed / 1024:,.0f} KB)"))
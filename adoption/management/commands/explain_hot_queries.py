@@ -0,0 +1,69 @@
+import re
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from adoption.models import Notification, PendingPetForAdoption, PetAdoptionTable, TrackUpdateTable
+from adoption.utils.followup_schedule import adoptions_owing, followups_due
+from adoption.utils.statuses import LISTED_PET_STATUSES, OPEN_REQUEST_STATUSES
+
+# The filters behind the main views and APIs, each expected to be served by an index
+HOT_QUERIES = [
+    ('Adopted pets', lambda: PendingPetForAdoption.objects.filter(adoption_status='adopted')),
+    ('Public pet listing', lambda: PendingPetForAdoption.objects.filter(adoption_status='approved').order_by('-created_at')),
+    ("A user's pets by status", lambda: PendingPetForAdoption.objects.filter(user_id=1, adoption_status__in=LISTED_PET_STATUSES)),
+    ('Open requests for a pet', lambda: PetAdoptionTable.objects.filter(pet_id=1, adoption_request_status__in=OPEN_REQUEST_STATUSES)),
+    ('Admin requests by status', lambda: PetAdoptionTable.objects.filter(adoption_request_status='pending').order_by('-request_date')),
+    ('Follow-up reports for a month', lambda: TrackUpdateTable.objects.filter(
+        pet_adoption_request_id=1, followup_date__range=(date(2025, 1, 1), date(2025, 1, 31)))),
+    ('Follow-ups due this week', lambda: followups_due(date(2025, 1, 6), date(2025, 1, 12))),
+    ('Reports due this month', lambda: adoptions_owing(date(2025, 1, 1), date(2025, 1, 31))),
+    ('Unread notifications', lambda: Notification.objects.filter(user_id=1, is_read=False).order_by('-created_at')),
+]
+
+# Plan lines that mean a full table scan, per backend
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (\w+)(?!.*\bINDEX\b)'),
+    'postgresql': re.compile(r'\bSeq Scan on (\w+)'),
+    'mysql': re.compile(r'\btype: ALL\b|"access_type": "ALL"'),
+}
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot queries and report any that fall back to a full table scan"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fail-on-scan', action='store_true',
+                            help='Exit with an error if any hot query plans a full table scan (for CI)')
+        parser.add_argument('--verbose-plans', action='store_true',
+                            help='Print the full plan for every query')
+
+    def handle(self, *args, **options):
+        pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f"Don't know how to read {connection.vendor} query plans")
+
+        scans = []
+        for label, build_query in HOT_QUERIES:
+            plan = self.explain(build_query())
+            if pattern.search(plan):
+                scans.append(label)
+                self.stdout.write(self.style.WARNING(f"FULL SCAN  {label}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"index      {label}"))
+            if options['verbose_plans'] or pattern.search(plan):
+                self.stdout.write('    ' + plan.replace('\n', '\n    '))
+
+        if scans and options['fail_on_scan']:
+            raise CommandError(f"{len(scans)} hot queries plan a full table scan: {', '.join(scans)}")
+
+    def explain(self, queryset):
+        if connection.vendor != 'postgresql':
+            return queryset.explain()
+        # On small tables PostgreSQL rightly prefers a sequential scan; disabling it for
+        # this transaction asks instead whether a usable index exists at all
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.explain()
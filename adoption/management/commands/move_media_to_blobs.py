@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from adoption.utils.media_blobs import move_legacy_files
+
+
+class Command(BaseCommand):
+    help = "Re-store uploads saved before content-addressed storage as blobs, merging identical files (run once by hand; a re-run finds nothing to move)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Hash the files and report the savings without moving anything')
+
+    def handle(self, *args, **options):
+        summary = move_legacy_files(dry_run=options['dry_run'])
+        if summary['missing']:
+            self.stdout.write(self.style.WARNING(f"{summary['missing']} files referenced by rows are missing on disk"))
+        verb = 'Would move' if options['dry_run'] else 'Moved'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {summary['moved']} files into {summary['blobs']} blobs: "
+            f"{summary['bytes_before'] / 1024:,.0f} KB -> {summary['bytes_after'] / 1024:,.0f} KB"
+        ))
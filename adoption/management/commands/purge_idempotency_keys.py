@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from adoption.utils.idempotency import IDEMPOTENCY_TTL, purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = "Delete stored idempotency keys and responses past their replay window (run daily from cron)"
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_keys()
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted} idempotency keys older than {IDEMPOTENCY_TTL}"
+        ))
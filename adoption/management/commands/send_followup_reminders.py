@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from adoption.utils.followup_schedule import (
+    REMINDER_BATCH_SIZE,
+    REMINDER_LEAD_DAYS,
+    REMINDER_OVERDUE_DAYS,
+    send_due_reminders,
+)
+
+
+class Command(BaseCommand):
+    help = "Remind adopters about follow-up reports coming due or just missed (run daily from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lead-days', type=int, default=REMINDER_LEAD_DAYS,
+                            help='Remind this many days before a due date')
+        parser.add_argument('--overdue-days', type=int, default=REMINDER_OVERDUE_DAYS,
+                            help='Still remind about follow-ups missed within this many days')
+        parser.add_argument('--batch-size', type=int, default=REMINDER_BATCH_SIZE,
+                            help='Reminders sent per transaction')
+
+    def handle(self, *args, **options):
+        sent = send_due_reminders(
+            lead_days=options['lead_days'],
+            overdue_days=options['overdue_days'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} follow-up reminders"))
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_unread_counts(apps, schema_editor):
+    Notification = apps.get_model('adoption', 'Notification')
+    NotificationCounter = apps.get_model('adoption', 'NotificationCounter')
+    unread = Notification.objects.filter(is_read=False).values('user_id').annotate(total=models.Count('id')).order_by()
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=row['user_id'], unread_count=row['total']) for row in unread],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('adoption', '0011_remove_pendingpetforadoption_image_features'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notification_counter', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adoption', '0013_notification_retention'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pendingpetforadoption',
+            index=models.Index(fields=['adoption_status', '-created_at'], name='pet_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pendingpetforadoption',
+            index=models.Index(fields=['user', 'adoption_status'], name='pet_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petadoptiontable',
+            index=models.Index(fields=['pet', 'adoption_request_status'], name='request_pet_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petadoptiontable',
+            index=models.Index(fields=['adoption_request_status', 'request_date'], name='request_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trackupdatetable',
+            index=models.Index(fields=['pet_adoption_request', 'followup_date'], name='track_request_date_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+from django.db import migrations
+
+# Frozen copy of adoption.utils.statuses as of this migration: every spelling found
+# in the status columns, mapped to the integer code the next migration stores
+PET_STATUS_CODES = {
+    'pending': 1,
+    'approved': 2,
+    'adopted': 3,
+    'Pet is already adopted': 3,
+    'Pet is already adopt': 3,
+    'Pet_is_already_adopt': 3,
+}
+REQUEST_STATUS_CODES = {
+    'pending': 1,
+    'review': 2,
+    'approved': 3,
+    'adopted': 3,
+    'rejected': 4,
+    'deny': 4,
+    'superseded': 5,
+    'pet_is_adopted': 5,
+    'Pet is already adopt': 5,
+    'pet_deleted': 6,
+    'Pet is deleted': 6,
+}
+
+# What each code is written back as when migrating backwards
+PET_STATUS_NAMES = {1: 'pending', 2: 'approved', 3: 'Pet is already adopted'}
+REQUEST_STATUS_NAMES = {1: 'pending', 2: 'review', 3: 'approved', 4: 'rejected', 5: 'Pet is already adopt', 6: 'Pet is deleted'}
+
+STATUS_COLUMNS = [
+    ('PendingPetForAdoption', 'adoption_status', PET_STATUS_CODES, PET_STATUS_NAMES),
+    ('PetAdoptionTable', 'adoption_request_status', REQUEST_STATUS_CODES, REQUEST_STATUS_NAMES),
+]
+
+
+def to_codes(apps, schema_editor):
+    for model_name, field, codes, _ in STATUS_COLUMNS:
+        model = apps.get_model('adoption', model_name)
+        found = set(model.objects.values_list(field, flat=True).distinct())
+        unknown = found - set(codes)
+        if unknown:
+            raise ValueError(
+                f"{model_name}.{field} has statuses this migration can't map: {sorted(unknown)!r}; "
+                f"fix those rows (or add them to the mapping) and migrate again"
+            )
+        # One UPDATE per spelling; the column is still text, holding the code as digits
+        # until 0016 turns it into an integer
+        for value in found:
+            model.objects.filter(**{field: value}).update(**{field: str(codes[value])})
+
+
+def to_names(apps, schema_editor):
+    for model_name, field, _, names in STATUS_COLUMNS:
+        model = apps.get_model('adoption', model_name)
+        for code, name in names.items():
+            model.objects.filter(**{field: str(code)}).update(**{field: name})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adoption', '0014_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(to_codes, to_names),
+    ]
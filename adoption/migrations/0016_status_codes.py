@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-19 04:00
+
+import adoption.utils.statuses
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adoption', '0015_normalize_statuses'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pendingpetforadoption',
+            name='adoption_status',
+            field=adoption.utils.statuses.StatusField(default='pending', statuses=adoption.utils.statuses.PetStatus),
+        ),
+        migrations.AlterField(
+            model_name='petadoptiontable',
+            name='adoption_request_status',
+            field=adoption.utils.statuses.StatusField(default='pending', statuses=adoption.utils.statuses.RequestStatus),
+        ),
+    ]
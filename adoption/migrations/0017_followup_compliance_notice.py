@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-19 04:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adoption', '0016_status_codes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FollowUpComplianceNotice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField()),
+                ('report_count', models.PositiveIntegerField()),
+                ('notified_at', models.DateTimeField(auto_now_add=True)),
+                ('adoption', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='adoption.petadoptiontable')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='followupcompliancenotice',
+            constraint=models.UniqueConstraint(fields=('adoption', 'period'), name='followup_notice_once_per_period'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-19 04:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adoption', '0017_followup_compliance_notice'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FollowUpScheduleEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.PositiveSmallIntegerField()),
+                ('due_date', models.DateField()),
+                ('reminded_at', models.DateTimeField(blank=True, null=True)),
+                ('adoption', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='followup_schedule', to='adoption.petadoptiontable')),
+                ('report', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='schedule_entry', to='adoption.trackupdatetable')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('report__isnull', True)), fields=['due_date'], name='followup_open_due_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='followupscheduleentry',
+            constraint=models.UniqueConstraint(fields=('adoption', 'sequence'), name='followup_schedule_sequence_uniq'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 04:12
+
+import adoption.utils.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adoption', '0018_followup_schedule'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pendingpetforadoption',
+            name='img',
+            field=models.ImageField(upload_to='pics', validators=[adoption.utils.uploads.validate_upload_size]),
+        ),
+        migrations.AlterField(
+            model_name='petadoptiontable',
+            name='id_upload',
+            field=models.FileField(blank=True, help_text='Upload a clear image/scan of your valid ID (max 5MB).', null=True, upload_to='adoption_ids/', validators=[adoption.utils.uploads.validate_upload_size]),
+        ),
+        migrations.AlterField(
+            model_name='trackupdatetable',
+            name='photos',
+            field=models.ImageField(blank=True, upload_to='track_updates_photos/', validators=[adoption.utils.uploads.validate_upload_size]),
+        ),
+    ]
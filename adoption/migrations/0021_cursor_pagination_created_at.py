@@ -0,0 +1,54 @@
+import datetime
+
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def backfill_created_at(apps, schema_editor):
+    # Existing rows get the closest timestamp they already have rather than the time of
+    # this migration, so the API's newest-first order stays what it was
+    PetAdoptionTable = apps.get_model('adoption', 'PetAdoptionTable')
+    PetAdoptionTable.objects.filter(request_date__isnull=False).update(created_at=F('request_date'))
+
+    TrackUpdateTable = apps.get_model('adoption', 'TrackUpdateTable')
+    tz = django.utils.timezone.get_current_timezone()
+    for day in TrackUpdateTable.objects.order_by().values_list('followup_date', flat=True).distinct():
+        TrackUpdateTable.objects.filter(followup_date=day).update(
+            created_at=datetime.datetime.combine(day, datetime.time(), tzinfo=tz),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adoption', '0020_media_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='petadoptiontable',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='trackupdatetable',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_created_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='petadoptiontable',
+            index=models.Index(fields=['-created_at', '-id'], name='request_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pendingpetforadoption',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='pet_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trackupdatetable',
+            index=models.Index(fields=['pet_adoption_request', '-created_at', '-id'], name='track_request_created_idx'),
+        ),
+    ]
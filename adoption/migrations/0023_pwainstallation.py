@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+def create_table_if_missing(apps, schema_editor):
+    # PWAInstallation shipped without a migration, so some databases already have the
+    # table (created by hand or by migrate --run-syncdb) and others don't
+    PWAInstallation = apps.get_model('adoption', 'PWAInstallation')
+    if PWAInstallation._meta.db_table not in schema_editor.connection.introspection.table_names():
+        schema_editor.create_model(PWAInstallation)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adoption', '0022_idempotency_key'),
+    ]
+
+    operations = [
+        # Recorded in the migration state only; the table is created below where it's missing.
+        # Unapplying leaves the table, since it may predate this migration.
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.CreateModel(
+                name='PWAInstallation',
+                fields=[
+                    ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                    ('installed_at', models.DateTimeField(auto_now_add=True)),
+                    ('device_info', models.CharField(blank=True, max_length=255, null=True)),
+                    ('source', models.CharField(blank=True, max_length=100, null=True)),
+                ],
+                options={
+                    'verbose_name': 'PWA Installation',
+                    'verbose_name_plural': 'PWA Installations',
+                },
+            ),
+        ]),
+        migrations.RunPython(create_table_if_missing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-19 05:09
+
+import adoption.utils.uploads
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adoption', '0023_pwainstallation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pendingpetforadoption',
+            name='img',
+            field=adoption.utils.uploads.UploadImageField(upload_to='pics', validators=[adoption.utils.uploads.validate_upload_size]),
+        ),
+        migrations.AlterField(
+            model_name='trackupdatetable',
+            name='photos',
+            field=adoption.utils.uploads.UploadImageField(blank=True, upload_to='track_updates_photos/', validators=[adoption.utils.uploads.validate_upload_size]),
+        ),
+    ]
@@ -12,6 +12,9 @@ import datetime
 import numpy as np
 import json
 
+from .utils.statuses import PetStatus, RequestStatus, StatusField
+from .utils.uploads import UploadImageField, validate_upload_size
+
 class AdminManager(BaseUserManager):
     def create_user(self, username, email, password=None):
         if not username:
@@ -106,14 +109,7 @@ class PetAdoptionTable(models.Model):
     previous_pet_experience = models.TextField()
     owns_other_pets = models.CharField(max_length=100)
     facebook_profile_link = models.URLField(max_length=200, blank=True, null=True)
-    adoption_request_status = models.CharField(max_length=20, choices=[
-        ('pending', 'Pending'),
-        ('review', 'Review'),
-        ('adopted', 'Adopted'),
-        ('pet_is_adopted', 'Pet_is_adopted'),
-        ('approved', 'Approved'),
-        ('rejected', 'Rejected')
-    ], default='pending')
+    adoption_request_status = StatusField(statuses=RequestStatus, default=RequestStatus.PENDING.code)
 
     id_type = models.CharField(max_length=100, choices=[
         ('e-Card / UMID', 'e-Card / UMID'),
@@ -150,8 +146,20 @@ class PetAdoptionTable(models.Model):
         upload_to='adoption_ids/',
         null=True,
         blank=True,
+        validators=[validate_upload_size],
         help_text="Upload a clear image/scan of your valid ID (max 5MB)."
     )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Other requests for a pet by status (approval closes the open ones)
+            models.Index(fields=['pet', 'adoption_request_status'], name='request_pet_status_idx'),
+            # Admin request lists and dashboards: one status, newest first
+            models.Index(fields=['adoption_request_status', 'request_date'], name='request_status_date_idx'),
+            # The API's cursor-paginated request list, newest first
+            models.Index(fields=['-created_at', '-id'], name='request_created_idx'),
+        ]
 
     def __str__(self):
         return f"Adoption Request for {self.pet.name} by {self.user.username}"
@@ -171,12 +179,22 @@ class PendingPetForAdoption(models.Model):
     age = models.CharField(max_length=30)
     location = models.CharField(max_length=100)
     additional_details = models.TextField()
-    img = models.ImageField(upload_to='pics')
+    img = UploadImageField(upload_to='pics', validators=[validate_upload_size])
     author = models.CharField(max_length=100)
     created_at = models.DateTimeField(auto_now_add=True)
-    adoption_status = models.CharField(max_length=20, default='pending')
+    adoption_status = StatusField(statuses=PetStatus, default=PetStatus.PENDING.code)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            # Public listings filter on adoption_status and show the newest first
+            models.Index(fields=['adoption_status', '-created_at'], name='pet_status_created_idx'),
+            # A user's own posts by status
+            models.Index(fields=['user', 'adoption_status'], name='pet_user_status_idx'),
+            # A user's own posts, cursor-paginated newest first by the API
+            models.Index(fields=['user', '-created_at', '-id'], name='pet_user_created_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -202,21 +220,136 @@ class TrackUpdateTable(models.Model):
     behavioral_changes = models.TextField(blank=True)
     health_issues = models.TextField(blank=True)
     notes = models.TextField(blank=True)
-    photos = models.ImageField(upload_to='track_updates_photos/', blank=True)
+    photos = UploadImageField(upload_to='track_updates_photos/', blank=True, validators=[validate_upload_size])
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Follow-up reports for one adoption within a date range (calendars, compliance)
+            models.Index(fields=['pet_adoption_request', 'followup_date'], name='track_request_date_idx'),
+            # One adoption's reports, cursor-paginated newest first by the API
+            models.Index(fields=['pet_adoption_request', '-created_at', '-id'], name='track_request_created_idx'),
+        ]
 
     def __str__(self):
         return f"Update for {self.pet_adoption_request.pet.name} on {self.followup_date}"
 
+class FollowUpComplianceNotice(models.Model):
+    # One row per adoption per month it missed a scheduled follow-up, written by
+    # `manage.py check_followup_compliance` so each adopter is reminded once per month
+    adoption = models.ForeignKey(PetAdoptionTable, on_delete=models.CASCADE)
+    period = models.DateField()  # First day of the month checked
+    report_count = models.PositiveIntegerField()  # Reports filed that month
+    notified_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['adoption', 'period'], name='followup_notice_once_per_period'),
+        ]
+
+    def __str__(self):
+        return f"Follow-up notice for adoption {self.adoption_id} ({self.period:%Y-%m})"
+
+class FollowUpScheduleEntry(models.Model):
+    # The follow-up reports an approved adoption owes, one row per due date, written on
+    # approval by adoption/utils/followup_schedule.py; report is set once one fulfils it
+    adoption = models.ForeignKey(PetAdoptionTable, on_delete=models.CASCADE, related_name='followup_schedule')
+    sequence = models.PositiveSmallIntegerField()
+    due_date = models.DateField()
+    report = models.OneToOneField(TrackUpdateTable, null=True, blank=True, on_delete=models.SET_NULL, related_name='schedule_entry')
+    reminded_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['adoption', 'sequence'], name='followup_schedule_sequence_uniq'),
+        ]
+        indexes = [
+            # "What's due this week" across all adoptions only ever looks at open entries
+            models.Index(fields=['due_date'], name='followup_open_due_idx', condition=models.Q(report__isnull=True)),
+        ]
+
+    @property
+    def is_fulfilled(self):
+        return self.report_id is not None
+
+    def __str__(self):
+        return f"Follow-up {self.sequence} for adoption {self.adoption_id} due {self.due_date}"
+
 class Notification(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Partial indexes: the bell dropdown and mark-as-read only ever touch unread rows,
+            # and the retention sweep only read ones, so neither grows with the other's history
+            models.Index(fields=['user', '-created_at'], name='notification_unread_idx', condition=models.Q(is_read=False)),
+            models.Index(fields=['created_at'], name='notification_read_idx', condition=models.Q(is_read=True)),
+        ]
+
     def __str__(self):
         return f"Notification for {self.user.username}: {self.message}"
 
+class NotificationArchive(models.Model):
+    # Read notifications past the retention window, moved here by `manage.py archive_notifications`
+    notification_id = models.BigIntegerField(unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    message = models.TextField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived notification for {self.user.username}: {self.message}"
+
+class NotificationCounter(models.Model):
+    # Denormalized unread count per user so the bell badge doesn't scan Notification;
+    # maintained by adoption/utils/notifications.py and the Notification signals
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='notification_counter')
+    unread_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username}: {self.unread_count} unread"
+
+class MediaBlob(models.Model):
+    # One content-addressed upload under media/blobs/ and how many pet photos, report photos
+    # and ID uploads point at it; counted by adoption/utils/media_blobs.py and the model
+    # signals, and removed by `manage.py collect_media_blobs` once nothing does
+    name = models.CharField(max_length=255, unique=True)
+    ref_count = models.PositiveIntegerField(default=0)
+    released_at = models.DateTimeField(null=True, blank=True)  # When a reference was last dropped
+
+    class Meta:
+        indexes = [
+            # The collector only ever looks at unreferenced blobs
+            models.Index(fields=['released_at'], name='media_blob_orphan_idx', condition=models.Q(ref_count=0)),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} references)"
+
+class IdempotencyKey(models.Model):
+    # A claimed Idempotency-Key and, once the first call finishes, its response; written by
+    # adoption/utils/idempotency.py. The unique key is what makes a claim hold across worker
+    # processes. Expired rows are removed by `manage.py purge_idempotency_keys`
+    key = models.CharField(max_length=40, unique=True)  # sha1 of (user, path, client key)
+    fingerprint = models.CharField(max_length=40)  # sha1 of the request body
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)  # None while the first call runs
+    content = models.BinaryField(default=b'', blank=True)
+    content_type = models.CharField(max_length=255, blank=True)
+    location = models.CharField(max_length=2048, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='idempotency_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Idempotency key {self.key} ({self.status_code or 'in progress'})"
+
 class AdminUser(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     is_super_admin = models.BooleanField(default=False)
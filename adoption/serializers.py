@@ -1,7 +1,35 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.db import models
+from django.utils import timezone
 from .models import Admin, PetAdoptionRequestTable, PetAdoptionTable, PendingPetForAdoption, TrackUpdateTable, Notification
 from django.contrib.auth.hashers import make_password
+from .utils.image_derivatives import derivative_urls, derivative_urls_many
+from .utils.uploads import UploadImageField, UploadImageFormField
+
+
+def image_derivative_urls(field_file, request=None):
+    """Resized copies as {size: {'webp': url, 'jpg': url}}, or None until they are generated"""
+    urls = derivative_urls(field_file)
+    if urls and request is not None:
+        # Absolute like the ImageField URLs DRF renders when it has the request
+        urls = {size: {ext: request.build_absolute_uri(url) for ext, url in by_ext.items()} for size, by_ext in urls.items()}
+    return urls
+
+
+class UploadSerializerImageField(serializers.ImageField):
+    # Rejects an upload cut off for its size before the image is opened
+    def __init__(self, **kwargs):
+        kwargs.setdefault('_DjangoImageField', UploadImageFormField)
+        super().__init__(**kwargs)
+
+
+class UploadModelSerializer(serializers.ModelSerializer):
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        UploadImageField: UploadSerializerImageField,
+    }
+
 
 class AdminSerializer(serializers.ModelSerializer):
     class Meta:
@@ -30,11 +58,44 @@ class PetAdoptionTableSerializer(serializers.ModelSerializer):
         model = PetAdoptionTable
         fields = '__all__'
 
-class PendingPetForAdoptionSerializer(serializers.ModelSerializer):
+# Response shapes, spelled out so a new model column isn't published by accident;
+# same keys and order as the '__all__' serializers
+PET_ADOPTION_FIELDS = [
+    'id', 'first_name', 'last_name', 'contact_number', 'address', 'request_date', 'approval_date_time',
+    'adopter_type', 'living_situation', 'previous_pet_experience', 'owns_other_pets', 'facebook_profile_link',
+    'adoption_request_status', 'id_type', 'id_number', 'id_upload', 'created_at', 'pet', 'user',
+]
+PENDING_PET_FIELDS = [
+    'id', 'img_derivatives', 'name', 'animal_type', 'breed', 'color', 'gender', 'age', 'location',
+    'additional_details', 'img', 'author', 'created_at', 'adoption_status', 'user',
+]
+TRACK_UPDATE_FIELDS = [
+    'id', 'photos_derivatives', 'followup_date', 'living_situation', 'housing_type', 'behavioral_changes',
+    'health_issues', 'notes', 'photos', 'created_at', 'pet_adoption_request', 'author',
+]
+
+class PetAdoptionReadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PetAdoptionTable
+        fields = PET_ADOPTION_FIELDS
+        read_only_fields = fields
+
+class PendingPetForAdoptionSerializer(UploadModelSerializer):
+    img_derivatives = serializers.SerializerMethodField()
+
     class Meta:
         model = PendingPetForAdoption
         fields = '__all__'
 
+    def get_img_derivatives(self, pet):
+        return image_derivative_urls(pet.img, self.context.get('request'))
+
+class PendingPetReadSerializer(PendingPetForAdoptionSerializer):
+    class Meta:
+        model = PendingPetForAdoption
+        fields = PENDING_PET_FIELDS
+        read_only_fields = fields
+
 class UserSignupSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -54,12 +115,23 @@ class UserSignupSerializer(serializers.ModelSerializer):
         user.save()
         return user
 
-class TrackUpdateTableSerializer(serializers.ModelSerializer):
+class TrackUpdateTableSerializer(UploadModelSerializer):
+    photos_derivatives = serializers.SerializerMethodField()
+
     class Meta:
         model = TrackUpdateTable
         fields = '__all__'
 
-class UpdatePendingPetSerializer(serializers.ModelSerializer):
+    def get_photos_derivatives(self, report):
+        return image_derivative_urls(report.photos, self.context.get('request'))
+
+class TrackUpdateReadSerializer(TrackUpdateTableSerializer):
+    class Meta:
+        model = TrackUpdateTable
+        fields = TRACK_UPDATE_FIELDS
+        read_only_fields = fields
+
+class UpdatePendingPetSerializer(UploadModelSerializer):
     class Meta:
         model = PendingPetForAdoption
         fields = ['name', 'animal_type', 'breed', 'color', 'gender', 'age', 'location', 'additional_details', 'img']
@@ -98,4 +170,106 @@ class NotificationSerializer(serializers.ModelSerializer):
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ['id', 'username', 'email']
\ No newline at end of file
+        fields = ['id', 'username', 'email']
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path for list endpoints. Renders the dicts queryset.values()
+    returns instead of model instances, with one converter per column instead
+    of a serializer field per value; the output is the same as the matching
+    read serializer's. Foreign keys render as their IDs, files as (absolute)
+    URLs, and derivative_fields lists resized copies like image_derivative_urls.
+    """
+    model = None
+    fields = ()
+    derivative_fields = {}  # output key -> image field whose resized copies it lists
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        request = self.context.get('request')
+        self._absolute = request.build_absolute_uri if request is not None else None
+        self._timezone = timezone.get_current_timezone()
+        self._columns = [field for field in self.fields if field not in self.derivative_fields]
+        self._converters = {}
+        for name in self._columns:
+            field = self.model._meta.get_field(name)
+            if isinstance(field, models.FileField):
+                self._converters[name] = self._file_url(field.storage)
+            elif isinstance(field, models.DateTimeField):
+                self._converters[name] = self._datetime
+            elif isinstance(field, models.DateField):
+                self._converters[name] = self._date
+
+    def values(self, queryset):
+        return queryset.values(*self._columns)
+
+    def to_representation(self, rows):
+        """rows from values() (a list or the queryset itself) -> list of dicts"""
+        rows = list(rows)
+        derivatives = {}
+        for key, image_field in self.derivative_fields.items():
+            storage = self.model._meta.get_field(image_field).storage
+            derivatives[key] = self._absolute_derivatives(
+                derivative_urls_many(storage, [row[image_field] for row in rows])
+            )
+        plan = [
+            (name, self._converters.get(name), derivatives.get(name), self.derivative_fields.get(name))
+            for name in self.fields
+        ]
+        data = []
+        for row in rows:
+            item = {}
+            for name, convert, copies, image_field in plan:
+                if copies is not None:
+                    item[name] = copies.get(row[image_field])
+                elif convert is not None:
+                    item[name] = convert(row[name])
+                else:
+                    item[name] = row[name]
+            data.append(item)
+        return data
+
+    def _file_url(self, storage):
+        def convert(name):
+            if not name:
+                return None
+            url = storage.url(name)
+            return self._absolute(url) if self._absolute else url
+        return convert
+
+    def _absolute_derivatives(self, urls):
+        if self._absolute is None:
+            return urls
+        return {
+            name: by_size and {size: {ext: self._absolute(url) for ext, url in by_ext.items()} for size, by_ext in by_size.items()}
+            for name, by_size in urls.items()
+        }
+
+    def _datetime(self, value):
+        # As serializers.DateTimeField renders it: ISO 8601 in the current time zone
+        if value is None:
+            return None
+        value = value.astimezone(self._timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+    @staticmethod
+    def _date(value):
+        return value.isoformat() if value is not None else None
+
+
+class PendingPetValuesSerializer(ValuesSerializer):
+    model = PendingPetForAdoption
+    fields = PENDING_PET_FIELDS
+    derivative_fields = {'img_derivatives': 'img'}
+
+
+class TrackUpdateValuesSerializer(ValuesSerializer):
+    model = TrackUpdateTable
+    fields = TRACK_UPDATE_FIELDS
+    derivative_fields = {'photos_derivatives': 'photos'}
+
+
+class PetAdoptionValuesSerializer(ValuesSerializer):
+    model = PetAdoptionTable
+    fields = PET_ADOPTION_FIELDS
@@ -0,0 +1,194 @@
+# adoption/signals.py
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import AdminUser, Notification, PendingPetForAdoption, PetAdoptionTable, TrackUpdateTable
+from .utils.dashboard import invalidate_dashboard_counts
+from .utils.followup_calendar import invalidate_followup_calendar
+from .utils.followup_schedule import fulfil_followup
+from .utils.image_derivatives import schedule_derivatives
+from .utils.media_blobs import BLOB_FIELDS, release_blobs, stored_file_name, update_blob_references
+from .utils.notifications import (
+    decrement_unread_count,
+    increment_unread_counts,
+    invalidate_admin_recipients,
+    push_notifications,
+    resync_unread_count,
+)
+from .utils.pet_detail import invalidate_pet_detail
+from .utils.semantic_search import pet_document, refresh_pet_in_index, remove_pet_from_index, stored_pet_document
+from .utils.statuses import RequestStatus
+
+
+@receiver(pre_save, sender=PendingPetForAdoption)
+def remember_indexed_text(sender, instance, update_fields=None, raw=False, **kwargs):
+    # The text the semantic index holds for this pet, so saves that don't change it skip re-indexing
+    if raw:
+        return
+    instance._indexed_text = stored_pet_document(instance, update_fields)
+
+
+@receiver(post_save, sender=PendingPetForAdoption)
+def index_saved_pet(sender, instance, created, raw=False, **kwargs):
+    # Keep the semantic index fresh as pets are added or their description edited; the
+    # index file is only rewritten once the save has committed. Fixture loads (raw saves)
+    # are left to build_semantic_index, like every other side effect below
+    if raw:
+        return
+    text = pet_document(instance)
+    if not created and text == getattr(instance, '_indexed_text', None):
+        return
+    pet_id = instance.id
+    transaction.on_commit(lambda: refresh_pet_in_index(pet_id, text))
+
+
+@receiver(post_delete, sender=PendingPetForAdoption)
+def unindex_deleted_pet(sender, instance, **kwargs):
+    pet_id = instance.id
+    transaction.on_commit(lambda: remove_pet_from_index(pet_id))
+
+
+@receiver(post_save, sender=PendingPetForAdoption)
+@receiver(post_delete, sender=PendingPetForAdoption)
+@receiver(post_save, sender=PetAdoptionTable)
+@receiver(post_delete, sender=PetAdoptionTable)
+@receiver(post_save, sender=TrackUpdateTable)
+@receiver(post_delete, sender=TrackUpdateTable)
+def refresh_dashboard_counts(sender, **kwargs):
+    # Any status change, new request or new report can move the admin dashboard numbers;
+    # dropped once committed, so a recount can't cache the state before the write
+    if kwargs.get('raw'):
+        return
+    transaction.on_commit(invalidate_dashboard_counts)
+
+
+@receiver(post_save, sender=TrackUpdateTable)
+@receiver(post_delete, sender=TrackUpdateTable)
+def refresh_followup_calendar(sender, instance, **kwargs):
+    # Drops every cached month of this adoption's report calendar
+    if kwargs.get('raw'):
+        return
+    invalidate_followup_calendar(instance.pet_adoption_request_id)
+
+
+@receiver(post_save, sender=TrackUpdateTable)
+def fulfil_scheduled_followup(sender, instance, created, raw=False, **kwargs):
+    # A new report settles the adoption's earliest open follow-up
+    if created and not raw:
+        fulfil_followup(instance)
+
+
+@receiver(post_save, sender=AdminUser)
+@receiver(post_delete, sender=AdminUser)
+def refresh_admin_recipients(sender, **kwargs):
+    # Admin notifications go to every AdminUser; drop the cached lookup when that set changes
+    if kwargs.get('raw'):
+        return
+    invalidate_admin_recipients()
+
+
+@receiver(post_save, sender=Notification)
+def count_saved_notification(sender, instance, created, raw=False, **kwargs):
+    # Single creates (bulk writes go through write_notifications, which counts them itself).
+    # Rows loaded from a fixture are still counted, so the counters match the table, but
+    # nobody is pushed about them
+    if created:
+        if not instance.is_read:
+            increment_unread_counts({instance.user_id: 1})
+            if not raw:
+                push_notifications([instance])
+    else:
+        # Edited in place (e.g. is_read toggled in the admin): recount this user
+        resync_unread_count(instance.user_id)
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        decrement_unread_count(instance.user_id)
+
+
+@receiver(post_save, sender=PendingPetForAdoption)
+@receiver(post_delete, sender=PendingPetForAdoption)
+def refresh_pet_detail(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    transaction.on_commit(lambda: invalidate_pet_detail(instance.id))
+
+
+@receiver(post_save, sender=PetAdoptionTable)
+@receiver(post_delete, sender=PetAdoptionTable)
+def refresh_requested_pet_detail(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    transaction.on_commit(lambda: invalidate_pet_detail(instance.pet_id))
+
+
+# Connected after fulfil_scheduled_followup so the entry it settles is in the rebuilt payload
+@receiver(post_save, sender=TrackUpdateTable)
+@receiver(post_delete, sender=TrackUpdateTable)
+def refresh_reported_pet_detail(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    pet_ids = list(PetAdoptionTable.objects.filter(pk=instance.pet_adoption_request_id).values_list('pet_id', flat=True))
+    transaction.on_commit(lambda: invalidate_pet_detail(*pet_ids))
+
+
+@receiver(post_save, sender=User)
+def refresh_adopter_pet_details(sender, instance, update_fields=None, raw=False, **kwargs):
+    # The payload shows the adopter's name and email; logins only touch last_login
+    if raw or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    pet_ids = list(PetAdoptionTable.objects.filter(
+        user=instance, adoption_request_status=RequestStatus.APPROVED.code,
+    ).values_list('pet_id', flat=True))
+    if pet_ids:
+        transaction.on_commit(lambda: invalidate_pet_detail(*pet_ids))
+
+
+@receiver(post_save, sender=PendingPetForAdoption)
+def resize_pet_image(sender, instance, raw=False, **kwargs):
+    # Thumbnail, card and full-size copies for the listings; the cached detail payload
+    # is dropped again once they exist so it starts listing them. Loaded fixtures get
+    # theirs from build_image_derivatives
+    if raw:
+        return
+    schedule_derivatives(instance.img, on_done=lambda: invalidate_pet_detail(instance.id))
+
+
+@receiver(post_save, sender=TrackUpdateTable)
+def resize_report_photo(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    schedule_derivatives(instance.photos)
+
+
+@receiver(pre_save, sender=PendingPetForAdoption)
+@receiver(pre_save, sender=PetAdoptionTable)
+@receiver(pre_save, sender=TrackUpdateTable)
+def remember_stored_blob(sender, instance, update_fields=None, raw=False, **kwargs):
+    # The file the row held before this save, whose reference moves if it's replaced
+    if raw:
+        return
+    instance._stored_blob = stored_file_name(instance, update_fields)
+
+
+@receiver(post_save, sender=PendingPetForAdoption)
+@receiver(post_save, sender=PetAdoptionTable)
+@receiver(post_save, sender=TrackUpdateTable)
+def count_blob_references(sender, instance, update_fields=None, raw=False, **kwargs):
+    # Loaded fixtures are counted by the recount collect_media_blobs runs first
+    if raw:
+        return
+    update_blob_references(instance, getattr(instance, '_stored_blob', None), update_fields)
+    instance._stored_blob = None
+
+
+@receiver(post_delete, sender=PendingPetForAdoption)
+@receiver(post_delete, sender=PetAdoptionTable)
+@receiver(post_delete, sender=TrackUpdateTable)
+def release_blob_reference(sender, instance, **kwargs):
+    # The file itself stays until collect_media_blobs finds nothing else uses it
+    release_blobs([getattr(instance, BLOB_FIELDS[sender]).name])
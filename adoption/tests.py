@@ -1,3 +1,1239 @@
 from django.test import TestCase
 
 # Create your tests here.
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from unittest import mock
+
+import requests
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.http import HttpResponse, JsonResponse
+from django.core import serializers
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Count
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from adoption.management.commands import explain_hot_queries
+from adoption.management.commands.benchmark_scraping import PAGE_SELECTORS, full_page_cards, per_attribute_extract
+from adoption.management.commands.explain_hot_queries import HOT_QUERIES
+from adoption.models import AdminUser, FollowUpComplianceNotice, FollowUpScheduleEntry, IdempotencyKey, MediaBlob, Notification, NotificationArchive, NotificationCounter, PendingPetForAdoption, PetAdoptionTable, TrackUpdateTable
+from adoption.serializers import UpdatePendingPetSerializer
+from adoption.utils import followup_calendar, followup_compliance, semantic_search, web_search
+from adoption.utils.blob_storage import BLOB_DIR
+from adoption.utils.caching import LOCAL_CACHE_TTL, invalidated_ttl
+from adoption.utils.dashboard import compute_dashboard_counts
+from adoption.utils.followup_calendar import get_month_calendar
+from adoption.utils.followup_compliance import adoptions_behind, send_compliance_reminders
+from adoption.utils.followup_schedule import create_followup_schedules
+from adoption.utils.idempotency import IDEMPOTENCY_LOCK_TTL, IDEMPOTENCY_TTL, idempotent, purge_expired_keys
+from adoption.utils.image_derivatives import (
+    DERIVATIVE_FORMATS,
+    DERIVATIVE_SIZES,
+    derivative_name,
+    derivative_widths,
+    generate_derivatives,
+    srcset,
+)
+from adoption.utils.media_blobs import collect_orphaned_blobs, move_legacy_files, recount_blob_references, release_blobs, retain_blobs
+from adoption.utils.notification_retention import archive_read_notifications
+from adoption.utils.notifications import ADMIN_RECIPIENTS_CACHE_KEY, NotificationBatch, get_unread_count, mark_read, notify, notify_admins, write_notifications
+from adoption.utils.pet_detail import build_pet_detail
+from adoption.utils.request_status import APPROVAL_MESSAGE, transition_requests
+from adoption.utils.statuses import LEGACY_ALIASES, InvalidTransition, PetStatus, RequestStatus, StatusChoices
+from adoption.utils.uploads import DEFAULT_UPLOAD_SIZE_LIMIT, OversizedUpload
+from adoption.utils.web_scraping import ADOPT_A_PET_CARD_SELECTORS, HTML_PARSER, PETFINDER_CARD_SELECTORS, card_extractor, card_strainer, find_pet_cards
+from LoginPage.forms import PendingPetForAdoptionForm
+
+
+def image_bytes(color, size=(40, 30), format='PNG'):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, format=format)
+    return buffer.getvalue()
+
+
+def make_pet(user, **fields):
+    defaults = dict(
+        name='Mingming', animal_type='Cat', breed='Puspin', color='Orange', gender='Male', age='2',
+        location='Cebu', additional_details='Friendly', img='pics/cat.png',
+    )
+    defaults.update(fields)
+    return PendingPetForAdoption.objects.create(user=user, **defaults)
+
+
+def make_request(pet, user, status=RequestStatus.PENDING.code):
+    return PetAdoptionTable.objects.create(
+        pet=pet, user=user, first_name='Juan', last_name='Dela Cruz', contact_number='09170000000',
+        address='Manila', adopter_type='Individual', living_situation='House',
+        previous_pet_experience='Dogs', owns_other_pets='No', adoption_request_status=status,
+    )
+
+
+class TemporaryMediaMixin:
+    """Runs each test against an empty MEDIA_ROOT that is removed afterwards"""
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+
+class BlobReferenceTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('poster', password='pw')
+
+    def add_pet(self, content, name='cat.png'):
+        return PendingPetForAdoption.objects.create(
+            name='Mingming', animal_type='Cat', breed='Puspin', color='Orange', gender='Male', age='2',
+            location='Cebu', additional_details='Friendly', user=self.user,
+            img=SimpleUploadedFile(name, content, content_type='image/png'),
+        )
+
+    def ref_count(self, name):
+        return MediaBlob.objects.get(name=name).ref_count
+
+    def age_blob(self, name):
+        # Past the grace period both by the row and by the file's mtime
+        long_ago = timezone.now() - timedelta(days=30)
+        MediaBlob.objects.filter(name=name).update(released_at=long_ago)
+        os.utime(default_storage.path(name), (long_ago.timestamp(), long_ago.timestamp()))
+
+    def test_identical_uploads_share_one_counted_blob(self):
+        first = self.add_pet(image_bytes('orange'), 'first.png')
+        second = self.add_pet(image_bytes('orange'), 'second.png')
+        self.assertEqual(first.img.name, second.img.name)
+        self.assertTrue(first.img.name.startswith(f"{BLOB_DIR}/"))
+        self.assertEqual(self.ref_count(first.img.name), 2)
+        blob_files = [f for _, _, files in os.walk(os.path.join(self.media_root, BLOB_DIR)) for f in files]
+        self.assertEqual(len(blob_files), 1)
+
+    def test_replacing_and_deleting_move_references(self):
+        first = self.add_pet(image_bytes('orange'))
+        second = self.add_pet(image_bytes('orange'))
+        shared = first.img.name
+
+        first.img = SimpleUploadedFile('new.png', image_bytes('black'), content_type='image/png')
+        first.save()
+        self.assertEqual(self.ref_count(shared), 1)
+        self.assertEqual(self.ref_count(first.img.name), 1)
+
+        second.delete()
+        self.assertEqual(self.ref_count(shared), 0)
+        self.assertIsNotNone(MediaBlob.objects.get(name=shared).released_at)
+
+    def test_collector_keeps_referenced_and_recent_blobs(self):
+        kept = self.add_pet(image_bytes('orange'))
+        dropped = self.add_pet(image_bytes('black'))
+        dropped_name = dropped.img.name
+        dropped.delete()
+
+        # Still within the grace period
+        self.assertEqual(collect_orphaned_blobs()[0], 0)
+        self.assertTrue(default_storage.exists(dropped_name))
+
+        self.age_blob(dropped_name)
+        deleted, freed = collect_orphaned_blobs()
+        self.assertEqual(deleted, 1)
+        self.assertGreater(freed, 0)
+        self.assertFalse(default_storage.exists(dropped_name))
+        self.assertFalse(MediaBlob.objects.filter(name=dropped_name).exists())
+        self.assertTrue(default_storage.exists(kept.img.name))
+
+    def test_collector_rechecks_rows_changed_without_signals(self):
+        pet = self.add_pet(image_bytes('orange'))
+        other = self.add_pet(image_bytes('black'))
+        # update() sends no signals: the counter still says 0 for the blob other now uses
+        other.delete()
+        PendingPetForAdoption.objects.filter(pk=pet.pk).update(img=other.img.name)
+        self.age_blob(other.img.name)
+
+        self.assertEqual(collect_orphaned_blobs()[0], 0)
+        self.assertTrue(default_storage.exists(other.img.name))
+        self.assertEqual(self.ref_count(other.img.name), 1)
+
+    def test_recount_repairs_counts(self):
+        pet = self.add_pet(image_bytes('orange'))
+        MediaBlob.objects.filter(name=pet.img.name).update(ref_count=7)
+        self.assertEqual(recount_blob_references(), 1)
+        self.assertEqual(self.ref_count(pet.img.name), 1)
+        self.assertEqual(recount_blob_references(), 0)
+
+    def test_retain_and_release_count_each_occurrence(self):
+        pet = self.add_pet(image_bytes('orange'))
+        name = pet.img.name
+        retain_blobs([name, name, 'pics/legacy.png', None])
+        self.assertEqual(self.ref_count(name), 3)
+        self.assertFalse(MediaBlob.objects.filter(name='pics/legacy.png').exists())
+
+        release_blobs([name])
+        self.assertEqual(self.ref_count(name), 2)
+        # Never below zero, however many releases arrive
+        release_blobs([name, name, name])
+        self.assertEqual(self.ref_count(name), 0)
+        self.assertIsNotNone(MediaBlob.objects.get(name=name).released_at)
+
+    def test_references_are_counted_across_pets_reports_and_requests(self):
+        pet = self.add_pet(image_bytes('orange'))
+        adoption = make_request(pet, self.user, RequestStatus.APPROVED.code)
+        adoption.id_upload = SimpleUploadedFile('id.png', image_bytes('orange'), content_type='image/png')
+        adoption.save()
+        report = TrackUpdateTable.objects.create(
+            pet_adoption_request=adoption, author=self.user, followup_date=timezone.localdate(),
+            photos=SimpleUploadedFile('report.png', image_bytes('orange'), content_type='image/png'),
+        )
+        self.assertEqual(adoption.id_upload.name, pet.img.name)
+        self.assertEqual(report.photos.name, pet.img.name)
+        self.assertEqual(self.ref_count(pet.img.name), 3)
+
+        report.delete()
+        adoption.id_upload = None
+        adoption.save()
+        self.assertEqual(self.ref_count(pet.img.name), 1)
+        self.assertEqual(recount_blob_references(), 0)
+
+    def test_collect_command_keeps_referenced_files(self):
+        kept = self.add_pet(image_bytes('orange'))
+        generate_derivatives(default_storage, kept.img.name)
+        dropped = self.add_pet(image_bytes('black'))
+        generate_derivatives(default_storage, dropped.img.name)
+        dropped_name = dropped.img.name
+        dropped.delete()
+        stray = default_storage.save('stray.png', SimpleUploadedFile('stray.png', image_bytes('white')))
+        # A counter gone wrong (e.g. rows loaded from a fixture) must not cost the file
+        MediaBlob.objects.filter(name=kept.img.name).update(ref_count=0)
+        for name in (kept.img.name, dropped_name, stray):
+            self.age_blob(name)
+
+        out = StringIO()
+        call_command('collect_media_blobs', stdout=out)
+        self.assertIn('Corrected 1 reference counts', out.getvalue())
+        self.assertIn('Deleted 2 unreferenced files', out.getvalue())
+        self.assertTrue(default_storage.exists(kept.img.name))
+        self.assertTrue(default_storage.exists(derivative_name(kept.img.name, 'thumb', 'webp')))
+        self.assertEqual(self.ref_count(kept.img.name), 1)
+        for name in (dropped_name, stray):
+            self.assertFalse(default_storage.exists(name))
+        self.assertFalse(default_storage.exists(derivative_name(dropped_name, 'thumb', 'webp')))
+        self.assertEqual(list(MediaBlob.objects.values_list('name', flat=True)), [kept.img.name])
+
+    def test_derivatives_of_a_legacy_file_keep_its_name(self):
+        legacy = 'pics/legacy_2GnmVw2.png'
+        default_storage.save_as(legacy, SimpleUploadedFile(legacy, image_bytes('orange', size=(800, 600))))
+
+        written = generate_derivatives(default_storage, legacy)
+        self.assertEqual(written, len(DERIVATIVE_SIZES) * len(DERIVATIVE_FORMATS))
+        for size in DERIVATIVE_SIZES:
+            for ext in DERIVATIVE_FORMATS:
+                self.assertTrue(default_storage.exists(derivative_name(legacy, size, ext)))
+        # Nothing written under a content hash, and a re-run finds them done
+        self.assertFalse(default_storage.exists(BLOB_DIR))
+        self.assertEqual(generate_derivatives(default_storage, legacy), 0)
+
+    def test_moving_legacy_files_into_blobs(self):
+        pet = self.add_pet(image_bytes('orange'))
+        legacy = 'pics/legacy_2GnmVw2.png'
+        default_storage.save_as(legacy, SimpleUploadedFile(legacy, image_bytes('white', size=(800, 600))))
+        generate_derivatives(default_storage, legacy)
+        PendingPetForAdoption.objects.filter(pk=pet.pk).update(img=legacy)
+
+        summary = move_legacy_files()
+        self.assertEqual((summary['moved'], summary['blobs'], summary['missing']), (1, 1, 0))
+        pet.refresh_from_db()
+        self.assertTrue(pet.img.name.startswith(f"{BLOB_DIR}/"))
+        self.assertFalse(default_storage.exists(legacy))
+        self.assertTrue(default_storage.exists(derivative_name(pet.img.name, 'thumb', 'webp')))
+        self.assertFalse(default_storage.exists(derivative_name(legacy, 'thumb', 'webp')))
+        self.assertEqual(self.ref_count(pet.img.name), 1)
+        # A second run finds nothing left to move
+        self.assertEqual(move_legacy_files()['moved'], 0)
+
+
+class ImageDerivativeTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(cache.clear)
+        name = default_storage.save_as('pics/portrait.png', SimpleUploadedFile('portrait.png', image_bytes('orange', size=(300, 500))))
+        self.pet = make_pet(User.objects.create_user('poster', password='pw'), img=name)
+
+    def widths_in(self, srcset):
+        return [int(candidate.rsplit(' ', 1)[1].rstrip('w')) for candidate in srcset.split(', ')]
+
+    def test_srcset_lists_the_widths_written(self):
+        self.assertEqual(srcset(self.pet.img, 'jpg'), '')
+        generate_derivatives(default_storage, self.pet.img.name)
+        # 500px tall: the thumb is 320 high (192 wide), card and full keep the original 300
+        self.assertEqual(derivative_widths(self.pet.img), {'thumb': 192, 'card': 300, 'full': 300})
+        self.assertEqual(self.widths_in(srcset(self.pet.img, 'webp')), [192, 300])
+
+        # Read back from the files themselves once the cached widths are gone
+        cache.clear()
+        self.assertEqual(self.widths_in(srcset(self.pet.img, 'jpg')), [192, 300])
+
+
+class TransitionRequestsTests(TestCase):
+    def setUp(self):
+        self.poster = User.objects.create_user('poster', password='pw')
+        self.adopter = User.objects.create_user('adopter', password='pw')
+        self.rival = User.objects.create_user('rival', password='pw')
+        self.pet = make_pet(self.poster)
+        self.request = make_request(self.pet, self.adopter)
+        self.sibling = make_request(self.pet, self.rival)
+
+    def status(self, adoption):
+        return PetAdoptionTable.objects.get(pk=adoption.pk).adoption_request_status
+
+    def test_approval_adopts_the_pet_and_closes_siblings(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = transition_requests([self.request.pk], 'approved')
+        self.assertEqual(result, {'updated': [self.request.pk], 'skipped': {}, 'not_found': []})
+        self.assertEqual(self.status(self.request), RequestStatus.APPROVED.code)
+        self.assertEqual(self.status(self.sibling), RequestStatus.SUPERSEDED.code)
+        self.assertEqual(PendingPetForAdoption.objects.get(pk=self.pet.pk).adoption_status, PetStatus.ADOPTED.code)
+        self.assertIsNotNone(PetAdoptionTable.objects.get(pk=self.request.pk).approval_date_time)
+        self.assertTrue(FollowUpScheduleEntry.objects.filter(adoption=self.request).exists())
+        self.assertTrue(Notification.objects.filter(user=self.adopter, message=APPROVAL_MESSAGE).exists())
+
+    def test_one_approval_per_pet_in_a_batch(self):
+        result = transition_requests([self.sibling.pk, self.request.pk], 'approved')
+        self.assertEqual(result['updated'], [self.request.pk])
+        self.assertEqual(result['skipped'], {self.sibling.pk: 'this pet has already been adopted'})
+
+    def test_retries_and_missing_requests_are_reported(self):
+        transition_requests([self.request.pk], 'review')
+        result = transition_requests([self.request.pk, 999999], 'review')
+        self.assertEqual(result['updated'], [])
+        self.assertEqual(result['skipped'], {self.request.pk: 'already review'})
+        self.assertEqual(result['not_found'], [999999])
+
+    def test_reject_after_approval_leaves_the_approval(self):
+        transition_requests([self.request.pk], 'approved')
+        result = transition_requests([self.request.pk], 'rejected')
+        self.assertEqual(result['updated'], [])
+        self.assertIn(self.request.pk, result['skipped'])
+        self.assertEqual(self.status(self.request), RequestStatus.APPROVED.code)
+        self.assertEqual(PendingPetForAdoption.objects.get(pk=self.pet.pk).adoption_status, PetStatus.ADOPTED.code)
+
+    def test_row_changed_after_it_was_read_is_not_overwritten(self):
+        # An approval landing between the status read and the UPDATE, as it could where
+        # the database ignores FOR UPDATE
+        can_become = StatusChoices.can_become
+
+        def approve_meanwhile(status, new_status):
+            PetAdoptionTable.objects.filter(pk=self.request.pk).update(adoption_request_status=RequestStatus.APPROVED.code)
+            return can_become(status, new_status)
+
+        with mock.patch.object(StatusChoices, 'can_become', approve_meanwhile):
+            result = transition_requests([self.request.pk], 'rejected')
+        self.assertEqual(result['updated'], [])
+        self.assertEqual(result['skipped'], {self.request.pk: 'changed by another update at the same time'})
+        self.assertEqual(self.status(self.request), RequestStatus.APPROVED.code)
+
+
+class UploadTests(TestCase):
+    def upload(self, name, content, content_type='image/jpeg'):
+        """request.FILES['img'] for a multipart POST, parsed by the configured upload handlers"""
+        request = RequestFactory().post('/', {'img': SimpleUploadedFile(name, content, content_type)})
+        upload = request.FILES['img']
+        self.addCleanup(upload.close)
+        return upload
+
+    def test_photos_are_downscaled_and_lose_their_exif(self):
+        exif = Image.Exif()
+        exif[0x010F] = 'PhoneMaker'
+        exif[0x0112] = 6  # Taken sideways: rotate 90 degrees to display
+        buffer = BytesIO()
+        Image.new('RGB', (4000, 3000), 'orange').save(buffer, 'JPEG', exif=exif)
+
+        upload = self.upload('phone.jpg', buffer.getvalue())
+        self.assertLess(upload.size, len(buffer.getvalue()))
+        with Image.open(upload) as image:
+            self.assertEqual(image.format, 'JPEG')
+            self.assertEqual(image.size, (1536, 2048))
+            self.assertFalse(image.getexif())
+
+    def test_small_photos_without_metadata_are_kept_as_sent(self):
+        content = image_bytes('green', format='JPEG')
+        upload = self.upload('small.jpg', content)
+        upload.seek(0)
+        self.assertEqual(upload.read(), content)
+
+    def test_oversized_photo_is_reported_as_too_large(self):
+        upload = self.upload('huge.jpg', b'\xff' * (DEFAULT_UPLOAD_SIZE_LIMIT + 1))
+        self.assertIsInstance(upload, OversizedUpload)
+        message = 'File size must be less than 10MB.'
+
+        form = PendingPetForAdoptionForm(data={}, files={'img': upload})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['img'], [message])
+
+        serializer = UpdatePendingPetSerializer(data={'img': upload}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['img'], [message])
+
+
+class StatusVocabularyTests(TestCase):
+    def test_parse_accepts_codes_integers_and_legacy_spellings(self):
+        self.assertIs(RequestStatus.parse('rejected'), RequestStatus.REJECTED)
+        self.assertIs(RequestStatus.parse(' Approved '), RequestStatus.APPROVED)
+        self.assertIs(RequestStatus.parse(4), RequestStatus.REJECTED)
+        self.assertIs(RequestStatus.parse('4'), RequestStatus.REJECTED)
+        self.assertIs(RequestStatus.parse(RequestStatus.REVIEW), RequestStatus.REVIEW)
+        for vocabulary, aliases in LEGACY_ALIASES.items():
+            for spelling, status in aliases.items():
+                self.assertIs(vocabulary.parse(spelling), status)
+        for bad in ('archived', 'deny', 99, None):  # ('deny' is only a request status)
+            with self.assertRaises(ValueError):
+                PetStatus.parse(bad)
+
+    def test_field_stores_integers_and_reads_codes(self):
+        user = User.objects.create_user('adopter', password='pw')
+        pet = make_pet(user, adoption_status='Pet_is_already_adopt')
+        adoption = make_request(pet, user, status='deny')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT adoption_request_status FROM {PetAdoptionTable._meta.db_table} WHERE id = %s", [adoption.pk],
+            )
+            self.assertEqual(cursor.fetchone()[0], RequestStatus.REJECTED.value)
+
+        adoption.refresh_from_db()
+        self.assertEqual(adoption.adoption_request_status, 'rejected')
+        self.assertEqual(PendingPetForAdoption.objects.get(pk=pet.pk).adoption_status, 'adopted')
+        self.assertEqual(
+            PetAdoptionTable.objects.filter(pk=adoption.pk).values_list('adoption_request_status', flat=True).get(),
+            'rejected',
+        )
+        self.assertTrue(PetAdoptionTable.objects.filter(adoption_request_status='rejected').exists())
+        self.assertTrue(PetAdoptionTable.objects.filter(adoption_request_status__in=['deny', 'pending']).exists())
+
+        field = PetAdoptionTable._meta.get_field('adoption_request_status')
+        self.assertEqual(field.to_python('Pet is deleted'), 'pet_deleted')
+        with self.assertRaises(ValidationError):
+            field.to_python('archived')
+
+    def test_illegal_transitions_are_skipped(self):
+        user = User.objects.create_user('adopter', password='pw')
+        rejected = make_request(make_pet(user), user, RequestStatus.REJECTED.code)
+        superseded = make_request(make_pet(user), user, RequestStatus.SUPERSEDED.code)
+        result = transition_requests([rejected.pk, superseded.pk], 'approved')
+        self.assertEqual(result['updated'], [])
+        self.assertEqual(result['skipped'], {
+            rejected.pk: "can't go from rejected to approved",
+            superseded.pk: "can't go from superseded to approved",
+        })
+        self.assertEqual(PetAdoptionTable.objects.get(pk=rejected.pk).adoption_request_status, 'rejected')
+        with self.assertRaises(InvalidTransition):
+            RequestStatus.APPROVED.check_transition('review')
+
+
+class StatusMigrationTests(TransactionTestCase):
+    """Runs 0015/0016 over every status spelling in data_dump.json"""
+    before = [('adoption', '0014_hot_filter_indexes')]
+    after = [('adoption', '0016_status_codes')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        self.apps = executor.loader.project_state(self.before).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def dump_statuses(self, field):
+        with open(os.path.join(settings.BASE_DIR, 'data_dump.json')) as f:
+            return {row['fields'][field] for row in json.load(f) if field in row['fields']}
+
+    def test_every_dumped_status_maps_to_its_code(self):
+        pet_statuses = self.dump_statuses('adoption_status')
+        request_statuses = self.dump_statuses('adoption_request_status')
+        self.assertIn('Pet_is_already_adopt', pet_statuses)
+        self.assertIn('Pet is already adopt', request_statuses)
+
+        HistoricalUser = self.apps.get_model('auth', 'User')
+        HistoricalPet = self.apps.get_model('adoption', 'PendingPetForAdoption')
+        HistoricalRequest = self.apps.get_model('adoption', 'PetAdoptionTable')
+        user = HistoricalUser.objects.create(username='adopter')
+        pets = {
+            status: HistoricalPet.objects.create(
+                user_id=user.pk, name='Mingming', animal_type='Cat', breed='Puspin', color='Orange',
+                gender='Male', age='2', location='Cebu', additional_details='Friendly', adoption_status=status,
+            ).pk for status in pet_statuses
+        }
+        pet_id = next(iter(pets.values()))
+        requests_by_status = {
+            status: HistoricalRequest.objects.create(
+                pet_id=pet_id, user_id=user.pk, first_name='Juan', last_name='Dela Cruz',
+                contact_number='09170000000', address='Manila', adopter_type='Individual',
+                living_situation='House', previous_pet_experience='Dogs', owns_other_pets='No',
+                adoption_request_status=status,
+            ).pk for status in request_statuses
+        }
+
+        MigrationExecutor(connection).migrate(self.after)
+        for status, pk in pets.items():
+            stored = PendingPetForAdoption.objects.filter(pk=pk).values_list('adoption_status', flat=True).get()
+            self.assertEqual(stored, PetStatus.parse(status).code, status)
+        for status, pk in requests_by_status.items():
+            stored = PetAdoptionTable.objects.filter(pk=pk).values_list('adoption_request_status', flat=True).get()
+            self.assertEqual(stored, RequestStatus.parse(status).code, status)
+
+
+class PetDetailTests(TestCase):
+    def test_approved_request_is_found_behind_earlier_ones(self):
+        poster = User.objects.create_user('poster', password='pw')
+        rival = User.objects.create_user('rival', password='pw')
+        adopter = User.objects.create_user('adopter', password='pw', first_name='Maria', email='maria@example.com')
+        pet = make_pet(poster, adoption_status=PetStatus.APPROVED.code)
+        make_request(pet, rival, RequestStatus.REJECTED.code)
+        approved = make_request(pet, adopter, RequestStatus.APPROVED.code)
+
+        payload = build_pet_detail(pet.id)
+        self.assertEqual(payload['adoption_details']['id'], approved.id)
+        self.assertEqual(payload['user_details']['id'], adopter.id)
+        self.assertEqual(payload['user_details']['email'], 'maria@example.com')
+
+    def test_no_adoption_details_until_a_request_is_approved(self):
+        poster = User.objects.create_user('poster', password='pw')
+        pet = make_pet(poster)
+        make_request(pet, User.objects.create_user('adopter', password='pw'))
+        payload = build_pet_detail(pet.id)
+        self.assertIsNone(payload['adoption_details'])
+        self.assertIsNone(payload['user_details'])
+
+
+class FollowUpComplianceTests(TestCase):
+    # Approved on Jan 10th, 2025: follow-ups fall due on Feb 9th, Mar 11th, Apr 10th, May 10th, Jun 9th and Jul 9th
+    APPROVED_ON = date(2025, 1, 10)
+
+    def setUp(self):
+        self.adopter = User.objects.create_user('adopter', password='pw')
+        self.adoption = make_request(make_pet(self.adopter), self.adopter, RequestStatus.APPROVED.code)
+        create_followup_schedules({self.adoption.pk: self.APPROVED_ON})
+
+    def report(self, followup_date):
+        return TrackUpdateTable.objects.create(
+            pet_adoption_request=self.adoption, followup_date=followup_date,
+            living_situation='indoor', housing_type='cage', author=self.adopter,
+        )
+
+    def behind(self, period):
+        return [(row['id'], row['owed']) for row in adoptions_behind(period)]
+
+    def test_behind_only_in_months_with_a_missed_scheduled_followup(self):
+        self.assertEqual(self.behind(date(2025, 1, 1)), [])
+        self.assertEqual(self.behind(date(2025, 2, 1)), [(self.adoption.pk, 1)])
+        self.assertEqual(self.behind(date(2025, 8, 1)), [])
+
+        # One report a month settles the schedule, however many the month has
+        self.report(date(2025, 2, 7))
+        self.assertEqual(self.behind(date(2025, 2, 1)), [])
+        self.assertEqual(self.behind(date(2025, 3, 1)), [(self.adoption.pk, 1)])
+
+    def test_each_adopter_is_reminded_once_per_month(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(len(send_compliance_reminders(date(2025, 2, 1))), 1)
+            self.assertEqual(send_compliance_reminders(date(2025, 2, 1)), [])
+        self.assertEqual(FollowUpComplianceNotice.objects.get(adoption=self.adoption).period, date(2025, 2, 1))
+        self.assertEqual(Notification.objects.filter(user=self.adopter).count(), 1)
+
+    def test_run_overlapping_another_skips_what_that_run_noticed(self):
+        # This run read the adoption as behind, then another run recorded its notice first
+        stale = list(adoptions_behind(date(2025, 2, 1)))
+        FollowUpComplianceNotice.objects.create(adoption=self.adoption, period=date(2025, 2, 1), report_count=0)
+        with mock.patch.object(followup_compliance, 'adoptions_behind', return_value=stale), \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(send_compliance_reminders(date(2025, 2, 1)), [])
+        self.assertFalse(Notification.objects.filter(user=self.adopter).exists())
+
+    def test_dashboard_counts_the_adoptions_the_job_reminds(self):
+        with mock.patch('django.utils.timezone.localdate', return_value=date(2025, 2, 20)):
+            self.assertEqual(compute_dashboard_counts()['reports_due'], len(adoptions_behind(date(2025, 2, 1))))
+            self.assertEqual(compute_dashboard_counts()['reports_due'], 1)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.report(date(2025, 2, 7))
+            self.assertEqual(compute_dashboard_counts()['reports_due'], 0)
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('admin', password='pw')
+        self.calls = []
+
+        @idempotent
+        def view(request):
+            self.calls.append(request.POST.get('status'))
+            if request.POST.get('status') == 'boom':
+                return HttpResponse(status=503)
+            return JsonResponse({'success': True, 'call': len(self.calls)}, status=201)
+        self.view = view
+
+    def post(self, key='retry-1', **data):
+        request = RequestFactory().post('/requests/1/status/', data or {'status': 'approved'}, HTTP_IDEMPOTENCY_KEY=key)
+        request.user = self.user
+        return self.view(request)
+
+    def test_retry_replays_the_first_response(self):
+        first = self.post()
+        again = self.post()
+        self.assertEqual(self.calls, ['approved'])
+        self.assertEqual((again.status_code, again.content), (first.status_code, first.content))
+        self.assertEqual(again['Idempotent-Replayed'], 'true')
+        # Another key runs the view again
+        self.post(key='retry-2')
+        self.assertEqual(len(self.calls), 2)
+
+    def test_key_reused_with_another_body_is_rejected(self):
+        self.post()
+        self.assertEqual(self.post(status='rejected').status_code, 422)
+        self.assertEqual(self.calls, ['approved'])
+
+    def test_claim_held_by_another_worker_answers_409(self):
+        # What a call still running in another process leaves behind
+        self.post()
+        IdempotencyKey.objects.update(status_code=None)
+        self.assertEqual(self.post().status_code, 409)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_expired_claim_is_taken_over(self):
+        self.post()
+        IdempotencyKey.objects.update(status_code=None, created_at=timezone.now() - IDEMPOTENCY_LOCK_TTL * 2)
+        self.assertEqual(self.post().status_code, 201)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(IdempotencyKey.objects.get().status_code, 201)
+
+    def test_server_errors_release_the_key(self):
+        self.assertEqual(self.post(status='boom').status_code, 503)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertEqual(self.post(status='boom').status_code, 503)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_purge_removes_only_expired_keys(self):
+        self.post()
+        self.post(key='old')
+        IdempotencyKey.objects.filter(pk=IdempotencyKey.objects.order_by('id').last().pk).update(
+            created_at=timezone.now() - IDEMPOTENCY_TTL * 2,
+        )
+        self.assertEqual(purge_expired_keys(), 1)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+
+class NotificationBatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.adopter = User.objects.create_user('adopter', password='pw')
+        self.admins = [User.objects.create_user(f'admin{i}', password='pw') for i in range(3)]
+        for admin in self.admins:
+            AdminUser.objects.create(user=admin)
+
+    def messages(self, user):
+        return list(Notification.objects.filter(user=user).order_by('id').values_list('message', flat=True))
+
+    def test_duplicates_are_dropped_and_nothing_is_written_before_commit(self):
+        batch = NotificationBatch().add(self.adopter, 'Approved').add(self.adopter.pk, 'Approved').add(None, 'Nobody')
+        batch.add(self.adopter, 'Welcome')
+        self.assertEqual(len(batch), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(batch.send(), 2)
+            self.assertFalse(Notification.objects.exists())
+        self.assertEqual(self.messages(self.adopter), ['Approved', 'Welcome'])
+        self.assertEqual(get_unread_count(self.adopter), 2)
+        # send() empties the batch, so a second call writes nothing
+        self.assertEqual(batch.send(), 0)
+
+    def test_rolled_back_action_notifies_nobody(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                notify(self.adopter, 'Approved')
+                raise RuntimeError
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(get_unread_count(self.adopter), 0)
+
+    def test_one_insert_however_many_recipients(self):
+        def queries_for(recipients):
+            batch = NotificationBatch()
+            for user in recipients:
+                batch.add(user, 'New pet posted')
+            with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+                batch.send()
+            return [query['sql'] for query in queries]
+
+        few = queries_for(self.admins[:1])
+        many = queries_for(self.admins + [self.adopter])
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(sum('INSERT INTO "adoption_notification"' in sql for sql in many), 1)
+        self.assertEqual(NotificationCounter.objects.get(user=self.admins[0]).unread_count, 2)
+        self.assertEqual(NotificationCounter.objects.get(user=self.adopter).unread_count, 1)
+
+    def test_admin_notifications_reach_every_admin_user(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(notify_admins('New pet posted', exclude=[self.admins[0].pk]), 2)
+        self.assertEqual(self.messages(self.admins[0]), [])
+        for admin in self.admins[1:]:
+            self.assertEqual(self.messages(admin), ['New pet posted'])
+        self.assertEqual(self.messages(self.adopter), [])
+
+    def test_admin_lookup_is_cached_until_the_admins_change(self):
+        NotificationBatch().add_admins('warm the cache')
+        self.assertEqual(cache.get(ADMIN_RECIPIENTS_CACHE_KEY), [admin.pk for admin in self.admins])
+        with self.assertNumQueries(0):
+            self.assertEqual(len(NotificationBatch().add_admins('cached')), 3)
+
+        promoted = AdminUser.objects.create(user=self.adopter)
+        self.assertIsNone(cache.get(ADMIN_RECIPIENTS_CACHE_KEY))
+        self.assertEqual(len(NotificationBatch().add_admins('one more admin')), 4)
+        promoted.delete()
+        self.assertEqual(len(NotificationBatch().add_admins('back to three')), 3)
+
+    def test_approval_notifies_the_adopter_once_committed(self):
+        request = make_request(make_pet(self.admins[0]), self.adopter)
+        with self.captureOnCommitCallbacks(execute=True):
+            transition_requests([request.pk], 'approved')
+            self.assertEqual(self.messages(self.adopter), [])
+        self.assertEqual(self.messages(self.adopter), [APPROVAL_MESSAGE])
+        self.assertEqual(get_unread_count(self.adopter), 1)
+
+
+class NotificationRetentionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user('adopter', password='pw')
+        self.other = User.objects.create_user('other', password='pw')
+        with self.captureOnCommitCallbacks(execute=True):
+            created = write_notifications(
+                [(self.user.pk, f"Old {i}") for i in range(5)]
+                + [(self.other.pk, 'Old, other user'), (self.user.pk, 'Recent read'), (self.user.pk, 'Recent unread')]
+            )
+            # Read through the dropdown, as users do: the first three old ones, the other user's and a recent one
+            mark_read(self.user, [n.pk for n in created[:3]] + [created[6].pk])
+            mark_read(self.other, [created[5].pk])
+        long_ago = timezone.now() - timedelta(days=120)
+        Notification.objects.filter(pk__in=[n.pk for n in created[:6]]).update(created_at=long_ago)
+        self.old_read = sorted(n.pk for n in created[:3] + [created[5]])
+
+    def unread_counts(self):
+        return {user.pk: get_unread_count(user) for user in (self.user, self.other)}
+
+    def test_only_old_read_notifications_are_archived(self):
+        self.assertEqual(self.unread_counts(), {self.user.pk: 3, self.other.pk: 0})
+        out = StringIO()
+        call_command('archive_notifications', days=90, batch_size=3, stdout=out)
+        self.assertIn('Archived 4 read notifications older than 90 days', out.getvalue())
+
+        self.assertEqual(sorted(NotificationArchive.objects.values_list('notification_id', flat=True)), self.old_read)
+        self.assertFalse(Notification.objects.filter(pk__in=self.old_read).exists())
+        self.assertEqual(
+            sorted(Notification.objects.values_list('message', flat=True)),
+            ['Old 3', 'Old 4', 'Recent read', 'Recent unread'],
+        )
+        archived = NotificationArchive.objects.get(message='Old, other user')
+        self.assertEqual(archived.user_id, self.other.pk)
+        # Unread rows stay, so the badges don't move
+        self.assertEqual(self.unread_counts(), {self.user.pk: 3, self.other.pk: 0})
+        self.assertEqual(NotificationCounter.objects.get(user=self.user).unread_count, 3)
+        self.assertEqual(archive_read_notifications(older_than_days=90), 0)
+
+    def test_stopped_runs_resume_where_they_left_off(self):
+        self.assertEqual(archive_read_notifications(older_than_days=90, batch_size=3, max_batches=1), 3)
+        self.assertEqual(Notification.objects.filter(pk__in=self.old_read).count(), 1)
+        self.assertEqual(archive_read_notifications(older_than_days=90, batch_size=3), 1)
+        self.assertEqual(NotificationArchive.objects.count(), 4)
+
+    def test_batch_archived_but_not_deleted_is_redone(self):
+        first = Notification.objects.get(pk=self.old_read[0])
+        NotificationArchive.objects.create(
+            notification_id=first.pk, user_id=first.user_id, message=first.message, created_at=first.created_at,
+        )
+        self.assertEqual(archive_read_notifications(older_than_days=90), 4)
+        self.assertEqual(NotificationArchive.objects.count(), 4)
+        self.assertFalse(Notification.objects.filter(pk__in=self.old_read).exists())
+
+
+class FollowupCalendarTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user('adopter', password='pw')
+        pet = make_pet(self.user)
+        self.adoption = make_request(pet, self.user, RequestStatus.APPROVED.code)
+        self.other = make_request(pet, self.user, RequestStatus.REJECTED.code)
+        self.report = self.add_report(date(2026, 3, 4), 'Settling in')
+
+    def add_report(self, followup_date, notes, adoption=None):
+        return TrackUpdateTable.objects.create(
+            pet_adoption_request=adoption or self.adoption, author=self.user, followup_date=followup_date, notes=notes,
+        )
+
+    def version(self, adoption):
+        return cache.get(followup_calendar._version_key(adoption.pk))
+
+    def test_months_are_served_from_the_cache(self):
+        built = get_month_calendar(self.adoption.pk, 2026, 3)
+        self.assertEqual(built['report_count'], 1)
+        self.assertEqual(built['daily_reports'][4][0]['notes'], 'Settling in')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_month_calendar(self.adoption.pk, 2026, 3), built)
+        # Another month is its own entry
+        with self.assertNumQueries(2):
+            self.assertEqual(get_month_calendar(self.adoption.pk, 2026, 4)['report_count'], 0)
+
+    def test_saving_a_report_bumps_the_version(self):
+        get_month_calendar(self.adoption.pk, 2026, 3)
+        version, other_version = self.version(self.adoption), self.version(self.other)
+        self.add_report(date(2026, 3, 11), 'Eating well')
+        self.assertNotEqual(self.version(self.adoption), version)
+        self.assertEqual(self.version(self.other), other_version)
+        self.assertEqual(get_month_calendar(self.adoption.pk, 2026, 3)['report_count'], 2)
+
+        version = self.version(self.adoption)
+        self.report.notes = 'Settled in'
+        self.report.save()
+        self.assertNotEqual(self.version(self.adoption), version)
+        self.assertEqual(get_month_calendar(self.adoption.pk, 2026, 3)['daily_reports'][4][0]['notes'], 'Settled in')
+
+    def test_deleting_a_report_bumps_the_version(self):
+        self.add_report(date(2026, 2, 25), 'First week')
+        self.assertEqual(get_month_calendar(self.adoption.pk, 2026, 3)['tracking_start_date'], date(2026, 2, 25))
+        version = self.version(self.adoption)
+        TrackUpdateTable.objects.get(notes='First week').delete()
+        self.assertNotEqual(self.version(self.adoption), version)
+        # Months that hold no change see the new tracking start date too
+        self.assertEqual(get_month_calendar(self.adoption.pk, 2026, 3)['tracking_start_date'], date(2026, 3, 4))
+
+
+class InvalidatedCacheTtlTests(TestCase):
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_per_process_cache_keeps_entries_briefly(self):
+        self.assertEqual(invalidated_ttl(60 * 60), LOCAL_CACHE_TTL)
+        self.assertEqual(invalidated_ttl(None), LOCAL_CACHE_TTL)
+        self.assertEqual(invalidated_ttl(5), 5)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost:6379',
+    }})
+    def test_shared_cache_keeps_the_full_ttl(self):
+        self.assertEqual(invalidated_ttl(60 * 60), 60 * 60)
+        self.assertIsNone(invalidated_ttl(None))
+
+
+class SemanticIndexTests(TestCase):
+    DOCUMENTS = [
+        (901, 'calm senior dog house trained good with kids'),
+        (902, 'playful kitten loves toys and climbing'),
+        (903, 'energetic puppy needs a yard and long walks'),
+        (904, 'shy cat prefers a quiet home'),
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def index(self):
+        return semantic_search.PetSemanticIndex(self.directory)
+
+    def test_index_is_one_bundle_with_a_generation(self):
+        index = self.index().build(self.DOCUMENTS)
+        self.assertEqual(sorted(f for f in os.listdir(self.directory) if not f.endswith('.lock')), [semantic_search.INDEX_FILE])
+        self.assertEqual(index.search('house trained dog')[0][0], 901)
+        generation = index.snapshot.generation
+        index.add_or_update(905, 'gentle old dog house trained')
+        self.assertNotEqual(index.snapshot.generation, generation)
+        self.assertEqual(self.index().load().generation, index.snapshot.generation)
+
+    def test_writers_sharing_the_directory_keep_each_others_updates(self):
+        self.index().build(self.DOCUMENTS)
+        # Two workers, each with the index loaded before the other wrote
+        first, second = self.index(), self.index()
+        first.load()
+        second.load()
+        first.add_or_update(905, 'kitten loves toys')
+        second.add_or_update(906, 'puppy needs long walks')
+        second.remove(902)
+        self.assertEqual(sorted(self.index().load().pet_ids), [901, 903, 904, 905, 906])
+        self.assertEqual(sorted(first.search('kitten toys puppy walks dog cat', limit=10)), sorted(second.search('kitten toys puppy walks dog cat', limit=10)))
+
+    def test_pet_saves_reindex_after_commit_and_only_when_text_changes(self):
+        index = self.index().build(self.DOCUMENTS)
+        user = User.objects.create_user('poster', password='pw')
+        # (The fixture pet has no image on disk to resize)
+        with mock.patch.object(semantic_search, '_index', index), mock.patch('adoption.signals.schedule_derivatives'):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                pet = make_pet(user, additional_details='playful kitten loves toys')
+                # Not written until the transaction commits
+                self.assertNotIn(pet.id, index.load().pet_ids)
+            self.assertTrue(callbacks)
+            self.assertIn(pet.id, index.load().pet_ids)
+
+            generation = index.snapshot.generation
+            with self.captureOnCommitCallbacks(execute=True):
+                pet.adoption_status = PetStatus.APPROVED.code
+                pet.save()
+                pet.location = 'Davao'
+                pet.save(update_fields=['location'])
+            self.assertEqual(index.load().generation, generation)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                pet.additional_details = 'shy senior dog'
+                pet.save()
+            self.assertNotEqual(index.load().generation, generation)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                pet.delete()
+            self.assertNotIn(pet.id, index.load().pet_ids)
+
+    def test_fixture_loads_have_no_side_effects(self):
+        index = self.index().build(self.DOCUMENTS)
+        user = User.objects.create_user('poster', password='pw')
+        rows = serializers.serialize('json', [make_pet(user, name='Bantay')])
+        PendingPetForAdoption.objects.all().delete()
+        with mock.patch.object(semantic_search, '_index', index), \
+                mock.patch('adoption.signals.schedule_derivatives') as schedule, \
+                mock.patch('adoption.signals.update_blob_references') as update_references:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                for obj in serializers.deserialize('json', rows):
+                    obj.save()
+        self.assertEqual(PendingPetForAdoption.objects.get().name, 'Bantay')
+        self.assertEqual(callbacks, [])
+        schedule.assert_not_called()
+        update_references.assert_not_called()
+        self.assertEqual(index.load().generation, index.snapshot.generation)
+        self.assertEqual(sorted(index.load().pet_ids), [901, 902, 903, 904])
+
+
+class StandInPetSite(BaseHTTPRequestHandler):
+    """Serves the saved Petfinder page at /ok (and after a pause at /delayed), answers 500 at /error and stalls at /slow"""
+    hits = []
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        self.hits.append(path)
+        if path == '/delayed':
+            time.sleep(0.3)
+        if path == '/slow':
+            # Longer than any timeout the tests give; the client is gone by the time it ends
+            time.sleep(1)
+            return
+        if path == '/error':
+            self.send_response(500)
+            self.end_headers()
+            return
+        body = fixture_page('petfinder_search.html')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class PetSourceTests(TestCase):
+    def setUp(self):
+        StandInPetSite.hits = []
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StandInPetSite)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def source(self, path, key='standin', timeout=2, breaker=None):
+        def fetch(session, query, timeout):
+            return web_search._get_page(session, self.base_url + path, {'name': query}, timeout)
+        return web_search.PetSource(key, 'Stand-in', fetch, web_search.parse_petfinder, timeout=timeout, breaker=breaker)
+
+    def test_results_and_latency_are_recorded(self):
+        source = self.source('/ok')
+        self.assertEqual([pet['name'] for pet in source.search('buddy')], ['Buddy', 'Buddy Boy', 'Buddy'])
+        metrics = source.status()['metrics']
+        self.assertEqual((metrics['calls'], metrics['successes'], metrics['errors']), (1, 1, {}))
+        self.assertEqual(sum(metrics['latency_histogram'].values()), 1)
+
+    def test_timeouts_open_the_circuit(self):
+        source = self.source('/slow', timeout=0.2, breaker=web_search.CircuitBreaker(failure_threshold=2, cooldown=60))
+        for _ in range(2):
+            with self.assertRaises(requests.Timeout):
+                source.search('buddy')
+        self.assertEqual(source.status()['circuit']['state'], 'open')
+
+        # Refused without calling the site while cooling off
+        with self.assertRaises(web_search.SourceUnavailable):
+            source.search('buddy')
+        self.assertEqual(len(StandInPetSite.hits), 2)
+        metrics = source.status()['metrics']
+        self.assertEqual(metrics['errors'], {'ReadTimeout': 2})
+        self.assertEqual(metrics['short_circuited'], 1)
+
+    def test_trial_call_after_cooldown_closes_the_circuit(self):
+        breaker = web_search.CircuitBreaker(failure_threshold=1, cooldown=0)
+        with self.assertRaises(requests.HTTPError):
+            self.source('/error', breaker=breaker).search('buddy')
+        self.assertEqual(breaker.state, 'open')
+        # A failed trial re-opens it; a good one closes it
+        with self.assertRaises(requests.HTTPError):
+            self.source('/error', breaker=breaker).search('buddy')
+        self.assertEqual(breaker.state, 'open')
+        self.assertEqual(len(self.source('/ok', breaker=breaker).search('buddy')), 3)
+        self.assertEqual(breaker.snapshot(), {'state': 'closed', 'consecutive_failures': 0, 'retry_in_seconds': None})
+
+    def test_search_returns_what_arrives_before_the_deadline(self):
+        search = web_search.SimplePetWebSearch([self.source('/slow', key='slow'), self.source('/ok', key='fast')])
+        started = time.monotonic()
+        pets = search.search_pets_by_name('buddy', deadline=0.5)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual([pet['name'] for pet in pets], ['Buddy', 'Buddy Boy', 'Buddy'])
+
+
+    def test_concurrent_misses_share_one_scrape(self):
+        source = self.source('/delayed', key='coalesced')
+        futures = [web_search.cached_web_search(source, query) for query in ('buddy', 'Buddy', '  BUDDY ')]
+        self.assertEqual(len({id(future) for future in futures}), 1)
+        self.assertFalse(futures[0].done())
+
+        # Callers on other threads join the same scrape too
+        joined = []
+        threads = [threading.Thread(target=lambda: joined.append(web_search.cached_web_search(source, 'buddy'))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(future is futures[0] for future in joined))
+
+        self.assertEqual(len(futures[0].result(timeout=5)), 3)
+        self.assertEqual(StandInPetSite.hits, ['/delayed'])
+        # Now cached: answered without a scrape
+        cached = web_search.cached_web_search(source, 'buddy')
+        self.assertTrue(cached.done())
+        self.assertEqual(cached.result(), futures[0].result())
+        self.assertEqual(StandInPetSite.hits, ['/delayed'])
+
+    def test_stale_results_are_served_while_one_refresh_runs(self):
+        source = self.source('/delayed', key='stale')
+        cache_key = web_search.web_search_cache_key(source.key, 'buddy')
+        stale = [{'id': 'pf_old', 'name': 'Buddy (yesterday)'}]
+        cache.set(cache_key, {'results': stale, 'fresh_until': time.time() - 1}, 60)
+
+        started = time.monotonic()
+        for _ in range(3):
+            future = web_search.cached_web_search(source, 'buddy')
+            self.assertTrue(future.done())
+            self.assertEqual(future.result(), stale)
+        self.assertLess(time.monotonic() - started, 0.3)
+
+        # One refresh in the background replaces the entry
+        deadline = time.monotonic() + 5
+        while cache.get(cache_key)['results'] == stale and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(StandInPetSite.hits, ['/delayed'])
+        fresh = web_search.cached_web_search(source, 'buddy').result()
+        self.assertEqual([pet['name'] for pet in fresh], ['Buddy', 'Buddy Boy', 'Buddy'])
+        self.assertGreater(cache.get(cache_key)['fresh_until'], time.time())
+
+    def test_failed_refresh_keeps_serving_stale_results(self):
+        source = self.source('/error', key='stale_error')
+        cache_key = web_search.web_search_cache_key(source.key, 'buddy')
+        stale = [{'id': 'pf_old', 'name': 'Buddy (yesterday)'}]
+        cache.set(cache_key, {'results': stale, 'fresh_until': time.time() - 1}, 60)
+
+        self.assertEqual(web_search.cached_web_search(source, 'buddy').result(), stale)
+        deadline = time.monotonic() + 5
+        while source.status()['metrics']['calls'] == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(web_search.cached_web_search(source, 'buddy').result(), stale)
+        self.assertEqual(StandInPetSite.hits, ['/error'])
+
+class WebSearchSourcesTests(TestCase):
+    def test_source_health_is_for_admins_only(self):
+        url = reverse('web_search_sources_api')
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(User.objects.create_user('adopter', password='pw'))
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        admin = User.objects.create_user('admin', password='pw')
+        AdminUser.objects.create(user=admin)
+        self.client.force_login(admin)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['sources']), len(web_search.PET_SOURCES))
+
+
+def fixture_page(name):
+    with open(os.path.join(os.path.dirname(__file__), 'fixtures', 'web_search', name), 'rb') as f:
+        return f.read()
+
+
+class WebScrapingTests(TestCase):
+    def test_petfinder_page(self):
+        pets = web_search.parse_petfinder(fixture_page('petfinder_search.html'), 'Buddy')
+        # Only the first five cards are read; "Buddy Jr" is the eighth
+        self.assertEqual([pet['name'] for pet in pets], ['Buddy', 'Buddy Boy', 'Buddy'])
+        self.assertEqual(
+            {key: pets[0][key] for key in ('animal_type', 'breed', 'color', 'location', 'image_url', 'source_url')},
+            {
+                'animal_type': 'Dog', 'breed': 'Golden Retriever', 'color': 'Golden', 'location': 'Austin, TX',
+                'image_url': 'https://dl5zpyw5k3jeb.cloudfront.net/photos/pets/5550/1/?width=300',
+                'source_url': 'https://www.petfinder.com/dog/buddy-5550/',
+            },
+        )
+        self.assertEqual(pets[2]['breed'], 'Maine Coon')
+        self.assertNotEqual(pets[0]['id'], pets[2]['id'])
+
+    def test_adopt_a_pet_page_prefers_result_cards_over_articles(self):
+        cards = find_pet_cards(fixture_page('adoptapet_search.html'), ADOPT_A_PET_CARD_SELECTORS, limit=10)
+        self.assertEqual(len(cards), 6)
+        self.assertTrue(all('search-result' in card['class'] for card in cards))
+
+        pets = web_search.parse_adopt_a_pet(fixture_page('adoptapet_search.html'), 'buddy')
+        self.assertEqual([pet['name'] for pet in pets], ['Buddy', 'Buddy', 'Little Buddy'])
+        self.assertEqual(pets[0]['image_url'], 'https://media.adoptapet.com/image/upload/c_fill,w_300/7700.jpg')
+        self.assertEqual(pets[0]['source_url'], 'https://www.adoptapet.com/pet/7700-buddy')
+        self.assertEqual(pets[1]['breed'], 'Bulldog')
+
+    def test_strainer_keeps_only_the_card_containers(self):
+        markup = fixture_page('petfinder_search.html')
+        soup = BeautifulSoup(markup, HTML_PARSER, parse_only=card_strainer(PETFINDER_CARD_SELECTORS))
+        self.assertIsNone(soup.find('nav'))
+        self.assertIsNone(soup.find('script'))
+        self.assertIsNone(soup.find(class_='petCard-promo'))
+        self.assertEqual(len(soup.find_all('div', class_='petCard-body')), 8)
+
+    def test_cards_match_a_whole_page_parse(self):
+        for page, selectors in PAGE_SELECTORS.items():
+            markup = fixture_page(page)
+            with self.subTest(page=page):
+                self.assertEqual(
+                    [card.get_text() for card in find_pet_cards(markup, selectors)],
+                    [card.get_text() for card in full_page_cards(markup, selectors)],
+                )
+
+    def test_benchmark_runs_on_the_fixture_pages(self):
+        out = StringIO()
+        call_command('benchmark_scraping', repeat=1, stdout=out)
+        self.assertEqual(out.getvalue().count('same cards'), len(PAGE_SELECTORS))
+        self.assertNotIn('CARDS DIFFER', out.getvalue())
+        self.assertIn('us per card', out.getvalue())
+
+    def test_extractor_fills_every_attribute_in_one_pass(self):
+        self.assertEqual(card_extractor.extract("Pepper\nKittens | Russian Blue mix | 7 months old\nSalem, OR ★"), {
+            'animal_type': 'Cat', 'breed': 'Russian Blue', 'color': 'Blue', 'age': 'Young',
+            'location': 'Salem, OR', 'description': 'Pepper Kittens Russian Blue mix 7 months old Salem, OR',
+        })
+        attributes = card_extractor.extract("Rex, mixed breed. Age: 4")
+        self.assertEqual((attributes['breed'], attributes['age'], attributes['color']), ('Mixed Breed', '4 years old', 'Unknown'))
+
+    def test_extractor_agrees_with_one_scan_per_attribute_on_the_fixture_cards(self):
+        for page, selectors in PAGE_SELECTORS.items():
+            for card in find_pet_cards(fixture_page(page), selectors, limit=None):
+                text = card.get_text()
+                expected = per_attribute_extract(text)
+                extracted = card_extractor.extract(text)
+                with self.subTest(card=text.split()[0]):
+                    for attribute in ('animal_type', 'breed', 'color', 'location'):
+                        self.assertEqual(extracted[attribute], expected[attribute])
+
+
+class HotQueryPlanTests(TestCase):
+    """The hot filters stay on their indexes once the tables hold a realistic amount of data"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # bulk_create sends no signals, so seeding skips counters, derivatives and the semantic index
+        users = User.objects.bulk_create([User(username=f"user{i}") for i in range(200)])
+        statuses = [status.code for status in PetStatus]
+        pets = PendingPetForAdoption.objects.bulk_create([
+            PendingPetForAdoption(
+                user=users[i % len(users)], name=f"Pet {i}", animal_type='Cat', breed='Puspin', color='Orange',
+                gender='Male', age='2', location='Cebu', additional_details='Friendly', img='pics/cat.png',
+                adoption_status=statuses[i % len(statuses)],
+            ) for i in range(3000)
+        ], batch_size=500)
+        request_statuses = [status.code for status in RequestStatus]
+        adoptions = PetAdoptionTable.objects.bulk_create([
+            PetAdoptionTable(
+                pet=pets[i % len(pets)], user=users[i % len(users)], first_name='Juan', last_name='Dela Cruz',
+                contact_number='09170000000', address='Manila', adopter_type='Individual', living_situation='House',
+                previous_pet_experience='Dogs', owns_other_pets='No',
+                adoption_request_status=request_statuses[i % len(request_statuses)],
+            ) for i in range(3000)
+        ], batch_size=500)
+        TrackUpdateTable.objects.bulk_create([
+            TrackUpdateTable(
+                pet_adoption_request=adoptions[i % len(adoptions)], followup_date=date(2024, 1, 1) + timedelta(days=i % 400),
+                living_situation='indoor', housing_type='cage', author=users[i % len(users)],
+            ) for i in range(6000)
+        ], batch_size=500)
+        FollowUpScheduleEntry.objects.bulk_create([
+            FollowUpScheduleEntry(adoption=adoption, sequence=sequence, due_date=date(2024, 1, 1) + timedelta(days=30 * sequence + n % 30))
+            for n, adoption in enumerate(adoptions[:1000]) for sequence in range(1, 7)
+        ], batch_size=500)
+        Notification.objects.bulk_create([
+            Notification(user=users[i % len(users)], message=f"Update {i}", is_read=i % 3 == 0) for i in range(6000)
+        ], batch_size=500)
+        # Fresh statistics, so the planner weighs the indexes against this data
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('explain_hot_queries', fail_on_scan=True, stdout=out)
+        self.assertEqual(out.getvalue().count('index '), len(HOT_QUERIES))
+
+    def test_full_scans_are_reported(self):
+        unindexed = [('Pets by color', lambda: PendingPetForAdoption.objects.filter(color='Orange'))]
+        with mock.patch.object(explain_hot_queries, 'HOT_QUERIES', HOT_QUERIES + unindexed):
+            with self.assertRaisesMessage(CommandError, '1 hot queries plan a full table scan: Pets by color'):
+                call_command('explain_hot_queries', fail_on_scan=True, stdout=StringIO())
+
+
+class FixtureLoadTests(TemporaryMediaMixin, TestCase):
+    FIXTURE = os.path.join(settings.BASE_DIR, 'data_dump.json')
+
+    def test_data_dump_loads_without_side_effects(self):
+        out = StringIO()
+        with mock.patch('adoption.signals.push_notifications') as push, \
+                mock.patch('adoption.signals.refresh_pet_in_index') as reindex:
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command('loaddata', self.FIXTURE, exclude=['contenttypes', 'auth.permission'], stdout=out)
+        self.assertIn('Installed 361 object(s)', out.getvalue())
+        self.assertEqual(PendingPetForAdoption.objects.count(), 19)
+        self.assertEqual(PetAdoptionTable.objects.count(), 15)
+        self.assertEqual(TrackUpdateTable.objects.count(), 19)
+        self.assertFalse(PetAdoptionTable.objects.filter(created_at__isnull=True).exists())
+        self.assertFalse(TrackUpdateTable.objects.filter(created_at__isnull=True).exists())
+
+        # Counted, so the bell badges match the table, but nobody was pushed about old rows
+        unread = dict(
+            Notification.objects.filter(is_read=False).order_by().values_list('user_id').annotate(n=Count('pk'))
+        )
+        counters = dict(NotificationCounter.objects.filter(unread_count__gt=0).values_list('user_id', 'unread_count'))
+        self.assertEqual(counters, unread)
+        push.assert_not_called()
+        reindex.assert_not_called()
+        self.assertEqual(os.listdir(self.media_root), [])
+        self.assertFalse(MediaBlob.objects.exists())
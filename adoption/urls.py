@@ -15,6 +15,7 @@ urlpatterns = [
     
     # ===== EXISTING WEB SEARCH URL =====
     path('api/search/web/', views.search_pets_web, name='search_pets_web'),
+    path('api/search/web/sources/', views.web_search_sources_api, name='web_search_sources_api'),
     
     # ===== EXISTING MAP URLS =====
     path('api/pets/locations/', views.get_pets_locations, name='get_pets_locations'),
@@ -0,0 +1,72 @@
+# adoption/utils/blob_storage.py
+import hashlib
+import os
+
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+
+# Uploads are stored once per distinct content, as blobs/<first two hex digits>/<sha256><ext>
+BLOB_DIR = 'blobs'
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def is_blob_name(name):
+    return bool(name) and name.startswith(f"{BLOB_DIR}/")
+
+
+def content_digest(content):
+    """sha256 hex digest of a File, read in chunks and rewound afterwards"""
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def blob_name_for(content, name):
+    digest = content_digest(content)
+    extension = os.path.splitext(name)[1].lower()
+    return f"{BLOB_DIR}/{digest[:2]}/{digest}{extension}"
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    The default storage (settings.STORAGES): every uploaded file is saved under
+    its content hash instead of upload_to plus a random suffix, so the same
+    photo posted twice, or by two users, takes up disk space once. A field's
+    upload_to directory no longer shows up in stored names.
+
+    Names already under BLOB_DIR are written as given. Files that must keep
+    an exact name anywhere (the resized copies in
+    adoption/utils/image_derivatives.py, which sit next to their original)
+    go through save_as. Blobs are never deleted here: references are
+    counted and unreferenced blobs removed by adoption/utils/media_blobs.py.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        if is_blob_name(name):
+            return super().save(name, content, max_length=max_length)
+
+        blob_name = blob_name_for(content, name)
+        if self.exists(blob_name):
+            # Already stored; touching it tells the collector it is in use again
+            os.utime(self.path(blob_name))
+            return blob_name
+        saved_name = self._save(blob_name, content)
+        if saved_name != blob_name:
+            # An identical upload was written in the meantime and got the name first
+            self.delete(saved_name)
+        return blob_name
+
+    def save_as(self, name, content):
+        """Write content under exactly name, replacing any file there; not content-addressed"""
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        if self.exists(name):
+            self.delete(name)
+        return self._save(name, content)
@@ -0,0 +1,29 @@
+# adoption/utils/caching.py
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+
+# Backends whose entries live inside one worker process
+PROCESS_LOCAL_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+# Entries that writers drop on change (pet details, dashboard counts, report calendars)
+# are only dropped in the writing process when the cache isn't shared; other workers
+# may serve them this long, so that is as long as they are kept
+LOCAL_CACHE_TTL = 60
+
+
+def cache_is_shared(alias=DEFAULT_CACHE_ALIAS):
+    """True when every worker process reads and writes the same cache (Redis, Memcached, ...)"""
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def invalidated_ttl(ttl):
+    """
+    Timeout for a cache entry that writers invalidate: ttl (None for no expiry)
+    with a shared cache, at most LOCAL_CACHE_TTL with a per-process one
+    """
+    if cache_is_shared():
+        return ttl
+    return LOCAL_CACHE_TTL if ttl is None else min(ttl, LOCAL_CACHE_TTL)
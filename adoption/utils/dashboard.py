@@ -0,0 +1,62 @@
+# adoption/utils/dashboard.py
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from ..models import PendingPetForAdoption, PetAdoptionTable
+from .caching import invalidated_ttl
+from .followup_compliance import month_bounds
+from .followup_schedule import adoptions_owing
+from .statuses import PetStatus, RequestStatus
+
+# Counts are invalidated by signals on every write; the TTL is only a safety net
+# for writes that bypass signals (queryset.update(), raw SQL, the admin shell),
+# shortened by invalidated_ttl when the cache isn't shared between workers.
+DASHBOARD_CACHE_TTL = 10 * 60
+
+
+def _dashboard_cache_key():
+    # "Reports due" is per calendar month, so a new month starts a new entry
+    return f"admin_dashboard_counts_{timezone.localdate():%Y_%m}"
+
+
+def _counts_by(queryset, field):
+    # One GROUP BY query; order_by() drops any default ordering from the grouping
+    return {row[field]: row['total'] for row in queryset.values(field).annotate(total=Count('id')).order_by()}
+
+
+def _reports_due(period):
+    """
+    Approved adoptions with a scheduled follow-up due in period's month that
+    hasn't been filed: the ones check_followup_compliance reminds once the
+    month is over, counted from the same query.
+    """
+    return adoptions_owing(*month_bounds(period)).count()
+
+
+def compute_dashboard_counts():
+    requests_by_status = _counts_by(PetAdoptionTable.objects.all(), 'adoption_request_status')
+    pets_by_status = _counts_by(PendingPetForAdoption.objects.all(), 'adoption_status')
+    return {
+        'requests_by_status': requests_by_status,
+        'requests_total': sum(requests_by_status.values()),
+        'pets_by_status': pets_by_status,
+        'pending_count': pets_by_status.get(PetStatus.PENDING.code, 0),
+        'approved_count': pets_by_status.get(PetStatus.APPROVED.code, 0),
+        'adopted_count': pets_by_status.get(PetStatus.ADOPTED.code, 0),
+        'reports_due': _reports_due(timezone.localdate()),
+    }
+
+
+def get_dashboard_counts():
+    """Request and pet counts by status plus reports due, served from cache"""
+    cache_key = _dashboard_cache_key()
+    counts = cache.get(cache_key)
+    if counts is None:
+        counts = compute_dashboard_counts()
+        cache.set(cache_key, counts, invalidated_ttl(DASHBOARD_CACHE_TTL))
+    return counts
+
+
+def invalidate_dashboard_counts():
+    cache.delete(_dashboard_cache_key())
@@ -0,0 +1,87 @@
+# adoption/utils/followup_calendar.py
+import calendar
+import time
+from datetime import date
+
+from django.core.cache import cache
+from django.db.models import Min
+
+from ..models import TrackUpdateTable
+from .caching import invalidated_ttl
+
+# Months are dropped through the adoption's version key whenever one of its reports
+# changes (see adoption/signals.py); the TTL only bounds how long old months linger.
+# Both are capped by invalidated_ttl when the cache isn't shared between workers.
+FOLLOWUP_CALENDAR_CACHE_TTL = 60 * 60
+
+
+def _version_key(adoption_id):
+    return f"followup_calendar_version_{adoption_id}"
+
+
+def _calendar_version(adoption_id):
+    version = cache.get(_version_key(adoption_id))
+    if version is None:
+        version = time.time_ns()
+        cache.set(_version_key(adoption_id), version, invalidated_ttl(None))
+    return version
+
+
+def invalidate_followup_calendar(adoption_id):
+    # A new version orphans every cached month at once; the tracking start date
+    # shown on all of them can move when any report changes
+    cache.set(_version_key(adoption_id), time.time_ns(), invalidated_ttl(None))
+
+
+def build_month_calendar(adoption_id, year, month):
+    """
+    Calendar context for one adoption's follow-up reports in a month: the
+    month's reports in one ordered query, grouped by day in a single pass.
+
+    Args:
+        adoption_id (int): PetAdoptionTable ID
+        year (int): Calendar year
+        month (int): 1-12; anything else raises ValueError
+
+    Returns:
+        dict: The monthly_reports context used by reportRequest.html and
+            OwnerReportRequest.html, plus report_count
+    """
+    days_in_month = calendar.monthrange(year, month)[1]
+    first_day, last_day = date(year, month, 1), date(year, month, days_in_month)
+
+    reports = (
+        TrackUpdateTable.objects
+        .filter(pet_adoption_request_id=adoption_id, followup_date__range=(first_day, last_day))
+        .order_by('followup_date', 'id')
+        .values('id', 'followup_date', 'notes')
+    )
+    daily_reports = {}
+    for report in reports:
+        daily_reports.setdefault(report['followup_date'].day, []).append(report)
+
+    tracking_start_date = TrackUpdateTable.objects.filter(
+        pet_adoption_request_id=adoption_id,
+    ).aggregate(start=Min('followup_date'))['start']
+
+    # The grid starts on Sunday
+    return {
+        'year': year,
+        'month': month,
+        'days_list': list(range(1, days_in_month + 1)),
+        'daily_reports': daily_reports,
+        'report_count': sum(len(day_reports) for day_reports in daily_reports.values()),
+        'empty_cells_before': [None] * ((first_day.weekday() + 1) % 7),
+        'empty_cells_after': [None] * (6 - (last_day.weekday() + 1) % 7),
+        'tracking_start_date': tracking_start_date,
+    }
+
+
+def get_month_calendar(adoption_id, year, month):
+    """build_month_calendar, cached per (adoption, year, month)"""
+    cache_key = f"followup_calendar_{adoption_id}_{_calendar_version(adoption_id)}_{year}_{month}"
+    monthly_reports = cache.get(cache_key)
+    if monthly_reports is None:
+        monthly_reports = build_month_calendar(adoption_id, year, month)
+        cache.set(cache_key, monthly_reports, invalidated_ttl(FOLLOWUP_CALENDAR_CACHE_TTL))
+    return monthly_reports
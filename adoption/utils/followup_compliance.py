@@ -0,0 +1,85 @@
+# adoption/utils/followup_compliance.py
+import calendar
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+
+from ..models import FollowUpComplianceNotice, PetAdoptionTable
+from .followup_schedule import adoptions_owing
+from .notifications import NotificationBatch
+
+
+def month_bounds(period):
+    """First and last day of the month containing period"""
+    first_day = period.replace(day=1)
+    return first_day, first_day.replace(day=calendar.monthrange(first_day.year, first_day.month)[1])
+
+
+def previous_month():
+    return (timezone.localdate().replace(day=1) - timedelta(days=1)).replace(day=1)
+
+
+def adoptions_behind(period):
+    """
+    Approved adoptions that left follow-ups on their schedule due in period's
+    month unfulfilled and haven't been reminded about it yet, as one grouped
+    query: id, user_id, pet name, the follow-ups owed and the reports filed
+    in the month.
+
+    The schedule (adoption/utils/followup_schedule.py) is the only rule for
+    what an adopter owes; adoptions approved before it existed are counted
+    once `manage.py build_followup_schedule` has backfilled them.
+    """
+    first_day, last_day = month_bounds(period)
+    already_notified = FollowUpComplianceNotice.objects.filter(adoption=OuterRef('pk'), period=first_day)
+    return (
+        adoptions_owing(first_day, last_day)
+        .filter(~Exists(already_notified))
+        .annotate(period_reports=Count('trackupdatetable', distinct=True,
+                                       filter=Q(trackupdatetable__followup_date__range=(first_day, last_day))))
+        .order_by('id')
+        .values('id', 'user_id', 'pet__name', 'owed', 'period_reports')
+    )
+
+
+def reminder_message(pet_name, owed, period):
+    month = f"{calendar.month_name[period.month]} {period.year}"
+    if owed == 1:
+        return f"The follow-up report for {pet_name} due in {month} wasn't filed. Please submit it as soon as possible."
+    return f"{owed} follow-up reports for {pet_name} due in {month} weren't filed. Please submit them as soon as possible."
+
+
+def send_compliance_reminders(period=None, dry_run=False):
+    """
+    Remind every adopter who missed a scheduled follow-up report in period's
+    month (default: last month), once per adoption per month.
+
+    Returns:
+        list: The adoptions_behind() rows that were (or, with dry_run, would be) reminded;
+        ones another run reminded first are left out
+    """
+    first_day = month_bounds(period or previous_month())[0]
+    behind = list(adoptions_behind(first_day))
+    if dry_run or not behind:
+        return behind
+
+    with transaction.atomic():
+        # A run overlapping this one waits on these row locks, then finds the notices this
+        # run wrote; only adoptions noticed here are reminded, so nobody hears twice
+        ids = [row['id'] for row in behind]
+        list(PetAdoptionTable.objects.select_for_update().filter(id__in=ids).order_by('id').values_list('id', flat=True))
+        noticed = set(FollowUpComplianceNotice.objects.filter(
+            adoption_id__in=ids, period=first_day,
+        ).values_list('adoption_id', flat=True))
+        behind = [row for row in behind if row['id'] not in noticed]
+        FollowUpComplianceNotice.objects.bulk_create([
+            FollowUpComplianceNotice(adoption_id=row['id'], period=first_day, report_count=row['period_reports'])
+            for row in behind
+        ])
+        notifications = NotificationBatch()
+        for row in behind:
+            notifications.add(row['user_id'], reminder_message(row['pet__name'], row['owed'], first_day))
+        notifications.send()
+    return behind
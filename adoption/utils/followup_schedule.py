@@ -0,0 +1,155 @@
+# adoption/utils/followup_schedule.py
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from ..models import FollowUpScheduleEntry, PetAdoptionTable, TrackUpdateTable
+from .notifications import NotificationBatch
+from .statuses import RequestStatus
+
+# An approved adoption owes one report every FOLLOWUP_INTERVAL_DAYS, FOLLOWUP_COUNT times
+# (about six months); the compliance job and the admin dashboard count what's missed from it
+FOLLOWUP_COUNT = 6
+FOLLOWUP_INTERVAL_DAYS = 30
+
+# The reminder sweep warns this many days ahead of a due date, keeps nagging about
+# missed ones for a week, and notifies in batches of this size
+REMINDER_LEAD_DAYS = 3
+REMINDER_OVERDUE_DAYS = 7
+REMINDER_BATCH_SIZE = 500
+
+
+def schedule_dates(approved_on):
+    return [approved_on + timedelta(days=FOLLOWUP_INTERVAL_DAYS * n) for n in range(1, FOLLOWUP_COUNT + 1)]
+
+
+def create_followup_schedules(approved_on_by_adoption):
+    """
+    Write the schedule for each {adoption_id: approval date}, then attach any
+    reports already filed. Adoptions that already have a schedule keep it.
+    """
+    if not approved_on_by_adoption:
+        return
+    with transaction.atomic():
+        FollowUpScheduleEntry.objects.bulk_create([
+            FollowUpScheduleEntry(adoption_id=adoption_id, sequence=sequence, due_date=due_date)
+            for adoption_id, approved_on in approved_on_by_adoption.items()
+            for sequence, due_date in enumerate(schedule_dates(approved_on), start=1)
+        ], ignore_conflicts=True)
+        for report in TrackUpdateTable.objects.filter(
+            pet_adoption_request_id__in=approved_on_by_adoption, schedule_entry__isnull=True,
+        ).order_by('followup_date', 'id').only('id', 'pet_adoption_request_id', 'followup_date'):
+            fulfil_followup(report)
+
+
+def fulfil_followup(report):
+    """
+    Mark the earliest open entry whose window has opened (due no more than one
+    interval after the report) as fulfilled by report; a late report settles
+    the overdue entry first. Returns the entry, or None when nothing was owed.
+    """
+    with transaction.atomic():
+        entry = (
+            FollowUpScheduleEntry.objects.select_for_update()
+            .filter(adoption_id=report.pet_adoption_request_id, report__isnull=True,
+                    due_date__lte=report.followup_date + timedelta(days=FOLLOWUP_INTERVAL_DAYS))
+            .order_by('due_date')
+            .first()
+        )
+        if entry is not None:
+            entry.report_id = report.id
+            entry.save(update_fields=['report'])
+    return entry
+
+
+def followups_due(start=None, end=None):
+    """Open schedule entries due between start and end (inclusive), across all adoptions"""
+    entries = FollowUpScheduleEntry.objects.filter(report__isnull=True)
+    if start is not None:
+        entries = entries.filter(due_date__gte=start)
+    if end is not None:
+        entries = entries.filter(due_date__lte=end)
+    return entries
+
+
+def adoptions_owing(start, end):
+    """
+    Approved adoptions with follow-ups due between start and end (inclusive)
+    that no report has fulfilled, annotated with how many as owed. The
+    compliance reminders and the admin dashboard's "reports due" both count
+    from this, so they agree.
+    """
+    return (
+        PetAdoptionTable.objects
+        # One filter() so owed counts the same (open, in range) entries the rows were picked by
+        .filter(adoption_request_status=RequestStatus.APPROVED.code,
+                followup_schedule__report__isnull=True, followup_schedule__due_date__range=(start, end))
+        .annotate(owed=Count('followup_schedule', distinct=True))
+    )
+
+
+def schedule_span(adoption_id):
+    """(first due date, last due date) of an adoption's schedule, or None without one"""
+    span = FollowUpScheduleEntry.objects.filter(adoption_id=adoption_id).aggregate(start=Min('due_date'), end=Max('due_date'))
+    return (span['start'], span['end']) if span['start'] else None
+
+
+def reminder_message(pet_name, due_date, today):
+    if due_date < today:
+        return f"A follow-up report for {pet_name} was due on {due_date:%b %d, %Y}. Please submit it as soon as possible."
+    return f"A follow-up report for {pet_name} is due on {due_date:%b %d, %Y}."
+
+
+def send_due_reminders(lead_days=REMINDER_LEAD_DAYS, overdue_days=REMINDER_OVERDUE_DAYS,
+                       batch_size=REMINDER_BATCH_SIZE, today=None):
+    """
+    Remind adopters once about each open follow-up due within lead_days, or
+    missed within the last overdue_days, walking the entries in id order one
+    short transaction per batch.
+
+    Returns:
+        int: Number of reminders sent
+    """
+    today = today or timezone.localdate()
+    due = followups_due(today - timedelta(days=overdue_days), today + timedelta(days=lead_days)).filter(
+        reminded_at__isnull=True,
+        adoption__adoption_request_status=RequestStatus.APPROVED.code,
+    )
+    sent = last_id = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                due.filter(id__gt=last_id).order_by('id')
+                .values('id', 'due_date', 'adoption__user_id', 'adoption__pet__name')[:batch_size]
+            )
+            if not rows:
+                break
+            FollowUpScheduleEntry.objects.filter(id__in=[row['id'] for row in rows]).update(reminded_at=timezone.now())
+            notifications = NotificationBatch()
+            for row in rows:
+                notifications.add(row['adoption__user_id'], reminder_message(row['adoption__pet__name'], row['due_date'], today))
+            notifications.send()
+        sent += len(rows)
+        last_id = rows[-1]['id']
+        if len(rows) < batch_size:
+            break
+    return sent
+
+
+def backfill_followup_schedules(batch_size=REMINDER_BATCH_SIZE):
+    """Create schedules for approved adoptions that predate the schedule table; returns how many"""
+    missing = PetAdoptionTable.objects.filter(
+        adoption_request_status=RequestStatus.APPROVED.code, followup_schedule__isnull=True,
+    ).order_by('id').values_list('id', 'approval_date_time', 'request_date')
+    created = 0
+    while True:
+        rows = list(missing[:batch_size])
+        if not rows:
+            return created
+        create_followup_schedules({
+            adoption_id: timezone.localdate(approved_at or requested_at or timezone.now())
+            for adoption_id, approved_at, requested_at in rows
+        })
+        created += len(rows)
@@ -0,0 +1,118 @@
+# adoption/utils/idempotency.py
+import hashlib
+from datetime import timedelta
+from functools import wraps
+
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from ..models import IdempotencyKey
+
+# Clients send the same key when they retry a POST: an "Idempotency-Key" header
+# for API calls, or an "idempotency_key" field rendered into HTML forms.
+IDEMPOTENCY_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+IDEMPOTENCY_FIELD = 'idempotency_key'
+
+# How long a finished response is replayed, and how long an in-flight claim is held
+IDEMPOTENCY_TTL = timedelta(days=1)
+IDEMPOTENCY_LOCK_TTL = timedelta(seconds=60)
+
+
+def _stored_response(entry):
+    response = HttpResponse(bytes(entry.content), status=entry.status_code, content_type=entry.content_type)
+    if entry.location:
+        response['Location'] = entry.location
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _expired(entry, now):
+    ttl = IDEMPOTENCY_LOCK_TTL if entry.status_code is None else IDEMPOTENCY_TTL
+    return entry.created_at < now - ttl
+
+
+def claim_key(digest, fingerprint):
+    """
+    Claim digest for this call by inserting its row; the unique constraint makes
+    exactly one of several concurrent callers, in any process, succeed. An
+    expired claim or response is taken over in place.
+
+    Returns:
+        None once claimed; the IdempotencyKey row when another call holds the
+        key; False when that row changed while being read (answer 409, as for
+        a call still in progress)
+    """
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(key=digest, fingerprint=fingerprint, created_at=now)
+        return None
+    except IntegrityError:
+        pass
+
+    entry = IdempotencyKey.objects.filter(key=digest).first()
+    if entry is None:
+        return False
+    if _expired(entry, now):
+        # Only one taker wins: the UPDATE matches the row as it was read
+        taken = IdempotencyKey.objects.filter(pk=entry.pk, created_at=entry.created_at).update(
+            fingerprint=fingerprint, status_code=None, content=b'', content_type='', location='', created_at=now,
+        )
+        return None if taken else False
+    return entry
+
+
+def purge_expired_keys(now=None):
+    """Delete rows past IDEMPOTENCY_TTL; returns how many"""
+    now = now or timezone.now()
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=now - IDEMPOTENCY_TTL).delete()
+    return deleted
+
+
+def idempotent(view_func):
+    """
+    Run a POST view at most once per (user, path, idempotency key).
+
+    A retry with the same key and body gets the first response replayed; a retry
+    that arrives while the first call is still running gets 409, and reusing a key
+    with a different body gets 422. Requests without a key run as before.
+    """
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if request.method != 'POST':
+            return view_func(request, *args, **kwargs)
+        # Fingerprint the raw body before request.POST consumes the stream
+        fingerprint = hashlib.sha1(request.body).hexdigest()
+        key = request.META.get(IDEMPOTENCY_HEADER) or request.POST.get(IDEMPOTENCY_FIELD)
+        if not key:
+            return view_func(request, *args, **kwargs)
+
+        digest = hashlib.sha1(f"{request.user.pk}|{request.path}|{key}".encode()).hexdigest()
+        entry = claim_key(digest, fingerprint)
+        if entry is not None:
+            if entry and entry.fingerprint != fingerprint:
+                return JsonResponse({'success': False, 'error': 'Idempotency key was already used with a different request'}, status=422)
+            if not entry or entry.status_code is None:
+                return JsonResponse({'success': False, 'error': 'A request with this idempotency key is still in progress'}, status=409)
+            return _stored_response(entry)
+
+        claim = IdempotencyKey.objects.filter(key=digest, fingerprint=fingerprint, status_code__isnull=True)
+        try:
+            response = view_func(request, *args, **kwargs)
+        except Exception:
+            claim.delete()
+            raise
+
+        if response.status_code >= 500 or response.streaming:
+            # Not a final answer; let the client retry with the same key
+            claim.delete()
+        else:
+            claim.update(
+                status_code=response.status_code,
+                content=response.content,
+                content_type=response['Content-Type'],
+                location=response.get('Location') or '',
+            )
+        return response
+    return _wrapped_view
@@ -0,0 +1,243 @@
+# adoption/utils/image_derivatives.py
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Resized copies written next to each uploaded photo: "pics/cat.jpg" gets
+# "pics/cat.thumb.webp", "pics/cat.thumb.jpg", "pics/cat.card.webp" and so on.
+# Sizes are the longest edge in pixels; originals smaller than a size are not enlarged,
+# so the widths srcset lists are the ones each copy actually came out at.
+DERIVATIVE_SIZES = {
+    'thumb': 320,
+    'card': 640,
+    'full': 1600,
+}
+DERIVATIVE_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+# The pixel widths of an image's derivatives (or False while they don't exist yet)
+# are cached so templates don't open files; a miss is only remembered briefly
+# because a background job may be writing them
+READY_CACHE_TTL = 24 * 60 * 60
+NOT_READY_CACHE_TTL = 5 * 60
+
+
+def derivative_name(name, size, ext):
+    root, _ = os.path.splitext(name)
+    return f"{root}.{size}.{ext}"
+
+
+def _ready_cache_key(name):
+    return f"image_derivatives_ready_{name}"
+
+
+def _stored_widths(storage, name):
+    """{size: width in pixels} read from the written JPEGs' headers, or False while not all exist"""
+    # The largest size in the last format is written last
+    if not storage.exists(derivative_name(name, 'full', list(DERIVATIVE_FORMATS)[-1])):
+        return False
+    widths = {}
+    try:
+        for size in DERIVATIVE_SIZES:
+            with storage.open(derivative_name(name, size, 'jpg'), 'rb') as stored, Image.open(stored) as image:
+                widths[size] = image.width
+    except OSError:
+        logger.exception("Could not read the derivative sizes of %s", name)
+        return False
+    return widths
+
+
+def _cached_widths(storage, name, cached):
+    # True is what the cache held before widths were recorded: ready, widths unknown
+    if cached is None or cached is True:
+        return _stored_widths(storage, name)
+    return cached
+
+
+def derivative_widths(field_file):
+    """{size: actual width in pixels} once every derivative of this file has been written, else None"""
+    if not field_file or not field_file.name:
+        return None
+    cache_key = _ready_cache_key(field_file.name)
+    cached = cache.get(cache_key)
+    widths = _cached_widths(field_file.storage, field_file.name, cached)
+    if widths is not cached:
+        cache.set(cache_key, widths, READY_CACHE_TTL if widths else NOT_READY_CACHE_TTL)
+    return widths or None
+
+
+def derivatives_ready(field_file):
+    """True once every derivative of this file has been written"""
+    return derivative_widths(field_file) is not None
+
+
+def _urls(storage, name):
+    return {
+        size: {ext: storage.url(derivative_name(name, size, ext)) for ext in DERIVATIVE_FORMATS}
+        for size in DERIVATIVE_SIZES
+    }
+
+
+def derivative_urls(field_file):
+    """{size: {ext: url}} for a file whose derivatives are ready, else None"""
+    if not derivatives_ready(field_file):
+        return None
+    return _urls(field_file.storage, field_file.name)
+
+
+def derivative_urls_many(storage, names):
+    """derivative_urls for many stored names with one cache round trip: {name: urls or None}"""
+    names = {name for name in names if name}
+    cached = cache.get_many([_ready_cache_key(name) for name in names])
+    checked = {True: {}, False: {}}
+    urls = {}
+    for name in names:
+        stored = cached.get(_ready_cache_key(name))
+        widths = _cached_widths(storage, name, stored)
+        if widths is not stored:
+            checked[bool(widths)][_ready_cache_key(name)] = widths
+        urls[name] = _urls(storage, name) if widths else None
+    cache.set_many(checked[True], READY_CACHE_TTL)
+    cache.set_many(checked[False], NOT_READY_CACHE_TTL)
+    return urls
+
+
+def derivative_url(field_file, size):
+    """URL of one derivative (JPEG, which every client can show), or the original's while not ready"""
+    if not field_file or not field_file.name:
+        return ''
+    if derivatives_ready(field_file):
+        return field_file.storage.url(derivative_name(field_file.name, size, 'jpg'))
+    return field_file.url
+
+
+def srcset(field_file, ext):
+    """
+    A srcset attribute value over all sizes at their actual widths, or '' while
+    not ready (the browser then uses src). Sizes that came out the same width,
+    because the original is smaller than the larger ones, are listed once.
+    """
+    widths = derivative_widths(field_file)
+    if widths is None:
+        return ''
+    urls = _urls(field_file.storage, field_file.name)
+    candidates = {}
+    for size, width in widths.items():
+        candidates.setdefault(width, urls[size][ext])
+    return ', '.join(f"{url} {width}w" for width, url in candidates.items())
+
+
+def _flatten(image):
+    """JPEG has no alpha channel: paint transparent images onto white"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _save_exact(storage, name, content):
+    """
+    Save under the predictable name, without the suffix a storage adds to avoid
+    overwriting or (ContentAddressedStorage) the content hash it names uploads by
+    """
+    if hasattr(storage, 'save_as'):
+        return storage.save_as(name, content)
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, content)
+
+
+def generate_derivatives(storage, name, force=False):
+    """
+    Write every size and format of one stored image. Returns the number of files
+    written (0 when they already exist and force is False).
+    """
+    if not force and storage.exists(derivative_name(name, 'full', list(DERIVATIVE_FORMATS)[-1])):
+        return 0
+    with storage.open(name, 'rb') as original:
+        with Image.open(original) as image:
+            # Apply the camera's orientation before EXIF is dropped with the re-encode
+            image = ImageOps.exif_transpose(image)
+            image.load()
+
+    written = 0
+    widths = {}
+    for size, edge in DERIVATIVE_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((edge, edge), Image.LANCZOS)
+        widths[size] = resized.width
+        for ext, options in DERIVATIVE_FORMATS.items():
+            if options['format'] == 'JPEG':
+                encoded = _flatten(resized)
+            else:
+                has_alpha = 'A' in resized.getbands() or 'transparency' in resized.info
+                encoded = resized if resized.mode in ('RGB', 'RGBA') else resized.convert('RGBA' if has_alpha else 'RGB')
+            buffer = BytesIO()
+            encoded.save(buffer, **options)
+            target = derivative_name(name, size, ext)
+            saved = _save_exact(storage, target, ContentFile(buffer.getvalue()))
+            if saved != target:
+                # Templates build URLs from the predictable name; never mark this image ready
+                storage.delete(saved)
+                raise OSError(f"Storage saved {target} as {saved}")
+            written += 1
+    cache.set(_ready_cache_key(name), widths, READY_CACHE_TTL)
+    return written
+
+
+def delete_derivatives(storage, name):
+    """Remove every resized copy of a stored image (used when the image itself goes)"""
+    for size in DERIVATIVE_SIZES:
+        for ext in DERIVATIVE_FORMATS:
+            target = derivative_name(name, size, ext)
+            if storage.exists(target):
+                storage.delete(target)
+    cache.delete(_ready_cache_key(name))
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = getattr(settings, 'IMAGE_DERIVATIVE_WORKERS', 2)
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-derivatives')
+    return _executor
+
+
+def _generate_in_background(storage, name, on_done):
+    try:
+        if generate_derivatives(storage, name) and on_done is not None:
+            on_done()
+    except Exception:
+        logger.exception("Could not generate derivatives for %s", name)
+
+
+def schedule_derivatives(field_file, on_done=None):
+    """
+    Generate a file's derivatives on the background pool once the current
+    transaction commits, so uploads don't wait on resizing. on_done runs after
+    new derivatives were written (e.g. to drop a cached payload that lacks them).
+    """
+    if not field_file or not field_file.name or derivatives_ready(field_file):
+        return
+    storage, name = field_file.storage, field_file.name
+    transaction.on_commit(lambda: _get_executor().submit(_generate_in_background, storage, name, on_done))
@@ -0,0 +1,251 @@
+# adoption/utils/media_blobs.py
+import re
+from collections import Counter
+from datetime import timedelta
+
+from django.core.files.base import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from ..models import MediaBlob, PendingPetForAdoption, PetAdoptionTable, TrackUpdateTable
+from .blob_storage import BLOB_DIR, blob_name_for, is_blob_name
+from .image_derivatives import DERIVATIVE_FORMATS, DERIVATIVE_SIZES, delete_derivatives, derivative_name
+from .pet_detail import invalidate_pet_detail
+
+# The file fields stored through ContentAddressedStorage, and so reference-counted
+BLOB_FIELDS = {
+    PendingPetForAdoption: 'img',
+    TrackUpdateTable: 'photos',
+    PetAdoptionTable: 'id_upload',
+}
+
+# An unreferenced blob is kept this long before it's collected, so an upload whose row
+# hasn't been committed yet (or a photo re-posted shortly after removal) still finds it
+ORPHAN_GRACE_PERIOD = timedelta(days=1)
+COLLECT_BATCH_SIZE = 500
+
+# A blob's file name is its sha256 plus the original extension; resized copies add a size
+_BLOB_FILE_RE = re.compile(r'^[0-9a-f]{64}(\.[^.]+)?$')
+
+
+def retain_blobs(names):
+    """Add one reference per occurrence of each blob name (other names are ignored)"""
+    counts = Counter(name for name in names if is_blob_name(name))
+    if not counts:
+        return
+    MediaBlob.objects.bulk_create([MediaBlob(name=name) for name in counts], ignore_conflicts=True)
+    by_amount = {}
+    for name, n in counts.items():
+        by_amount.setdefault(n, []).append(name)
+    for n, blob_names in by_amount.items():
+        MediaBlob.objects.filter(name__in=blob_names).update(ref_count=F('ref_count') + n)
+
+
+def release_blobs(names):
+    """Drop one reference per occurrence; the collector removes blobs left with none"""
+    counts = Counter(name for name in names if is_blob_name(name))
+    by_amount = {}
+    for name, n in counts.items():
+        by_amount.setdefault(n, []).append(name)
+    for n, blob_names in by_amount.items():
+        MediaBlob.objects.filter(name__in=blob_names).update(
+            ref_count=Greatest(F('ref_count') - n, 0), released_at=timezone.now(),
+        )
+
+
+def stored_file_name(instance, update_fields=None):
+    """
+    The file name instance's row holds before a save (for pre_save), or None when
+    the row is new or the save doesn't write the file field.
+    """
+    field_name = BLOB_FIELDS[type(instance)]
+    if instance._state.adding or (update_fields is not None and field_name not in update_fields):
+        return None
+    return type(instance).objects.filter(pk=instance.pk).values_list(field_name, flat=True).first()
+
+
+def update_blob_references(instance, previous_name, update_fields=None):
+    """After a save: move the reference from previous_name to the file the row holds now"""
+    field_name = BLOB_FIELDS[type(instance)]
+    if update_fields is not None and field_name not in update_fields:
+        return
+    current_name = getattr(instance, field_name).name or None
+    if current_name != previous_name:
+        retain_blobs([current_name])
+        release_blobs([previous_name])
+
+
+def referenced_blob_counts(names=None):
+    """{blob name: references} straight from the file fields, optionally only for names"""
+    counts = Counter()
+    for model, field_name in BLOB_FIELDS.items():
+        rows = model.objects.filter(**{f'{field_name}__startswith': f"{BLOB_DIR}/"})
+        if names is not None:
+            rows = rows.filter(**{f'{field_name}__in': names})
+        for name, n in rows.order_by().values_list(field_name).annotate(n=Count('pk')):
+            counts[name] += n
+    return counts
+
+
+def recount_blob_references():
+    """
+    Reset every MediaBlob.ref_count from the file fields, for rows changed by
+    queryset.update() or raw SQL (which send no signals). Returns how many
+    counts were wrong.
+    """
+    referenced = referenced_blob_counts()
+    with transaction.atomic():
+        MediaBlob.objects.bulk_create([MediaBlob(name=name) for name in referenced], ignore_conflicts=True)
+        wrong = [
+            (pk, referenced.get(name, 0))
+            for pk, name, ref_count in MediaBlob.objects.values_list('pk', 'name', 'ref_count').iterator()
+            if referenced.get(name, 0) != ref_count
+        ]
+        now = timezone.now()
+        for pk, ref_count in wrong:
+            changes = {'ref_count': ref_count}
+            if ref_count == 0:
+                changes['released_at'] = now
+            MediaBlob.objects.filter(pk=pk).update(**changes)
+    return len(wrong)
+
+
+def _remove_blob(name):
+    """Delete a blob's file and its resized copies; returns the bytes freed"""
+    freed = 0
+    if default_storage.exists(name):
+        freed = default_storage.size(name)
+        default_storage.delete(name)
+    delete_derivatives(default_storage, name)
+    return freed
+
+
+def _modified_before(name, cutoff):
+    # ContentAddressedStorage touches a blob whenever an upload turns out to be a copy of it
+    try:
+        return default_storage.get_modified_time(name) < cutoff
+    except FileNotFoundError:
+        return True
+
+
+def collect_orphaned_blobs(grace_period=ORPHAN_GRACE_PERIOD, dry_run=False, batch_size=COLLECT_BATCH_SIZE):
+    """
+    Delete blobs nothing has referenced for grace_period: MediaBlob rows at zero
+    references, then files under BLOB_DIR that never got a row (an upload
+    whose transaction rolled back). Each candidate is checked against the
+    file fields once more before it goes.
+
+    Returns:
+        tuple: (blobs deleted, bytes freed); with dry_run, what would be
+    """
+    cutoff = timezone.now() - grace_period
+    deleted = freed = last_id = 0
+
+    while True:
+        with transaction.atomic():
+            candidates = list(
+                MediaBlob.objects.select_for_update()
+                .filter(ref_count=0, released_at__lt=cutoff, id__gt=last_id)
+                .order_by('id').values_list('id', 'name')[:batch_size]
+            )
+            if not candidates:
+                break
+            last_id = candidates[-1][0]
+            still_used = referenced_blob_counts([name for _, name in candidates])
+            for blob_id, name in candidates:
+                if still_used.get(name):
+                    if not dry_run:
+                        MediaBlob.objects.filter(id=blob_id).update(ref_count=still_used[name])
+                    continue
+                if not _modified_before(name, cutoff):
+                    continue
+                deleted += 1
+                if dry_run:
+                    freed += default_storage.size(name) if default_storage.exists(name) else 0
+                    continue
+                freed += _remove_blob(name)
+                MediaBlob.objects.filter(id=blob_id).delete()
+
+    # Files without a row: written by storage.save() for a row that was never committed
+    known = set(MediaBlob.objects.values_list('name', flat=True).iterator())
+    stray = []
+    if default_storage.exists(BLOB_DIR):
+        for prefix in default_storage.listdir(BLOB_DIR)[0]:
+            for file_name in default_storage.listdir(f"{BLOB_DIR}/{prefix}")[1]:
+                name = f"{BLOB_DIR}/{prefix}/{file_name}"
+                if _BLOB_FILE_RE.match(file_name) and name not in known and _modified_before(name, cutoff):
+                    stray.append(name)
+    still_used = referenced_blob_counts(stray) if stray else {}
+    for name in stray:
+        if still_used.get(name):
+            continue
+        deleted += 1
+        freed += default_storage.size(name) if dry_run else _remove_blob(name)
+    return deleted, freed
+
+
+def move_legacy_files(dry_run=False):
+    """
+    Re-store files saved before ContentAddressedStorage (pics/Capture_0evVkzB.png
+    and the like) as blobs, pointing every row at the blob and carrying their
+    resized copies along, then delete the originals. Identical files collapse
+    into one blob. Reference counts are rebuilt afterwards.
+
+    Returns:
+        dict: legacy files moved (or missing on disk), the blobs they became,
+            and their total bytes before and after
+    """
+    legacy_names = set()
+    for model, field_name in BLOB_FIELDS.items():
+        legacy_names.update(
+            model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            .exclude(**{f'{field_name}__startswith': f"{BLOB_DIR}/"})
+            .order_by().values_list(field_name, flat=True).distinct()
+        )
+
+    summary = {'moved': 0, 'missing': 0, 'blobs': 0, 'bytes_before': 0, 'bytes_after': 0}
+    blob_sizes = {}
+    for old_name in sorted(legacy_names):
+        if not default_storage.exists(old_name):
+            summary['missing'] += 1
+            continue
+        size = default_storage.size(old_name)
+        with default_storage.open(old_name, 'rb') as f:
+            new_name = blob_name_for(File(f), old_name) if dry_run else default_storage.save(old_name, f)
+        summary['moved'] += 1
+        summary['bytes_before'] += size
+        blob_sizes[new_name] = size
+        if dry_run:
+            continue
+
+        for size_name in DERIVATIVE_SIZES:
+            for ext in DERIVATIVE_FORMATS:
+                old_copy = derivative_name(old_name, size_name, ext)
+                new_copy = derivative_name(new_name, size_name, ext)
+                if default_storage.exists(old_copy):
+                    if not default_storage.exists(new_copy):
+                        with default_storage.open(old_copy, 'rb') as f:
+                            default_storage.save(new_copy, f)
+                    default_storage.delete(old_copy)
+
+        pet_ids = set()
+        with transaction.atomic():
+            for model, field_name in BLOB_FIELDS.items():
+                rows = model.objects.filter(**{field_name: old_name})
+                if model is PendingPetForAdoption:
+                    pet_ids.update(rows.values_list('id', flat=True))
+                elif model is TrackUpdateTable:
+                    pet_ids.update(rows.values_list('pet_adoption_request__pet_id', flat=True))
+                # update() sends no signals; the counts are rebuilt below
+                rows.update(**{field_name: new_name})
+        default_storage.delete(old_name)
+        invalidate_pet_detail(*pet_ids)
+
+    summary['blobs'] = len(blob_sizes)
+    summary['bytes_after'] = sum(blob_sizes.values())
+    if not dry_run:
+        recount_blob_references()
+    return summary
@@ -0,0 +1,76 @@
+# adoption/utils/notification_retention.py
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models import Notification, NotificationArchive
+
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_BATCH_SIZE = 1000
+
+
+def get_retention_days():
+    return getattr(settings, 'NOTIFICATION_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+
+
+def _delete_ids(ids):
+    # Plain DELETE: QuerySet.delete() would load every row to send post_delete, and
+    # the only receiver (the unread counter) has nothing to do for read notifications
+    table = connection.ops.quote_name(Notification._meta.db_table)
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE id IN ({placeholders})", ids)
+
+
+def archive_batch(cutoff, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Move up to batch_size read notifications created before cutoff into
+    NotificationArchive, in one short transaction. Returns how many moved.
+    """
+    with transaction.atomic():
+        rows = list(
+            Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+            .order_by('created_at', 'id')
+            .values('id', 'user_id', 'message', 'created_at')[:batch_size]
+        )
+        if not rows:
+            return 0
+        # ignore_conflicts makes a batch that was archived but not deleted (crash in between) safe to redo
+        NotificationArchive.objects.bulk_create([
+            NotificationArchive(notification_id=row['id'], user_id=row['user_id'],
+                                message=row['message'], created_at=row['created_at'])
+            for row in rows
+        ], ignore_conflicts=True)
+        _delete_ids([row['id'] for row in rows])
+    return len(rows)
+
+
+def archive_read_notifications(older_than_days=None, batch_size=DEFAULT_BATCH_SIZE, max_batches=None, pause=0.0):
+    """
+    Archive read notifications past the retention window, batch by batch, so
+    locks stay short and the job can be stopped and resumed at any point.
+
+    Args:
+        older_than_days (int): Retention window; defaults to NOTIFICATION_RETENTION_DAYS
+        batch_size (int): Rows moved per transaction
+        max_batches (int): Stop after this many batches (None: until done)
+        pause (float): Seconds to sleep between batches to spread the load
+
+    Returns:
+        int: Number of notifications archived
+    """
+    days = get_retention_days() if older_than_days is None else older_than_days
+    cutoff = timezone.now() - timedelta(days=days)
+    archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(cutoff, batch_size)
+        archived += moved
+        batches += 1
+        if moved < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return archived
@@ -0,0 +1,166 @@
+# adoption/utils/notification_stream.py
+import asyncio
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+# Events buffered per open stream; a client that falls this far behind loses the oldest
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Comment line sent when idle so proxies don't cut the connection, and how long one
+# stream lives before the browser's EventSource reconnects (bounds leaked subscriptions)
+STREAM_KEEPALIVE_SECONDS = 20
+STREAM_MAX_SECONDS = 5 * 60
+STREAM_RETRY_MS = 5000
+
+
+def user_channel(user_id):
+    return f"notifications.user.{user_id}"
+
+
+class Subscription:
+    """One open stream's view of a channel; events arrive on the stream's own event loop"""
+
+    def __init__(self, broker, channel, loop):
+        self.broker = broker
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def put(self, event):
+        # Runs on self.loop; a slow client drops its oldest event rather than blocking publishers
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class NotificationBroker:
+    """
+    Fans notification events out to open SSE streams.
+
+    publish() is called from ordinary request code once a transaction commits;
+    subscribe() is called by the async stream view. The default InMemoryBroker
+    only reaches streams held by the same process; a broker backed by an external
+    pub/sub (e.g. Redis) can be plugged in with the NOTIFICATION_BROKER setting
+    when the app runs several workers.
+    """
+
+    def publish(self, channel, event):
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+    def has_subscribers(self, channel):
+        # Lets publishers skip building events nobody will receive; external brokers can't know
+        return True
+
+
+class InMemoryBroker(NotificationBroker):
+    """Process-local broker: the default, and a stand-in for tests"""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def has_subscribers(self, channel):
+        return bool(self._subscribers.get(channel))
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                # Publishers run in sync request threads; hand the event to the stream's loop
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # The stream's loop is gone
+                self.unsubscribe(subscription)
+        return len(subscribers)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                broker_path = getattr(settings, 'NOTIFICATION_BROKER', 'adoption.utils.notification_stream.InMemoryBroker')
+                _broker = import_string(broker_path)()
+    return _broker
+
+
+def set_broker(broker):
+    """Swap the process-wide broker (e.g. a fresh InMemoryBroker in tests); returns the previous one"""
+    global _broker
+    with _broker_lock:
+        previous, _broker = _broker, broker
+    return previous
+
+
+def publish_to_user(user_id, event_type, data):
+    broker = get_broker()
+    channel = user_channel(user_id)
+    if broker.has_subscribers(channel):
+        broker.publish(channel, {'type': event_type, 'data': data})
+
+
+def format_sse(event_type, data):
+    return f"event: {event_type}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def user_event_stream(user_id, initial_count):
+    """
+    Async generator of SSE frames for one user: the current unread count, then
+    every event published to the user's channel until STREAM_MAX_SECONDS pass.
+
+    Args:
+        user_id (int): Whose channel to follow
+        initial_count (callable): Sync callable returning the unread count; called
+            after subscribing so no change between the two is missed
+    """
+    subscription = get_broker().subscribe(user_channel(user_id))
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + STREAM_MAX_SECONDS
+    try:
+        yield f"retry: {STREAM_RETRY_MS}\n\n"
+        yield format_sse('unread_count', {'count': await sync_to_async(initial_count)()})
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=min(STREAM_KEEPALIVE_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event['type'], event['data'])
+    finally:
+        subscription.close()
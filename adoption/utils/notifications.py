@@ -0,0 +1,191 @@
+# adoption/utils/notifications.py
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from ..models import AdminUser, Notification, NotificationCounter
+from .caching import invalidated_ttl
+from .notification_stream import get_broker, publish_to_user, user_channel
+
+# Users with an AdminUser row receive admin notifications. The lookup is cached
+# and dropped by the AdminUser signals in adoption/signals.py (everywhere only
+# when the cache is shared; see invalidated_ttl).
+ADMIN_RECIPIENTS_CACHE_KEY = 'notification_admin_recipient_ids'
+ADMIN_RECIPIENTS_CACHE_TTL = 60 * 60
+
+# Unread badge counts, served from NotificationCounter and cached per user. Writers
+# drop the entry; the short TTL bounds staleness in other processes' local caches.
+UNREAD_COUNT_CACHE_TTL = 60
+
+# How many unread notifications the bell dropdown loads when opened
+NOTIFICATION_DROPDOWN_LIMIT = 20
+
+
+def admin_recipient_ids():
+    user_ids = cache.get(ADMIN_RECIPIENTS_CACHE_KEY)
+    if user_ids is None:
+        user_ids = list(AdminUser.objects.order_by('user_id').values_list('user_id', flat=True))
+        cache.set(ADMIN_RECIPIENTS_CACHE_KEY, user_ids, invalidated_ttl(ADMIN_RECIPIENTS_CACHE_TTL))
+    return user_ids
+
+
+def invalidate_admin_recipients():
+    cache.delete(ADMIN_RECIPIENTS_CACHE_KEY)
+
+
+class NotificationBatch:
+    """
+    Collects the notifications produced while handling one request and writes
+    them with a single bulk INSERT once the surrounding transaction commits
+    (immediately when there is none), so a rolled-back action never notifies
+    anyone and the request pays one round trip however many recipients there are.
+    """
+
+    def __init__(self):
+        self._pending = {}
+
+    def add(self, user, message):
+        """user may be a User instance or a user ID; None is ignored"""
+        user_id = getattr(user, 'pk', user)
+        if user_id is not None:
+            # Dict keys keep insertion order and drop exact duplicates
+            self._pending[(user_id, message)] = None
+        return self
+
+    def add_admins(self, message, exclude=()):
+        for user_id in admin_recipient_ids():
+            if user_id not in exclude:
+                self.add(user_id, message)
+        return self
+
+    def __len__(self):
+        return len(self._pending)
+
+    def send(self):
+        pending, self._pending = list(self._pending), {}
+        if pending:
+            transaction.on_commit(lambda: write_notifications(pending))
+        return len(pending)
+
+
+def write_notifications(pending):
+    """Insert (user_id, message) pairs in one statement and bump the unread counters"""
+    with transaction.atomic():
+        created = Notification.objects.bulk_create(
+            [Notification(user_id=user_id, message=message) for user_id, message in pending],
+            batch_size=500,
+        )
+        # bulk_create sends no post_save, so the counters are maintained here
+        increment_unread_counts(Counter(user_id for user_id, _ in pending))
+        push_notifications(created)
+    return created
+
+
+def push_notifications(notifications):
+    """Send new notifications to the recipients' open streams once they are committed"""
+    def publish():
+        for notification in notifications:
+            publish_to_user(notification.user_id, 'notification', {
+                'id': notification.pk,
+                'message': notification.message,
+                'created_at': notification.created_at,
+            })
+    transaction.on_commit(publish)
+
+
+def notify(user, message):
+    """Single-recipient shorthand for NotificationBatch().add(user, message).send()"""
+    return NotificationBatch().add(user, message).send()
+
+
+def notify_admins(message, exclude=()):
+    return NotificationBatch().add_admins(message, exclude=exclude).send()
+
+
+# ==================== UNREAD COUNTERS ====================
+
+def unread_count_cache_key(user_id):
+    return f"notification_unread_count_{user_id}"
+
+
+def increment_unread_counts(counts):
+    """Add {user_id: n} to the unread counters; one UPDATE per distinct n (usually just one)"""
+    counts = {user_id: n for user_id, n in counts.items() if n}
+    if not counts:
+        return
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id) for user_id in counts], ignore_conflicts=True
+    )
+    by_amount = {}
+    for user_id, n in counts.items():
+        by_amount.setdefault(n, []).append(user_id)
+    for n, user_ids in by_amount.items():
+        NotificationCounter.objects.filter(user_id__in=user_ids).update(unread_count=F('unread_count') + n)
+    transaction.on_commit(lambda: unread_counts_changed(counts))
+
+
+def decrement_unread_count(user_id, n=1):
+    if n:
+        NotificationCounter.objects.filter(user_id=user_id).update(unread_count=Greatest(F('unread_count') - n, 0))
+        transaction.on_commit(lambda: unread_counts_changed([user_id]))
+
+
+def resync_unread_count(user_id):
+    """Recount from the Notification table (used when a row is edited in place)"""
+    unread = Notification.objects.filter(user_id=user_id, is_read=False).count()
+    NotificationCounter.objects.update_or_create(user_id=user_id, defaults={'unread_count': unread})
+    transaction.on_commit(lambda: unread_counts_changed([user_id]))
+    return unread
+
+
+def unread_counts_changed(user_ids):
+    """After a counter commit: drop the cached counts and push the new values to open streams"""
+    cache.delete_many([unread_count_cache_key(user_id) for user_id in user_ids])
+    broker = get_broker()
+    listening = [user_id for user_id in user_ids if broker.has_subscribers(user_channel(user_id))]
+    if listening:
+        for user_id, unread in NotificationCounter.objects.filter(user_id__in=listening).values_list('user_id', 'unread_count'):
+            publish_to_user(user_id, 'unread_count', {'count': unread})
+
+
+def get_unread_count(user):
+    """Unread badge count from the cache or the user's counter row; never touches Notification"""
+    if not user.is_authenticated:
+        return 0
+    cache_key = unread_count_cache_key(user.pk)
+    unread = cache.get(cache_key)
+    if unread is None:
+        # No row yet means nothing unread: the migration backfilled every user who had any
+        unread = NotificationCounter.objects.filter(user_id=user.pk).values_list('unread_count', flat=True).first() or 0
+        cache.set(cache_key, unread, UNREAD_COUNT_CACHE_TTL)
+    return unread
+
+
+def mark_read(user, notification_ids):
+    """
+    Mark the given notifications read (the ones the dropdown showed; others the
+    user hasn't seen stay unread) and take exactly that many off the counter.
+    IDs that aren't this user's unread notifications are ignored.
+
+    Returns:
+        tuple: (notifications marked read, unread count left)
+    """
+    with transaction.atomic():
+        updated = 0
+        if notification_ids:
+            updated = Notification.objects.filter(user=user, is_read=False, id__in=notification_ids).update(is_read=True)
+            decrement_unread_count(user.pk, updated)
+        # Read from the row: the cached count is only dropped once this commits
+        unread = NotificationCounter.objects.filter(user_id=user.pk).values_list('unread_count', flat=True).first() or 0
+    return updated, unread
+
+
+def unread_notifications(user, limit=NOTIFICATION_DROPDOWN_LIMIT):
+    return list(
+        Notification.objects.filter(user=user, is_read=False)
+        .order_by('-created_at')
+        .values('id', 'message', 'created_at')[:limit]
+    )
@@ -0,0 +1,139 @@
+# adoption/utils/pagination.py
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+# Largest ?page_size= a client may ask for; the default comes from REST_FRAMEWORK['PAGE_SIZE']
+MAX_PAGE_SIZE = 100
+
+# ?count=true adds the total; these are the values read as true
+COUNT_TRUE_VALUES = {'1', 'true', 'yes'}
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    The API's pagination (REST_FRAMEWORK['DEFAULT_PAGINATION_CLASS']): newest
+    first by created_at, id breaking ties. A page is one query that seeks
+    past the cursor on an index, without the COUNT and OFFSET of page
+    numbers, so page 50 of an infinite scroll costs what page 1 does, and
+    rows posted mid-scroll neither repeat nor shift entries.
+
+    DRF's cursor seeks on the first ordering field alone and steps over ties
+    with an offset, which repeats or skips rows when many share a created_at
+    (rows loaded or bulk-created together). Here the cursor holds every
+    ordering field, and a page seeks past the whole (created_at, id) key.
+
+    A view whose model has no created_at sets cursor_ordering. The total is
+    opt-in: ?count=true adds "count" to the response, at the price of one
+    COUNT over the whole (filtered) list.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+    count_query_param = 'count'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering is not None:
+            return tuple(ordering)
+        return super().get_ordering(request, queryset, view)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() in COUNT_TRUE_VALUES:
+            # Counted before the cursor narrows the queryset down to one page
+            self.count = queryset.count()
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor or (0, False, None)
+
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if current_position is not None:
+            queryset = queryset.filter(self._past_position(current_position, reverse))
+
+        # One row beyond the page tells whether another page follows. Positions are
+        # unique, so offset stays 0 for cursors this class wrote
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = following_position is not None
+            self.next_position, self.previous_position = current_position, following_position
+        else:
+            self.has_next = following_position is not None
+            self.has_previous = current_position is not None or offset > 0
+            self.next_position, self.previous_position = following_position, current_position
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _get_position_from_instance(self, instance, ordering):
+        # Every ordering field, so rows sharing a created_at still have distinct positions
+        fields = [order.lstrip('-') for order in ordering]
+        values = [instance[field] if isinstance(instance, dict) else getattr(instance, field) for field in fields]
+        return json.dumps([str(value) for value in values])
+
+    def _past_position(self, position, reverse):
+        """
+        The rows after position in the page's direction, as (a <= x) AND
+        ((a < x) OR (a = x AND b < y)) for descending fields a, b, so the leading
+        range bound can seek the index.
+        """
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        after = Q()
+        equal = Q()
+        for order, value in zip(self.ordering, values):
+            field = order.lstrip('-')
+            # Test for: (cursor reversed) XOR (field descending)
+            lookup = 'lt' if reverse != order.startswith('-') else 'gt'
+            after |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        first = self.ordering[0]
+        bound = 'lte' if reverse != first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{bound}': values[0]}) & after
+
+    def get_paginated_response(self, data):
+        response = {}
+        if self.count is not None:
+            response['count'] = self.count
+        response.update(next=self.get_next_link(), previous=self.get_previous_link(), results=data)
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {'type': 'integer', 'example': 123}
+        return response_schema
+
+
+def _reverse_ordering(ordering):
+    return tuple(order[1:] if order.startswith('-') else f'-{order}' for order in ordering)
+
+
+def paginated_rows(request, queryset, rows, view=None):
+    """
+    A cursor-paginated Response of queryset rendered through rows (a
+    ValuesSerializer), for API views that aren't generic views.
+    """
+    paginator = CreatedAtCursorPagination()
+    page = paginator.paginate_queryset(rows.values(queryset), request, view=view)
+    return paginator.get_paginated_response(rows.to_representation(page))
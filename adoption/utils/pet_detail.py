@@ -0,0 +1,103 @@
+# adoption/utils/pet_detail.py
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from ..models import FollowUpScheduleEntry, PendingPetForAdoption, PetAdoptionTable, TrackUpdateTable
+from ..serializers import PendingPetReadSerializer, PetAdoptionReadSerializer
+from .caching import invalidated_ttl
+from .statuses import RequestStatus
+
+# Dropped by the signals in adoption/signals.py (and by transition_requests, whose
+# UPDATEs send none) whenever the pet, its requests or its reports change; capped by
+# invalidated_ttl when the cache isn't shared between workers
+PET_DETAIL_CACHE_TTL = 60 * 60
+
+
+def pet_detail_cache_key(pet_id):
+    return f"adopt_pet_detail_{pet_id}"
+
+
+def invalidate_pet_detail(*pet_ids):
+    cache.delete_many([pet_detail_cache_key(pet_id) for pet_id in pet_ids if pet_id is not None])
+
+
+def build_pet_detail(pet_id):
+    """
+    The ReactAdoptPetDetailView payload: the pet, and for an approved adoption the
+    adopter, follow-up schedule and reports. Four queries however many reports
+    there are: the pet, the adoption joined to its user, and one prefetch each for
+    the schedule and the reports.
+
+    Raises PendingPetForAdoption.DoesNotExist for an unknown pet.
+    """
+    pet = PendingPetForAdoption.objects.get(pk=pet_id)
+    payload = {
+        'pet': PendingPetReadSerializer(pet).data,
+        'adoption_details': None,
+        'user_details': None,
+        'follow_up_dates': None,
+        'reports': [],
+    }
+
+    adoption = (
+        PetAdoptionTable.objects.filter(pet_id=pet.id, adoption_request_status=RequestStatus.APPROVED.code)
+        .select_related('user')
+        .prefetch_related(
+            Prefetch('followup_schedule', queryset=FollowUpScheduleEntry.objects.order_by('sequence')),
+            Prefetch('trackupdatetable_set', queryset=TrackUpdateTable.objects.order_by('followup_date', 'id')),
+        )
+        .order_by('pk')
+        .first()
+    )
+    if adoption is None:
+        return payload
+
+    user = adoption.user
+    payload['adoption_details'] = PetAdoptionReadSerializer(adoption).data
+    payload['user_details'] = {
+        'id': user.id,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'email': user.email,
+    }
+
+    schedule = list(adoption.followup_schedule.all())
+    if schedule:
+        payload['follow_up_dates'] = [entry.due_date for entry in schedule]
+        payload['follow_up_schedule'] = [
+            {'due_date': entry.due_date, 'fulfilled': entry.is_fulfilled, 'report_id': entry.report_id}
+            for entry in schedule
+        ]
+    else:
+        payload['follow_up_dates'] = 'No records yet'
+
+    payload['reports'] = [
+        {
+            'id': report.id,
+            'date': report.followup_date.strftime('%Y-%m-%d'),
+            'description': report.notes,
+            'living_situation': report.living_situation,
+            'housing_type': report.housing_type,
+            'behavioral_changes': report.behavioral_changes,
+            'health_issues': report.health_issues,
+            'photos': report.photos.url if report.photos else None,
+        } for report in adoption.trackupdatetable_set.all()
+    ]
+    return payload
+
+
+def get_pet_detail(pet_id):
+    """(etag, payload) for a pet, from the cache or build_pet_detail"""
+    cache_key = pet_detail_cache_key(pet_id)
+    cached = cache.get(cache_key)
+    if cached is None:
+        payload = build_pet_detail(pet_id)
+        body = json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True)
+        etag = '"%s"' % hashlib.md5(body.encode(), usedforsecurity=False).hexdigest()
+        cached = (etag, payload)
+        cache.set(cache_key, cached, invalidated_ttl(PET_DETAIL_CACHE_TTL))
+    return cached
@@ -0,0 +1,143 @@
+# adoption/utils/request_status.py
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import PendingPetForAdoption, PetAdoptionTable
+from .dashboard import invalidate_dashboard_counts
+from .followup_schedule import create_followup_schedules
+from .notifications import NotificationBatch
+from .pet_detail import invalidate_pet_detail
+from .statuses import OPEN_REQUEST_STATUSES, PetStatus, RequestStatus
+
+APPROVAL_MESSAGE = "Your request for adoption has been approved. You need to report for 15 days starting from the approval date."
+
+# What an approval writes to the pet, and to the other open requests for that pet
+ADOPTED_PET_STATUS = PetStatus.ADOPTED.code
+SUPERSEDED_REQUEST_STATUS = RequestStatus.SUPERSEDED.code
+
+
+def close_sibling_requests(pet_ids, exclude_ids=()):
+    """Mark the other open requests for these pets as superseded, in one UPDATE"""
+    return PetAdoptionTable.objects.filter(
+        pet_id__in=pet_ids,
+        adoption_request_status__in=OPEN_REQUEST_STATUSES,
+    ).exclude(id__in=exclude_ids).update(adoption_request_status=SUPERSEDED_REQUEST_STATUS)
+
+
+def lock_pets_for_approval(pet_ids):
+    """
+    Lock the pet rows for the rest of the transaction and return the IDs of
+    those that already have an adopter (call inside transaction.atomic)
+    """
+    pets = PendingPetForAdoption.objects.select_for_update().filter(id__in=pet_ids).order_by('id')
+    adopted_pets = {pet_id for pet_id, status in pets.values_list('id', 'adoption_status') if status == ADOPTED_PET_STATUS}
+    adopted_pets.update(PetAdoptionTable.objects.filter(
+        pet_id__in=pet_ids, adoption_request_status=RequestStatus.APPROVED.code,
+    ).values_list('pet_id', flat=True))
+    return adopted_pets
+
+
+def transition_requests(request_ids, new_status):
+    """
+    Move many adoption requests to new_status in one transaction.
+
+    Every side effect is set-based: one UPDATE per current status for the
+    requests, and on approval one UPDATE for the pets, one for their sibling
+    requests, one INSERT for the follow-up schedules and one for the adopter
+    notifications, written after the transaction commits.
+
+    The request rows are locked (SELECT ... FOR UPDATE) before their status is
+    read, so a concurrent reject can't overwrite an approval that commits
+    first: whichever runs second sees the other's status. Approvals first lock
+    the affected pet rows and re-check them under the lock, so two admins
+    approving different requests for the same pet can't both succeed. Locks are
+    taken pets first, then requests, each in id order, so concurrent batches
+    can't deadlock. The UPDATE also only matches the status that was read; a
+    row changed in between (possible where the database ignores FOR UPDATE) is
+    reported as skipped rather than overwritten.
+
+    Requests already in new_status are skipped, which makes retries harmless,
+    as are requests whose current status can't move to new_status (see
+    adoption.utils.statuses.TRANSITIONS).
+
+    Args:
+        request_ids (iterable): PetAdoptionTable IDs
+        new_status (str): Target status code; legacy spellings are accepted
+
+    Returns:
+        dict: 'updated' IDs, 'skipped' {id: reason} and 'not_found' IDs
+    """
+    request_ids = set(request_ids)
+    new_status = RequestStatus.parse(new_status).code
+    approving = new_status == RequestStatus.APPROVED.code
+    with transaction.atomic():
+        if approving:
+            pet_ids = set(PetAdoptionTable.objects.filter(id__in=request_ids).values_list('pet_id', flat=True))
+            adopted_pets = lock_pets_for_approval(pet_ids)
+
+        # Read statuses under the row locks so a competing transition that just committed is seen
+        rows = (
+            PetAdoptionTable.objects.select_for_update().filter(id__in=request_ids).order_by('id')
+            .values_list('id', 'pet_id', 'user_id', 'adoption_request_status')
+        )
+        found = {}
+        current = {}
+        for request_id, pet_id, user_id, status in rows:
+            found[request_id] = (pet_id, user_id)
+            current[request_id] = status
+
+        skipped = {}
+        for request_id, (pet_id, _) in found.items():
+            if current[request_id] == new_status:
+                skipped[request_id] = f"already {new_status}"
+            elif not RequestStatus.parse(current[request_id]).can_become(new_status):
+                skipped[request_id] = f"can't go from {current[request_id]} to {new_status}"
+            elif approving:
+                if pet_id in adopted_pets or pet_id not in pet_ids:
+                    # Covers an earlier approval, the oldest request in this batch winning,
+                    # and a request moved to another pet since the pets were locked
+                    skipped[request_id] = 'this pet has already been adopted'
+                else:
+                    adopted_pets.add(pet_id)
+
+        updated = []
+        changes = {'adoption_request_status': new_status}
+        if approving:
+            changes['approval_date_time'] = timezone.now()
+        elif new_status == RequestStatus.REJECTED.code:
+            changes['approval_date_time'] = None  # Clear approval date if rejected
+        by_status = {}
+        for request_id in found:
+            if request_id not in skipped:
+                by_status.setdefault(current[request_id], []).append(request_id)
+        for old_status, ids in by_status.items():
+            matched = PetAdoptionTable.objects.filter(id__in=ids, adoption_request_status=old_status).update(**changes)
+            if matched != len(ids):
+                moved = set(ids) - set(PetAdoptionTable.objects.filter(
+                    id__in=ids, adoption_request_status=new_status,
+                ).values_list('id', flat=True))
+                for request_id in moved:
+                    skipped[request_id] = 'changed by another update at the same time'
+            updated.extend(request_id for request_id in ids if request_id not in skipped)
+        updated.sort()
+
+        if approving and updated:
+            approved_pets = {found[request_id][0] for request_id in updated}
+            PendingPetForAdoption.objects.filter(id__in=approved_pets).update(adoption_status=ADOPTED_PET_STATUS)
+            close_sibling_requests(approved_pets, exclude_ids=updated)
+            create_followup_schedules({request_id: timezone.localdate(changes['approval_date_time']) for request_id in updated})
+            notifications = NotificationBatch()
+            for request_id in updated:
+                notifications.add(found[request_id][1], APPROVAL_MESSAGE)
+            notifications.send()
+
+        # queryset.update() skips post_save, so the cached dashboard counts and pet details are dropped here
+        transaction.on_commit(invalidate_dashboard_counts)
+        touched_pets = {pet_id for pet_id, _ in found.values()}
+        transaction.on_commit(lambda: invalidate_pet_detail(*touched_pets))
+
+    return {
+        'updated': updated,
+        'skipped': skipped,
+        'not_found': sorted(request_ids - set(found)),
+    }
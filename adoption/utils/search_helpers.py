@@ -1,6 +1,7 @@
 # adoption/utils/search_helpers.py
-from django.db.models import Q
+from django.db.models import Case, FloatField, Q, Value, When
 from .nlp_search import PetSearchNLP
+from .semantic_search import semantic_search
 
 def perform_smart_search(query, model_class):
     """
@@ -43,8 +44,38 @@ def perform_smart_search(query, model_class):
         # Fallback to simple text search
         results = _simple_text_search(query, model_class)
     
+    results = _blend_semantic_matches(query, results, model_class)
+    
     return results, entities
 
+def _blend_semantic_matches(query, results, model_class, limit=50, min_score=0.2):
+    """
+    Add conceptually similar listings found by the LSA index and annotate
+    every row with a semantic_score usable for relevance ordering
+    
+    Args:
+        query (str): The search query from user
+        results: Queryset from keyword/NLP matching
+        model_class: Django model class the index was built over
+    
+    Returns:
+        queryset: results plus semantic matches, annotated with semantic_score
+    """
+    matches = semantic_search(query, limit=limit, min_score=min_score)
+    if not matches:
+        return results.annotate(semantic_score=Value(0.0, output_field=FloatField()))
+    
+    matched_ids = [pet_id for pet_id, _ in matches]
+    return model_class.objects.filter(
+        Q(pk__in=results.values('pk')) | Q(pk__in=matched_ids)
+    ).annotate(
+        semantic_score=Case(
+            *[When(pk=pet_id, then=Value(score)) for pet_id, score in matches],
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    )
+
 def _simple_text_search(query, model_class):
     """
     Fallback simple text search across common fields
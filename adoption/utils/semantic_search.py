@@ -0,0 +1,367 @@
+# adoption/utils/semantic_search.py
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+import uuid
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    logger.warning("fcntl not available (Windows): semantic index writes are only serialized within one process")
+
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from', 'has', 'have',
+    'he', 'her', 'his', 'i', 'if', 'in', 'into', 'is', 'it', 'its', 'me', 'my', 'of', 'on',
+    'or', 'our', 'she', 'so', 'that', 'the', 'their', 'them', 'they', 'this', 'to', 'was',
+    'we', 'were', 'will', 'with', 'you', 'your'
+}
+
+# The whole index is one file, replaced atomically, so readers never mix two versions;
+# writers in every process take an exclusive lock on LOCK_FILE for their read-modify-write
+INDEX_FILE = 'index.npz'
+LOCK_FILE = 'index.lock'
+# The earlier layout (three files written one after the other), removed by the next save
+LEGACY_FILES = ('vectors.npy', 'components.npy', 'meta.json')
+
+# Model fields that feed pet_document(); saves touching none of them skip re-indexing
+INDEXED_FIELDS = {'additional_details', 'breed', 'animal_type', 'color'}
+
+
+def tokenize(text):
+    """Lowercase word tokens plus adjacent bigrams ("house trained" -> "house_trained")"""
+    words = [w for w in re.findall(r'[a-z]+', (text or '').lower()) if w not in STOP_WORDS and len(w) > 1]
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+def pet_document(pet):
+    """Text indexed for a pet; additional_details carries most of the signal"""
+    return ' '.join(filter(None, [pet.additional_details, pet.breed, pet.animal_type, pet.color]))
+
+
+def stored_pet_document(pet, update_fields=None):
+    """
+    pet_document() of the row as the database holds it before a save (for
+    pre_save): None for a new pet, and the pet's own text when the save writes
+    none of INDEXED_FIELDS
+    """
+    if pet._state.adding:
+        return None
+    if update_fields is not None and not INDEXED_FIELDS.intersection(update_fields):
+        return pet_document(pet)
+    stored = type(pet).objects.filter(pk=pet.pk).values(*INDEXED_FIELDS).first()
+    return pet_document(SimpleNamespace(**stored)) if stored else None
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _truncated_svd(matrix, k, oversample=10, power_iterations=2, seed=0):
+    """
+    Top-k SVD of a dense matrix. Small matrices use the exact decomposition,
+    larger ones a randomized range finder (Halko et al.) so the cost stays
+    proportional to k rather than to the vocabulary size.
+    """
+    n_rows, n_cols = matrix.shape
+    if min(n_rows, n_cols) <= k + oversample:
+        u, s, vt = np.linalg.svd(matrix, full_matrices=False)
+        return u[:, :k], s[:k], vt[:k]
+
+    rng = np.random.default_rng(seed)
+    q = matrix @ rng.standard_normal((n_cols, k + oversample)).astype(matrix.dtype)
+    q, _ = np.linalg.qr(q)
+    for _ in range(power_iterations):
+        q, _ = np.linalg.qr(matrix.T @ q)
+        q, _ = np.linalg.qr(matrix @ q)
+    u_small, s, vt = np.linalg.svd(q.T @ matrix, full_matrices=False)
+    return (q @ u_small)[:, :k], s[:k], vt[:k]
+
+
+# One loaded version of the index; never modified, so searches can use it without a lock
+IndexSnapshot = namedtuple('IndexSnapshot', 'generation vocabulary idf components vectors pet_ids row_by_pet')
+
+
+def _snapshot(vocabulary, idf, components, vectors, pet_ids, generation=None):
+    return IndexSnapshot(
+        generation=generation or uuid.uuid4().hex,
+        vocabulary=vocabulary,
+        idf=idf,
+        components=components,
+        vectors=vectors,
+        pet_ids=list(pet_ids),
+        row_by_pet={pet_id: row for row, pet_id in enumerate(pet_ids)},
+    )
+
+
+class PetSemanticIndex:
+    """
+    Latent semantic index over pet descriptions.
+
+    TF-IDF vectors are reduced with a truncated SVD and kept as a float32
+    matrix, so ranking a query is a single matrix-vector product. New or
+    edited pets are folded into the existing latent space without a full
+    rebuild.
+
+    Everything is saved as one .npz bundle, tagged with a generation id and
+    swapped in with os.replace, and reloaded whenever another process has
+    replaced it. Changes re-read the bundle under an exclusive file lock
+    before writing, so concurrent workers don't lose each other's updates.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or get_index_dir()
+        self.snapshot = None
+        self._loaded_stamp = None
+        self._reload_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    @property
+    def pet_ids(self):
+        return self.snapshot.pet_ids if self.snapshot else []
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, INDEX_FILE)
+
+    # ---------- building ----------
+
+    def build(self, documents, n_components=100, max_features=5000):
+        """Build the index from an iterable of (pet_id, text) pairs and save it"""
+        documents = [(pet_id, tokenize(text)) for pet_id, text in documents]
+        if not documents:
+            self.clear()
+            return self
+
+        doc_freq = Counter()
+        for _, tokens in documents:
+            doc_freq.update(set(tokens))
+        terms = [term for term, _ in doc_freq.most_common(max_features)]
+        vocabulary = {term: i for i, term in enumerate(sorted(terms))}
+
+        n_docs = len(documents)
+        idf = np.zeros(len(vocabulary), dtype=np.float32)
+        for term, col in vocabulary.items():
+            idf[col] = math.log((1 + n_docs) / (1 + doc_freq[term])) + 1.0
+
+        tfidf = np.vstack([_tfidf(vocabulary, idf, tokens) for _, tokens in documents])
+        k = max(1, min(n_components, *tfidf.shape))
+        u, s, vt = _truncated_svd(tfidf, k)
+
+        snapshot = _snapshot(
+            vocabulary, idf, vt.astype(np.float32), _normalize_rows(u * s).astype(np.float32),
+            [pet_id for pet_id, _ in documents],
+        )
+        with self._locked():
+            self._save(snapshot)
+        return self
+
+    def add_or_update(self, pet_id, text):
+        """Fold a single pet into the existing latent space (no re-decomposition)"""
+        with self._locked():
+            # Re-read under the lock: another process may have saved since this one loaded
+            snapshot = self.load()
+            if snapshot is None:
+                return False
+            vector = _project(snapshot, tokenize(text))
+            vectors = np.array(snapshot.vectors)
+            pet_ids = list(snapshot.pet_ids)
+            row = snapshot.row_by_pet.get(pet_id)
+            if row is None:
+                vectors = np.vstack([vectors, vector[np.newaxis, :]])
+                pet_ids.append(pet_id)
+            else:
+                vectors[row] = vector
+            self._save(snapshot._replace(generation=uuid.uuid4().hex, vectors=vectors, pet_ids=pet_ids,
+                                         row_by_pet={pid: i for i, pid in enumerate(pet_ids)}))
+        return True
+
+    def remove(self, pet_id):
+        with self._locked():
+            snapshot = self.load()
+            if snapshot is None or pet_id not in snapshot.row_by_pet:
+                return False
+            row = snapshot.row_by_pet[pet_id]
+            pet_ids = snapshot.pet_ids[:row] + snapshot.pet_ids[row + 1:]
+            self._save(snapshot._replace(generation=uuid.uuid4().hex,
+                                         vectors=np.delete(np.array(snapshot.vectors), row, axis=0),
+                                         pet_ids=pet_ids,
+                                         row_by_pet={pid: i for i, pid in enumerate(pet_ids)}))
+        return True
+
+    def clear(self):
+        with self._locked():
+            for name in (INDEX_FILE, *LEGACY_FILES):
+                path = os.path.join(self.directory, name)
+                if os.path.exists(path):
+                    os.remove(path)
+            self.snapshot = None
+            self._loaded_stamp = None
+
+    # ---------- querying ----------
+
+    def search(self, query, limit=20, min_score=0.0):
+        """Return [(pet_id, score), ...] ordered by cosine similarity to the query"""
+        snapshot = self.load()
+        if snapshot is None or not len(snapshot.pet_ids):
+            return []
+        query_vector = _project(snapshot, tokenize(query))
+        if not query_vector.any():
+            return []
+        scores = snapshot.vectors @ query_vector
+        limit = min(limit, len(scores))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(snapshot.pet_ids[i], float(scores[i])) for i in top if scores[i] > min_score]
+
+    # ---------- persistence ----------
+
+    def load(self):
+        """The current snapshot, reloaded if the bundle was replaced (by any process); None if unbuilt"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self.snapshot = None
+            self._loaded_stamp = None
+            return None
+        # os.replace gives the new bundle a new inode
+        stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if stamp != self._loaded_stamp:
+            with self._reload_lock:
+                if stamp != self._loaded_stamp:
+                    with np.load(self.path, allow_pickle=False) as bundle:
+                        terms = bundle['terms'].tolist()
+                        self.snapshot = _snapshot(
+                            {term: i for i, term in enumerate(terms)},
+                            bundle['idf'], bundle['components'], bundle['vectors'],
+                            bundle['pet_ids'].tolist(), generation=str(bundle['generation']),
+                        )
+                    self._loaded_stamp = stamp
+        return self.snapshot
+
+    def _save(self, snapshot):
+        """Write snapshot as the new bundle in one os.replace (callers hold _locked)"""
+        terms = sorted(snapshot.vocabulary, key=snapshot.vocabulary.get)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    generation=np.array(snapshot.generation),
+                    terms=np.array(terms, dtype=str),
+                    idf=np.asarray(snapshot.idf, dtype=np.float32),
+                    components=np.asarray(snapshot.components, dtype=np.float32),
+                    vectors=np.ascontiguousarray(snapshot.vectors, dtype=np.float32),
+                    pet_ids=np.asarray(snapshot.pet_ids, dtype=np.int64),
+                )
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        for name in LEGACY_FILES:
+            path = os.path.join(self.directory, name)
+            if os.path.exists(path):
+                os.remove(path)
+        st = os.stat(self.path)
+        self.snapshot = snapshot
+        self._loaded_stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive across this process's threads and, where fcntl exists, other processes"""
+        with self._write_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, LOCK_FILE), 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# ---------- vector helpers ----------
+
+def _tfidf(vocabulary, idf, tokens):
+    row = np.zeros(len(vocabulary), dtype=np.float32)
+    for term, count in Counter(tokens).items():
+        col = vocabulary.get(term)
+        if col is not None:
+            row[col] = (1.0 + math.log(count)) * idf[col]
+    norm = np.linalg.norm(row)
+    return row / norm if norm else row
+
+
+def _project(snapshot, tokens):
+    vector = snapshot.components @ _tfidf(snapshot.vocabulary, snapshot.idf, tokens)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def get_index_dir():
+    return getattr(settings, 'SEMANTIC_INDEX_DIR', os.path.join(settings.BASE_DIR, 'semantic_index'))
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _get_index():
+    """Process-wide index instance"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = PetSemanticIndex()
+    return _index
+
+
+def rebuild_semantic_index(queryset, n_components=100):
+    """Rebuild the index from scratch for the given pets"""
+    documents = [(pet.id, pet_document(pet)) for pet in queryset]
+    return _get_index().build(documents, n_components=n_components)
+
+
+def refresh_pet_in_index(pet_id, text):
+    """Incrementally fold a pet's text into the index (no-op until the index is built)"""
+    try:
+        return _get_index().add_or_update(pet_id, text)
+    except Exception as e:
+        logger.warning("Semantic index refresh failed for pet %s: %s", pet_id, e)
+        return False
+
+
+def remove_pet_from_index(pet_id):
+    try:
+        return _get_index().remove(pet_id)
+    except Exception as e:
+        logger.warning("Semantic index removal failed for pet %s: %s", pet_id, e)
+        return False
+
+
+def semantic_search(query, limit=20, min_score=0.0):
+    """Return [(pet_id, score), ...] for the query, or [] if no index has been built"""
+    try:
+        return _get_index().search(query, limit=limit, min_score=min_score)
+    except Exception as e:
+        logger.warning("Semantic search failed: %s", e)
+        return []
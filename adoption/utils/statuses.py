@@ -0,0 +1,150 @@
+# adoption/utils/statuses.py
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils.functional import cached_property
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+class StatusChoices(models.IntegerChoices):
+    """
+    A status vocabulary stored as small integers. Code outside the database
+    speaks in lowercase codes ('pending', 'adopted', ...); the integers are the
+    storage format only and must never be renumbered.
+    """
+
+    @property
+    def code(self):
+        return self.name.lower()
+
+    @classmethod
+    def parse(cls, value):
+        """Member for a member, stored integer, code or legacy spelling; ValueError otherwise"""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, int) and not isinstance(value, StatusChoices):
+            return cls(value)
+        if isinstance(value, str):
+            key = value.strip()
+            member = cls.__members__.get(key.upper()) or cls.legacy_aliases().get(key)
+            if member is not None:
+                return member
+            if key.isdigit():
+                return cls(int(key))
+        raise ValueError(f"{value!r} is not a valid {cls.__name__}")
+
+    @classmethod
+    def legacy_aliases(cls):
+        return LEGACY_ALIASES.get(cls, {})
+
+    def can_become(self, new_status):
+        return self.parse(new_status) in TRANSITIONS.get(type(self), {}).get(self, ())
+
+    def check_transition(self, new_status):
+        new_status = self.parse(new_status)
+        if not self.can_become(new_status):
+            raise InvalidTransition(f"can't go from {self.code} to {new_status.code}")
+        return new_status
+
+
+class PetStatus(StatusChoices):
+    PENDING = 1, 'Pending'     # Posted, waiting for an admin
+    APPROVED = 2, 'Approved'   # Listed for adoption
+    ADOPTED = 3, 'Adopted'
+
+
+class RequestStatus(StatusChoices):
+    PENDING = 1, 'Pending'
+    REVIEW = 2, 'Review'
+    APPROVED = 3, 'Approved'
+    REJECTED = 4, 'Rejected'
+    SUPERSEDED = 5, 'Pet adopted by another request'
+    PET_DELETED = 6, 'Pet deleted'
+
+
+# Spellings written by older code, still accepted on write and stored as the canonical status
+LEGACY_ALIASES = {
+    PetStatus: {
+        'Pet is already adopted': PetStatus.ADOPTED,
+        'Pet is already adopt': PetStatus.ADOPTED,
+        'Pet_is_already_adopt': PetStatus.ADOPTED,
+    },
+    RequestStatus: {
+        'deny': RequestStatus.REJECTED,
+        'adopted': RequestStatus.APPROVED,
+        'pet_is_adopted': RequestStatus.SUPERSEDED,
+        'Pet is already adopt': RequestStatus.SUPERSEDED,
+        'Pet is deleted': RequestStatus.PET_DELETED,
+    },
+}
+
+TRANSITIONS = {
+    PetStatus: {
+        PetStatus.PENDING: {PetStatus.APPROVED, PetStatus.ADOPTED},
+        PetStatus.APPROVED: {PetStatus.ADOPTED},
+        PetStatus.ADOPTED: set(),
+    },
+    RequestStatus: {
+        RequestStatus.PENDING: {RequestStatus.REVIEW, RequestStatus.APPROVED, RequestStatus.REJECTED,
+                                RequestStatus.SUPERSEDED, RequestStatus.PET_DELETED},
+        RequestStatus.REVIEW: {RequestStatus.APPROVED, RequestStatus.REJECTED,
+                               RequestStatus.SUPERSEDED, RequestStatus.PET_DELETED},
+        # A rejected request can be reconsidered; approved and superseded ones only end with the pet
+        RequestStatus.REJECTED: {RequestStatus.REVIEW, RequestStatus.PET_DELETED},
+        RequestStatus.APPROVED: {RequestStatus.PET_DELETED},
+        RequestStatus.SUPERSEDED: {RequestStatus.PET_DELETED},
+        RequestStatus.PET_DELETED: set(),
+    },
+}
+
+# Pets shown on the public listings, and requests still waiting for a decision
+LISTED_PET_STATUSES = (PetStatus.PENDING.code, PetStatus.APPROVED.code)
+OPEN_REQUEST_STATUSES = (RequestStatus.PENDING.code, RequestStatus.REVIEW.code)
+
+
+class StatusField(models.PositiveSmallIntegerField):
+    """
+    A status column holding StatusChoices integers. Model instances, values()
+    rows, forms and serializers see the status code string, so filters such as
+    filter(adoption_status='adopted') and template comparisons read as before,
+    while the database compares and indexes a two-byte integer.
+    """
+
+    def __init__(self, *args, statuses=None, **kwargs):
+        self.statuses = statuses
+        if statuses is not None:
+            kwargs['choices'] = [(status.code, status.label) for status in statuses]
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        # Choices are derived from the vocabulary
+        kwargs.pop('choices', None)
+        kwargs['statuses'] = self.statuses
+        return name, path, args, kwargs
+
+    @cached_property
+    def validators(self):
+        # Values are codes, not numbers, so the integer range validators don't apply
+        return [*self.default_validators, *self._validators]
+
+    def to_python(self, value):
+        if value is None:
+            return value
+        try:
+            return self.statuses.parse(value).code
+        except ValueError:
+            raise ValidationError(
+                self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value},
+            )
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else self.statuses(value).code
+
+    def get_prep_value(self, value):
+        value = models.Field.get_prep_value(self, value)
+        if value is None:
+            return None
+        return self.statuses.parse(value).value
@@ -0,0 +1,151 @@
+# adoption/utils/uploads.py
+import logging
+from io import BytesIO
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import TemporaryUploadedFile, UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.db import models
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# Bytes a file may take on the wire, per form field; the handler stops storing a
+# file as soon as it passes its limit instead of after buffering all of it
+UPLOAD_SIZE_LIMITS = {
+    'id_upload': 5 * 1024 * 1024,
+}
+DEFAULT_UPLOAD_SIZE_LIMIT = 10 * 1024 * 1024
+
+# Photos are stored at most this many pixels along the longest edge, re-encoded
+# without EXIF (camera details, GPS position) in their original format
+UPLOAD_MAX_EDGE = 2048
+REENCODE_OPTIONS = {
+    'JPEG': {'format': 'JPEG', 'quality': 85, 'optimize': True, 'progressive': True},
+    'MPO': {'format': 'JPEG', 'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'format': 'PNG', 'optimize': True},
+    'WEBP': {'format': 'WEBP', 'quality': 85, 'method': 4},
+}
+
+
+def upload_size_limit(field_name):
+    return UPLOAD_SIZE_LIMITS.get(field_name, DEFAULT_UPLOAD_SIZE_LIMIT)
+
+
+def size_limit_message(limit):
+    return f"File size must be less than {limit // (1024 * 1024)}MB."
+
+
+class OversizedUpload(UploadedFile):
+    """
+    Stands in for a file that stopped being stored mid-stream. size is what was
+    received, so size checks still see it; the content is empty, and is
+    rejected by validate_upload_size before anything reads it.
+    """
+
+    def __init__(self, name, content_type, size, limit, charset=None, content_type_extra=None):
+        super().__init__(BytesIO(), name, content_type, size, charset, content_type_extra)
+        self.limit = limit
+
+
+def validate_upload_size(value):
+    # A model field's value wraps the upload in a FieldFile until it's saved
+    upload = getattr(value, '_file', value)
+    if isinstance(upload, OversizedUpload):
+        raise ValidationError(size_limit_message(upload.limit), code='file_too_large')
+
+
+class UploadImageFormField(forms.ImageField):
+    """
+    forms.ImageField (which DRF's ImageField also runs) opens the image in
+    to_python, before any validator; an upload cut off for its size is
+    reported as too large there rather than as a broken image.
+    """
+
+    def to_python(self, data):
+        validate_upload_size(data)
+        return super().to_python(data)
+
+
+class UploadImageField(models.ImageField):
+    """An ImageField whose forms check the upload's size before its content"""
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{'form_class': UploadImageFormField, **kwargs})
+
+
+def shrink_image(upload):
+    """
+    Re-encode an uploaded photo that is larger than UPLOAD_MAX_EDGE or carries
+    EXIF/XMP metadata. Returns a new TemporaryUploadedFile (closing the old one),
+    or upload unchanged when it needs neither or isn't an image Pillow can write
+    back (PDF scans, GIFs, corrupt files -- the form's own validation sees those).
+    """
+    try:
+        with Image.open(upload.temporary_file_path()) as image:
+            options = REENCODE_OPTIONS.get(image.format)
+            if options is None:
+                return upload
+            has_metadata = bool(image.getexif()) or 'xmp' in image.info
+            if max(image.size) <= UPLOAD_MAX_EDGE and not has_metadata:
+                return upload
+
+            # thumbnail() lets the JPEG decoder scale down while reading, so a large
+            # photo is never held at full resolution; orientation is applied after
+            icc_profile = image.info.get('icc_profile')
+            image.thumbnail((UPLOAD_MAX_EDGE, UPLOAD_MAX_EDGE), Image.LANCZOS)
+            image = ImageOps.exif_transpose(image)
+            if options['format'] == 'JPEG' and image.mode not in ('RGB', 'L', 'CMYK'):
+                image = image.convert('RGB')
+
+            shrunk = TemporaryUploadedFile(upload.name, upload.content_type, 0, upload.charset, upload.content_type_extra)
+            image.save(shrunk.file, exif=b'', icc_profile=icc_profile, **options)
+    except UnidentifiedImageError:
+        return upload
+    except Exception:
+        logger.warning("Could not re-encode upload %s; keeping it as sent", upload.name, exc_info=True)
+        return upload
+
+    shrunk.size = shrunk.file.tell()
+    shrunk.seek(0)
+    upload.close()
+    return shrunk
+
+
+class StreamingUploadHandler(FileUploadHandler):
+    """
+    Writes each uploaded file to a temporary file in chunks as it arrives, stops
+    storing it once it passes its field's size limit, and hands complete photos
+    to shrink_image. Replaces Django's default handlers (FILE_UPLOAD_HANDLERS),
+    which keep small files in memory and check no sizes.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.limit = upload_size_limit(self.field_name)
+        self.received = 0
+        self.file = TemporaryUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.file is not None:
+            if self.received > self.limit:
+                # The rest of the file still has to be read off the request, but none of it is kept
+                self.file.close()
+                self.file = None
+            else:
+                self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.file is None:
+            return OversizedUpload(self.file_name, self.content_type, self.received, self.limit,
+                                   self.charset, self.content_type_extra)
+        self.file.seek(0)
+        self.file.size = file_size
+        return shrink_image(self.file)
+
+    def upload_interrupted(self):
+        if getattr(self, 'file', None) is not None:
+            self.file.close()
@@ -0,0 +1,273 @@
+# adoption/utils/web_scraping.py
+import hashlib
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Prefer lxml's C parser; fall back to the pure-Python parser if it isn't installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+    print("lxml not available, web search scraping will use html.parser. Install with: pip install lxml")
+
+# Card containers per source, in priority order: (tag name, attribute filters)
+PETFINDER_CARD_SELECTORS = [
+    ('div', {'class': 'petCard-body'}),
+    ('div', {'data-testid': 'pet-card'}),
+]
+
+ADOPT_A_PET_CARD_SELECTORS = [
+    ('div', {'class': 'search-result'}),
+    ('div', {'class': 'pet-item'}),
+    ('article', {}),
+]
+
+
+def _attr_matches(actual, expected):
+    if actual is None:
+        return False
+    if isinstance(actual, str):
+        actual = actual.split()
+    return expected in actual
+
+
+def _tag_matches(name, attrs, selector):
+    tag, wanted = selector
+    if name != tag:
+        return False
+    for attr, value in wanted.items():
+        if attr == 'class':
+            if not _attr_matches(attrs.get('class'), value):
+                return False
+        elif attrs.get(attr) != value:
+            return False
+    return True
+
+
+def card_strainer(selectors):
+    """SoupStrainer that keeps only the card containers (and their contents)"""
+    return SoupStrainer(lambda name, attrs: any(_tag_matches(name, attrs or {}, s) for s in selectors))
+
+
+def find_pet_cards(markup, selectors, limit=5):
+    """
+    Parse a search results page keeping only card subtrees, then return the
+    cards for the first selector that matches anything.
+
+    Args:
+        markup (bytes|str): Raw HTML of the results page
+        selectors (list): (tag, attrs) pairs in priority order
+        limit (int): Maximum number of cards to return
+
+    Returns:
+        list: bs4 Tags, one per card
+    """
+    soup = BeautifulSoup(markup, HTML_PARSER, parse_only=card_strainer(selectors))
+    for tag, attrs in selectors:
+        cards = soup.find_all(tag, attrs=attrs, limit=limit)
+        if cards:
+            return cards
+    return []
+
+
+def web_pet_id(prefix, *parts):
+    """Deterministic, content-based ID so the same listing dedupes across calls"""
+    digest = hashlib.sha1('|'.join(part or '' for part in parts).encode()).hexdigest()[:16]
+    return f"{prefix}_{digest}"
+
+
+def extract_card_data(card, search_name, source_name, id_prefix, base_url, name_selectors):
+    """
+    Extract pet data from a search result card
+
+    Args:
+        card: bs4 Tag for one card
+        search_name (str): Name searched for; cards for other names are skipped
+        source_name (str): Human readable source name, e.g. 'Petfinder'
+        id_prefix (str): Prefix for the result ID, e.g. 'pf'
+        base_url (str): Site root used to absolutize relative links
+        name_selectors (list): find() kwargs tried in order to locate the pet name
+
+    Returns:
+        dict or None
+    """
+    try:
+        # Find pet name
+        name_elem = None
+        for selector in name_selectors:
+            name_elem = card.find(**selector)
+            if name_elem:
+                break
+
+        if not name_elem:
+            return None
+
+        pet_name = name_elem.get_text(strip=True)
+
+        # Check if name matches (case insensitive)
+        if search_name.lower() not in pet_name.lower():
+            return None
+
+        # Find image
+        img_elem = card.find('img')
+        image_url = img_elem.get('src') or img_elem.get('data-src') if img_elem else None
+
+        # Find link
+        link_elem = card.find('a') or card.find_parent('a')
+        pet_url = link_elem.get('href') if link_elem else None
+        if pet_url and pet_url.startswith('/'):
+            pet_url = base_url + pet_url
+
+        # Extract additional info in one pass over the card text
+        attributes = card_extractor.extract(card.get_text())
+
+        return {
+            'id': web_pet_id(id_prefix, pet_url, pet_name),
+            'name': pet_name,
+            'animal_type': attributes['animal_type'],
+            'breed': attributes['breed'],
+            'color': attributes['color'],
+            'age': attributes['age'],
+            'location': attributes['location'],
+            'image_url': image_url,
+            'source': source_name,
+            'source_url': pet_url,
+            'description': attributes['description'],
+        }
+
+    except Exception:
+        return None
+
+
+class PetCardExtractor:
+    """
+    Fills every attribute of a scraped card from a single tokenization of its text.
+
+    All keyword lists are compiled once into a phrase -> [(attribute, priority, value)]
+    table. Each card is lowercased and tokenized once; keyword hits are found with a
+    set intersection (and a few substring checks for multi-word breeds), so only actual
+    hits reach Python code. When several keywords of one attribute match, the one
+    listed first wins, as before.
+    """
+
+    ANIMAL_TYPES = [
+        ('Dog', ['dog', 'puppy', 'canine']),
+        ('Cat', ['cat', 'kitten', 'feline']),
+        ('Bird', ['bird']),
+        ('Rabbit', ['rabbit']),
+    ]
+
+    # Common dog breeds, then common cat breeds
+    BREEDS = [
+        'labrador', 'golden retriever', 'german shepherd', 'bulldog', 'poodle',
+        'beagle', 'rottweiler', 'husky', 'chihuahua', 'dachshund', 'border collie',
+        'persian', 'siamese', 'maine coon', 'ragdoll', 'british shorthair',
+        'abyssinian', 'bengal', 'russian blue',
+    ]
+
+    COLORS = [
+        'black', 'white', 'brown', 'golden', 'gray', 'orange', 'tabby',
+        'calico', 'tortoiseshell', 'cream', 'red', 'blue', 'silver',
+    ]
+
+    AGE_TERMS = [
+        ('Young', ['puppy', 'kitten', 'young']),
+        ('Senior', ['senior', 'old', 'elderly']),
+        ('Adult', ['adult']),
+    ]
+
+    # Translation tables: ASCII non-letters -> space (tokenizing), and ASCII
+    # characters outside [\w\s.,!?-] -> deleted (cleaning); both run in C
+    TOKEN_TABLE = str.maketrans({c: ' ' for c in map(chr, range(128)) if not ('a' <= c <= 'z')})
+    STRIP_TABLE = str.maketrans({c: None for c in map(chr, range(128)) if not re.match(r'[\w\s.,!?-]', c)})
+    AGE_RE = re.compile(
+        r'(?P<number>\d+)\s*(?:(?:year|yr)|(?P<months>month|mo))s?\s*old'
+        r'|age\s*:?\s*(?P<age>\d+)'
+    )
+    CITY_STATE_RE = re.compile(r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*),\s*([A-Z]{2})')
+    STATE_RE = re.compile(r'\b([A-Z]{2})\b')
+    STRIP_RE = re.compile(r'[^\w\s.,!?-]')
+
+    def __init__(self):
+        self.keywords = {}
+        for priority, (value, words) in enumerate(self.ANIMAL_TYPES):
+            self._add('animal_type', priority, value, words)
+        for priority, breed in enumerate(self.BREEDS):
+            self._add('breed', priority, breed.title(), [breed])
+        # Look for "mix" or "mixed" only if no named breed matched
+        self._add('breed', len(self.BREEDS), 'Mixed Breed', ['mix', 'mixed'])
+        for priority, color in enumerate(self.COLORS):
+            self._add('color', priority, color.title(), [color])
+        for priority, (value, words) in enumerate(self.AGE_TERMS):
+            self._add('age', priority, value, words)
+
+        # Plural forms ("labradors", "kittens") hit the same entries
+        for word in [w for w in self.keywords if ' ' not in w]:
+            self.keywords.setdefault(word + 's', self.keywords[word])
+        self.words = {w for w in self.keywords if ' ' not in w}
+        self.phrases = tuple(p for p in self.keywords if ' ' in p)
+
+    def _add(self, attribute, priority, value, phrases):
+        for phrase in phrases:
+            self.keywords.setdefault(phrase, []).append((attribute, priority, value))
+
+    def extract(self, text):
+        """
+        Extract animal_type, breed, color, age, location and a cleaned description
+
+        Args:
+            text (str): Visible text of a card
+
+        Returns:
+            dict: Attribute values, 'Unknown' where nothing matched
+        """
+        best = {}
+        lowered = text.lower()
+        hits = self.words.intersection(lowered.translate(self.TOKEN_TABLE).split())
+        hits.update(phrase for phrase in self.phrases if phrase in lowered)
+        for phrase in hits:
+            for attribute, priority, value in self.keywords[phrase]:
+                current = best.get(attribute)
+                if current is None or priority < current[0]:
+                    best[attribute] = (priority, value)
+
+        return {
+            'animal_type': best['animal_type'][1] if 'animal_type' in best else 'Unknown',
+            'breed': best['breed'][1] if 'breed' in best else 'Unknown',
+            'color': best['color'][1] if 'color' in best else 'Unknown',
+            'age': best['age'][1] if 'age' in best else self._numeric_age(lowered),
+            'location': self._location(text),
+            'description': self._description(text),
+        }
+
+    def _numeric_age(self, text_lower):
+        match = self.AGE_RE.search(text_lower)
+        if not match:
+            return 'Unknown'
+        if match.group('months'):
+            return f"{match.group('number')} months old"
+        return f"{match.group('number') or match.group('age')} years old"
+
+    def _location(self, text):
+        # Look for city, state pattern, then just a state
+        if ',' in text:
+            match = self.CITY_STATE_RE.search(text)
+            if match:
+                return f"{match.group(1)}, {match.group(2)}"
+        match = self.STATE_RE.search(text)
+        if match:
+            return match.group(1)
+        return 'Unknown'
+
+    def _description(self, text):
+        # Remove special characters (keeping basic punctuation), then collapse whitespace
+        if text.isascii():
+            cleaned = ' '.join(text.translate(self.STRIP_TABLE).split())
+        else:
+            cleaned = ' '.join(self.STRIP_RE.sub('', text).split())
+        return cleaned[:200] + '...' if len(text) > 200 else cleaned
+
+
+card_extractor = PetCardExtractor()
@@ -0,0 +1,350 @@
+# adoption/utils/web_search.py
+import bisect
+import hashlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+import requests
+from django.core.cache import cache
+
+from .web_scraping import (
+    ADOPT_A_PET_CARD_SELECTORS,
+    PETFINDER_CARD_SELECTORS,
+    extract_card_data,
+    find_pet_cards,
+)
+
+# Overall budget for one web search, and the default per-request timeout for a source.
+# Sources run concurrently, so a call costs at most WEB_SEARCH_DEADLINE seconds.
+WEB_SEARCH_DEADLINE = 8
+WEB_SEARCH_SOURCE_TIMEOUT = 6
+
+# Result cache per (source, normalized query): entries are served fresh for the
+# source's TTL, then served stale for up to WEB_SEARCH_CACHE_STALE_TTL while a
+# single background refresh runs. Empty results are kept briefly so a name with
+# no matches isn't re-scraped on every keystroke. Failures are never cached.
+WEB_SEARCH_CACHE_TTL = 15 * 60
+WEB_SEARCH_CACHE_STALE_TTL = 24 * 60 * 60
+WEB_SEARCH_EMPTY_CACHE_TTL = 60
+
+# Shared across requests so a slow source never holds more than its own thread
+_web_search_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='pet-web-search')
+_web_search_sessions = threading.local()
+
+# In-flight scrapes by cache key, so concurrent identical requests share one fetch
+_web_search_inflight = {}
+_web_search_inflight_lock = threading.Lock()
+
+
+def get_web_search_session():
+    """One requests.Session per pool thread (Session is not thread-safe; this also keeps connections alive)"""
+    session = getattr(_web_search_sessions, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        })
+        _web_search_sessions.session = session
+    return session
+
+
+# ==================== CIRCUIT BREAKER ====================
+
+class SourceUnavailable(Exception):
+    """Raised instead of calling a source whose circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing source for a cool-off period.
+
+    closed    -> calls go through; `failure_threshold` consecutive failures open it
+    open      -> calls are refused until `cooldown` seconds have passed
+    half_open -> a single trial call is let through; success closes, failure re-opens
+    """
+
+    def __init__(self, failure_threshold=3, cooldown=60):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = None
+            if self.state == 'open':
+                retry_in = max(0.0, round(self.cooldown - (time.monotonic() - self.opened_at), 1))
+            return {'state': self.state, 'consecutive_failures': self.failures, 'retry_in_seconds': retry_in}
+
+
+# ==================== PER-SOURCE METRICS ====================
+
+class SourceMetrics:
+    """In-process latency histogram and error counters for one source"""
+
+    LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.successes = 0
+        self.short_circuited = 0
+        self.errors = {}
+        self.latency_counts = [0] * (len(self.LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+
+    def observe(self, seconds, error=None):
+        with self._lock:
+            self.calls += 1
+            self.latency_counts[bisect.bisect_left(self.LATENCY_BUCKETS, seconds)] += 1
+            self.latency_sum += seconds
+            if error is None:
+                self.successes += 1
+            else:
+                name = type(error).__name__
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def observe_short_circuit(self):
+        with self._lock:
+            self.short_circuited += 1
+
+    def snapshot(self):
+        with self._lock:
+            labels = [f"le_{bucket}" for bucket in self.LATENCY_BUCKETS] + ['le_inf']
+            return {
+                'calls': self.calls,
+                'successes': self.successes,
+                'short_circuited': self.short_circuited,
+                'errors': dict(self.errors),
+                'latency_histogram': dict(zip(labels, self.latency_counts)),
+                'latency_avg_seconds': round(self.latency_sum / self.calls, 3) if self.calls else None,
+            }
+
+
+# ==================== SOURCE ADAPTERS ====================
+
+class PetSource:
+    """
+    An external pet listing site.
+
+    fetch(session, query, timeout) returns the raw page and raises on failure;
+    parse(markup, query) turns it into result dicts. Every call goes through the
+    source's circuit breaker and is recorded in its metrics.
+    """
+
+    def __init__(self, key, name, fetch, parse, timeout=WEB_SEARCH_SOURCE_TIMEOUT,
+                 ttl=WEB_SEARCH_CACHE_TTL, max_results=5, breaker=None):
+        self.key = key
+        self.name = name
+        self.fetch = fetch
+        self.parse = parse
+        self.timeout = timeout
+        self.ttl = ttl
+        self.max_results = max_results
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = SourceMetrics()
+
+    def search(self, query):
+        if not self.breaker.allow():
+            self.metrics.observe_short_circuit()
+            raise SourceUnavailable(f"{self.name} is cooling off after repeated failures")
+
+        started = time.monotonic()
+        try:
+            markup = self.fetch(get_web_search_session(), query, self.timeout)
+            results = self.parse(markup, query)[:self.max_results]
+        except Exception as e:
+            self.metrics.observe(time.monotonic() - started, error=e)
+            self.breaker.record_failure()
+            raise
+        self.metrics.observe(time.monotonic() - started)
+        self.breaker.record_success()
+        return results
+
+    def status(self):
+        return {
+            'name': self.name,
+            'timeout': self.timeout,
+            'ttl': self.ttl,
+            'circuit': self.breaker.snapshot(),
+            'metrics': self.metrics.snapshot(),
+        }
+
+
+PET_SOURCES = {}
+
+
+def register_pet_source(source):
+    """Add (or replace) a source; sources are queried in registration order"""
+    PET_SOURCES[source.key] = source
+    return source
+
+
+def unregister_pet_source(key):
+    return PET_SOURCES.pop(key, None)
+
+
+def _get_page(session, url, params, timeout):
+    response = session.get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+
+def fetch_petfinder(session, query, timeout):
+    return _get_page(session, "https://www.petfinder.com/search/pets-for-adoption/",
+                     {'name': query, 'type[]': ['cats', 'dogs']}, timeout)
+
+
+def parse_petfinder(markup, query):
+    # Adjust selectors based on actual Petfinder HTML
+    cards = find_pet_cards(markup, PETFINDER_CARD_SELECTORS)
+    results = [extract_card_data(card, query, 'Petfinder', 'pf', 'https://www.petfinder.com', [
+        {'name': 'h3'},
+        {'name': 'h2'},
+        {'class_': 'petCard-name'},
+        {'attrs': {'data-testid': 'pet-name'}},
+    ]) for card in cards]
+    return [pet for pet in results if pet]
+
+
+def fetch_adopt_a_pet(session, query, timeout):
+    return _get_page(session, "https://www.adoptapet.com/s/adopt-a-pet", {'pet_name': query}, timeout)
+
+
+def parse_adopt_a_pet(markup, query):
+    cards = find_pet_cards(markup, ADOPT_A_PET_CARD_SELECTORS)
+    results = [extract_card_data(card, query, 'Adopt-a-Pet', 'aap', 'https://www.adoptapet.com', [
+        {'name': 'h3'},
+        {'name': 'h2'},
+        {'class_': 'pet-name'},
+    ]) for card in cards]
+    return [pet for pet in results if pet]
+
+
+register_pet_source(PetSource('petfinder', 'Petfinder', fetch_petfinder, parse_petfinder))
+register_pet_source(PetSource('adoptapet', 'Adopt-a-Pet', fetch_adopt_a_pet, parse_adopt_a_pet))
+
+
+# ==================== STALE-WHILE-REVALIDATE CACHE ====================
+
+def normalize_web_query(query):
+    return ' '.join(query.lower().split())
+
+
+def web_search_cache_key(source_key, query):
+    digest = hashlib.md5(normalize_web_query(query).encode()).hexdigest()
+    return f"web_search_{source_key}_{digest}"
+
+
+def _fetch_and_store(cache_key, source, query):
+    results = source.search(query)
+    ttl = source.ttl if results else WEB_SEARCH_EMPTY_CACHE_TTL
+    cache.set(cache_key, {
+        'results': results,
+        'fresh_until': time.time() + ttl,
+    }, ttl + WEB_SEARCH_CACHE_STALE_TTL)
+    return results
+
+
+def _coalesced_fetch(cache_key, source, query):
+    """Start a scrape for cache_key unless one is already running; return its future"""
+    with _web_search_inflight_lock:
+        future = _web_search_inflight.get(cache_key)
+        if future is None:
+            future = _web_search_pool.submit(_fetch_and_store, cache_key, source, query)
+            _web_search_inflight[cache_key] = future
+            future.add_done_callback(lambda f: _web_search_inflight.pop(cache_key, None))
+    return future
+
+
+def cached_web_search(source, query):
+    """
+    Stale-while-revalidate lookup for one source. Returns a future that is
+    already resolved on a cache hit (fresh or stale) or tracks the shared scrape.
+    """
+    cache_key = web_search_cache_key(source.key, query)
+    entry = cache.get(cache_key)
+    if entry is None:
+        return _coalesced_fetch(cache_key, source, query)
+
+    if entry['fresh_until'] < time.time():
+        # Serve stale now; the refresh lock keeps other workers sharing this cache from piling on
+        if cache.add(f"{cache_key}_refreshing", True, WEB_SEARCH_DEADLINE * 2):
+            _coalesced_fetch(cache_key, source, query)
+
+    future = Future()
+    future.set_result(entry['results'])
+    return future
+
+
+# ==================== SEARCH ====================
+
+class SimplePetWebSearch:
+    """Simple web search for pets by name across the registered sources"""
+
+    def __init__(self, sources=None):
+        self.sources = list(sources) if sources is not None else list(PET_SOURCES.values())
+
+    def search_pets_by_name(self, pet_name, max_results=10, deadline=WEB_SEARCH_DEADLINE):
+        """Search for pets by name across sources concurrently, returning whatever arrives before the deadline"""
+        futures = [(source, cached_web_search(source, pet_name)) for source in self.sources]
+        done, not_done = wait([future for _, future in futures], timeout=deadline)
+
+        all_results = []
+        seen_ids = set()
+        # Keep source order stable regardless of which finished first
+        for source, future in futures:
+            if future in not_done:
+                # Not cancelled: the scrape is shared and still fills the cache for the next caller
+                print(f"{source.name} search missed the {deadline}s deadline")
+                continue
+            try:
+                source_results = future.result()
+            except SourceUnavailable as e:
+                print(e)
+                continue
+            except Exception as e:
+                print(f"{source.name} search error: {e}")
+                continue
+            for pet in source_results:
+                if pet['id'] not in seen_ids:
+                    seen_ids.add(pet['id'])
+                    all_results.append(pet)
+
+        return all_results[:max_results]
+
+
+def web_search_sources_status():
+    return [source.status() for source in PET_SOURCES.values()]
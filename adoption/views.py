@@ -12,7 +12,6 @@ import math
 import requests
 import time
 import hashlib
-from bs4 import BeautifulSoup
 import re
 
 # Import models directly from this app
@@ -21,6 +20,9 @@ from .models import PendingPetForAdoption
 # Import NLP functionality
 from .utils.search_helpers import perform_smart_search, get_search_suggestions, analyze_search_query, build_search_filters
 from .utils.nlp_search import PetSearchNLP
+from .utils.web_search import SimplePetWebSearch, web_search_sources_status
+from .utils.statuses import LISTED_PET_STATUSES
+from LoginPage.views import admin_required
 
 # ==================== ENHANCED GEOCODING WITH CACHING ====================
 
@@ -178,7 +180,7 @@ def get_pets_locations(request):
         # Get all pets that have a location field and are approved or pending
         pets = PendingPetForAdoption.objects.filter(
             location__isnull=False,
-            adoption_status__in=['approved', 'pending']
+            adoption_status__in=LISTED_PET_STATUSES
         ).exclude(location='')
         
         print(f"Found {pets.count()} pets with location data")
@@ -290,7 +292,7 @@ def search_pets_by_location(request):
         
         pets_query = PendingPetForAdoption.objects.filter(
             location__isnull=False,
-            adoption_status__in=['approved', 'pending']
+            adoption_status__in=LISTED_PET_STATUSES
         ).exclude(location='')
         
         if pet_type != 'all':
@@ -400,278 +402,6 @@ def clear_pets_cache(request):
 
 # ==================== KEEP ALL YOUR EXISTING VIEWS UNCHANGED ====================
 
-# Your existing web search class and views remain exactly the same
-class SimplePetWebSearch:
-    """Simple web search for pets by name"""
-    
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-    
-    def search_pets_by_name(self, pet_name, max_results=10):
-        """Search for pets by name across multiple sources"""
-        all_results = []
-        
-        # Search Petfinder
-        petfinder_results = self.search_petfinder_by_name(pet_name)
-        all_results.extend(petfinder_results[:5])
-        
-        # Search Adopt-a-Pet
-        adopt_pet_results = self.search_adopt_a_pet_by_name(pet_name)
-        all_results.extend(adopt_pet_results[:5])
-        
-        return all_results[:max_results]
-    
-    def search_petfinder_by_name(self, pet_name):
-        """Search Petfinder website for pets by name"""
-        results = []
-        try:
-            # Search Petfinder website directly
-            search_url = f"https://www.petfinder.com/search/pets-for-adoption/?name={pet_name}&type%5B%5D=cats&type%5B%5D=dogs"
-            
-            response = self.session.get(search_url, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Find pet cards (adjust selectors based on actual Petfinder HTML)
-                pet_cards = soup.find_all('div', class_='petCard-body') or soup.find_all('div', {'data-testid': 'pet-card'})
-                
-                for card in pet_cards[:5]:
-                    try:
-                        pet_data = self.extract_petfinder_data(card, pet_name)
-                        if pet_data:
-                            results.append(pet_data)
-                    except Exception as e:
-                        continue
-                        
-        except Exception as e:
-            print(f"Petfinder search error: {e}")
-        
-        return results
-    
-    def extract_petfinder_data(self, card, search_name):
-        """Extract pet data from Petfinder card"""
-        try:
-            # Find pet name
-            name_elem = (card.find('h3') or 
-                        card.find('h2') or 
-                        card.find(class_='petCard-name') or
-                        card.find(attrs={'data-testid': 'pet-name'}))
-            
-            if not name_elem:
-                return None
-                
-            pet_name = name_elem.get_text(strip=True)
-            
-            # Check if name matches (case insensitive)
-            if search_name.lower() not in pet_name.lower():
-                return None
-            
-            # Find image
-            img_elem = card.find('img')
-            image_url = img_elem.get('src') or img_elem.get('data-src') if img_elem else None
-            
-            # Find link
-            link_elem = card.find('a') or card.find_parent('a')
-            pet_url = link_elem.get('href') if link_elem else None
-            if pet_url and pet_url.startswith('/'):
-                pet_url = 'https://www.petfinder.com' + pet_url
-            
-            # Extract additional info
-            info_text = card.get_text()
-            
-            return {
-                'id': f"pf_{hash(pet_name + str(time.time()))}",
-                'name': pet_name,
-                'animal_type': self.extract_animal_type(info_text),
-                'breed': self.extract_breed(info_text),
-                'color': self.extract_color(info_text),
-                'age': self.extract_age(info_text),
-                'location': self.extract_location(info_text),
-                'image_url': image_url,
-                'source': 'Petfinder',
-                'source_url': pet_url,
-                'description': self.clean_text(info_text)[:200] + '...' if len(info_text) > 200 else self.clean_text(info_text)
-            }
-            
-        except Exception as e:
-            return None
-    
-    def search_adopt_a_pet_by_name(self, pet_name):
-        """Search Adopt-a-Pet website"""
-        results = []
-        try:
-            search_url = f"https://www.adoptapet.com/s/adopt-a-pet?pet_name={pet_name}"
-            
-            response = self.session.get(search_url, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Find pet listings
-                pet_cards = (soup.find_all('div', class_='search-result') or 
-                           soup.find_all('div', class_='pet-item') or
-                           soup.find_all('article'))
-                
-                for card in pet_cards[:5]:
-                    try:
-                        pet_data = self.extract_adopt_a_pet_data(card, pet_name)
-                        if pet_data:
-                            results.append(pet_data)
-                    except Exception as e:
-                        continue
-                        
-        except Exception as e:
-            print(f"Adopt-a-Pet search error: {e}")
-        
-        return results
-    
-    def extract_adopt_a_pet_data(self, card, search_name):
-        """Extract data from Adopt-a-Pet card"""
-        try:
-            # Find pet name
-            name_elem = (card.find('h3') or 
-                        card.find('h2') or 
-                        card.find(class_='pet-name'))
-            
-            if not name_elem:
-                return None
-                
-            pet_name = name_elem.get_text(strip=True)
-            
-            # Check if name matches
-            if search_name.lower() not in pet_name.lower():
-                return None
-            
-            # Find image
-            img_elem = card.find('img')
-            image_url = img_elem.get('src') or img_elem.get('data-src') if img_elem else None
-            
-            # Find link
-            link_elem = card.find('a') or card.find_parent('a')
-            pet_url = link_elem.get('href') if link_elem else None
-            if pet_url and pet_url.startswith('/'):
-                pet_url = 'https://www.adoptapet.com' + pet_url
-            
-            # Extract info
-            info_text = card.get_text()
-            
-            return {
-                'id': f"aap_{hash(pet_name + str(time.time()))}",
-                'name': pet_name,
-                'animal_type': self.extract_animal_type(info_text),
-                'breed': self.extract_breed(info_text),
-                'color': self.extract_color(info_text),
-                'age': self.extract_age(info_text),
-                'location': self.extract_location(info_text),
-                'image_url': image_url,
-                'source': 'Adopt-a-Pet',
-                'source_url': pet_url,
-                'description': self.clean_text(info_text)[:200] + '...' if len(info_text) > 200 else self.clean_text(info_text)
-            }
-            
-        except Exception as e:
-            return None
-    
-    def extract_animal_type(self, text):
-        """Extract animal type from text"""
-        text_lower = text.lower()
-        if any(word in text_lower for word in ['dog', 'puppy', 'canine']):
-            return 'Dog'
-        elif any(word in text_lower for word in ['cat', 'kitten', 'feline']):
-            return 'Cat'
-        elif 'bird' in text_lower:
-            return 'Bird'
-        elif 'rabbit' in text_lower:
-            return 'Rabbit'
-        return 'Unknown'
-    
-    def extract_breed(self, text):
-        """Extract breed from text"""
-        # Common dog breeds
-        dog_breeds = ['labrador', 'golden retriever', 'german shepherd', 'bulldog', 'poodle', 
-                     'beagle', 'rottweiler', 'husky', 'chihuahua', 'dachshund', 'border collie']
-        
-        # Common cat breeds  
-        cat_breeds = ['persian', 'siamese', 'maine coon', 'ragdoll', 'british shorthair', 
-                     'abyssinian', 'bengal', 'russian blue']
-        
-        text_lower = text.lower()
-        
-        for breed in dog_breeds + cat_breeds:
-            if breed in text_lower:
-                return breed.title()
-        
-        # Look for "mix" or "mixed"
-        if 'mix' in text_lower:
-            return 'Mixed Breed'
-        
-        return 'Unknown'
-    
-    def extract_color(self, text):
-        """Extract color from text"""
-        colors = ['black', 'white', 'brown', 'golden', 'gray', 'orange', 'tabby', 
-                 'calico', 'tortoiseshell', 'cream', 'red', 'blue', 'silver']
-        
-        text_lower = text.lower()
-        for color in colors:
-            if color in text_lower:
-                return color.title()
-        
-        return 'Unknown'
-    
-    def extract_age(self, text):
-        """Extract age from text"""
-        text_lower = text.lower()
-        
-        if any(word in text_lower for word in ['puppy', 'kitten', 'young']):
-            return 'Young'
-        elif any(word in text_lower for word in ['senior', 'old', 'elderly']):
-            return 'Senior'
-        elif 'adult' in text_lower:
-            return 'Adult'
-        
-        # Look for specific age patterns
-        age_patterns = [
-            r'(\d+)\s*(?:year|yr)s?\s*old',
-            r'(\d+)\s*(?:month|mo)s?\s*old',
-            r'age\s*:?\s*(\d+)'
-        ]
-        
-        for pattern in age_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                return f"{match.group(1)} years old"
-        
-        return 'Unknown'
-    
-    def extract_location(self, text):
-        """Extract location from text"""
-        # Look for city, state pattern
-        location_pattern = r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*),\s*([A-Z]{2})'
-        match = re.search(location_pattern, text)
-        
-        if match:
-            return f"{match.group(1)}, {match.group(2)}"
-        
-        # Look for just state
-        state_pattern = r'\b([A-Z]{2})\b'
-        match = re.search(state_pattern, text)
-        if match:
-            return match.group(1)
-        
-        return 'Unknown'
-    
-    def clean_text(self, text):
-        """Clean and format text"""
-        # Remove extra whitespace and newlines
-        cleaned = re.sub(r'\s+', ' ', text).strip()
-        # Remove special characters but keep basic punctuation
-        cleaned = re.sub(r'[^\w\s.,!?-]', '', cleaned)
-        return cleaned
-
-
 @require_http_methods(["GET"])
 def search_pets_web(request):
     """Search for pets by name on the web"""
@@ -702,6 +432,13 @@ def search_pets_web(request):
         })
 
 
+@require_http_methods(["GET"])
+@admin_required
+def web_search_sources_api(request):
+    """Circuit breaker state and latency/error histograms for each external pet source (admins only)"""
+    return JsonResponse({'sources': web_search_sources_status()})
+
+
 def search_results(request):
     """
     Enhanced search view with NLP processing for pet adoption listings
@@ -720,7 +457,7 @@ def search_results(request):
         adoption_listings, entities = perform_smart_search(query, PendingPetForAdoption)
         
         # Only show approved and pending pets in search results
-        adoption_listings = adoption_listings.filter(adoption_status__in=['approved', 'pending'])
+        adoption_listings = adoption_listings.filter(adoption_status__in=LISTED_PET_STATUSES)
         
         # Generate suggestions for improving the search
         suggestions = get_search_suggestions(query)
@@ -733,16 +470,15 @@ def search_results(request):
         if sort_by == 'recent':
             adoption_listings = adoption_listings.order_by('-created_at')
         elif sort_by == 'relevance':
-            # You can implement custom relevance scoring here
-            # For now, we'll order by creation date
-            adoption_listings = adoption_listings.order_by('-created_at')
+            # Semantic (LSA) similarity first, newest listings break ties
+            adoption_listings = adoption_listings.order_by('-semantic_score', '-created_at')
         elif sort_by == 'name':
             adoption_listings = adoption_listings.order_by('name')
             
     else:
         # Show all approved and pending pets when no query
         adoption_listings = PendingPetForAdoption.objects.filter(
-            adoption_status__in=['approved', 'pending']
+            adoption_status__in=LISTED_PET_STATUSES
         ).order_by('-created_at')
     
     # Prepare context for template
@@ -852,11 +588,13 @@ def smart_search_api(request):
             results = results.filter(age__lte=filters['age_max'])
         
         # Only show approved and pending pets
-        results = results.filter(adoption_status__in=['approved', 'pending'])
+        results = results.filter(adoption_status__in=LISTED_PET_STATUSES)
         
         # Apply sorting
         if sort_by == 'recent':
             results = results.order_by('-created_at')
+        elif sort_by == 'relevance' and query:
+            results = results.order_by('-semantic_score', '-created_at')
         elif sort_by == 'name':
             results = results.order_by('name')
         elif sort_by == 'age':
@@ -939,7 +677,7 @@ def debug_model_fields(request):
         pets_with_location = PendingPetForAdoption.objects.filter(
             location__isnull=False
         ).exclude(location='').count()
-        approved_pending_pets = PendingPetForAdoption.objects.filter(adoption_status__in=['approved', 'pending']).count()
+        approved_pending_pets = PendingPetForAdoption.objects.filter(adoption_status__in=LISTED_PET_STATUSES).count()
         
         sample_pet = None
         if total_pets > 0: